@@ -0,0 +1,310 @@
+import argparse
+import csv
+import heapq
+import os
+import time
+from collections import Counter
+from contextlib import nullcontext
+from datetime import date
+from itertools import islice
+
+from common import DrawParser, DrawTable, GameSpec
+from generations import pinned_path
+from query import QUERY_HELP, QueryError, compile_query, where_arg
+from report import add_report_args
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+class GameStats:
+    """
+    Everything the analyzer reports need, independent of how it was computed.
+
+    Size is bounded by the number range and `keep`, never by history length:
+      - full-history counts for main balls, special balls and extra labels
+      - the latest `keep` draws (newest first), from which any window of
+        up to `keep` draws is counted
+      - gap state: the last day ordinal each number was drawn
+
+    Partial stats over disjoint parts of a history combine with merge().
+    """
+
+    __slots__ = ("spec", "draws", "rows_read", "rejected", "ball_counts",
+                 "special_counts", "extra_counts", "latest",
+                 "ball_last_seen", "special_last_seen")
+
+    def __init__(self, spec: GameSpec):
+        self.spec = spec
+        self.draws = 0
+        self.rows_read = 0
+        self.rejected = Counter()
+        self.ball_counts = Counter()
+        self.special_counts = Counter()
+        self.extra_counts = Counter()
+        self.latest = []
+        self.ball_last_seen = {}
+        self.special_last_seen = {}
+
+    @classmethod
+    def from_table(cls, table: DrawTable, keep: int) -> "GameStats":
+        stats = cls(table.spec)
+        stats.draws = len(table)
+        stats.rows_read = table.rows_read
+        stats.rejected = Counter(table.rejected)
+        stats.ball_counts = table.ball_counts()
+        stats.special_counts = table.special_counts()
+        stats.extra_counts = table.extra_counts()
+        stats.latest = table.newest(keep)
+        _update_last_seen(stats.ball_last_seen, table.days, table.balls, table.spec.n_balls)
+        _update_last_seen(stats.special_last_seen, table.days, table.special, table.spec.n_special)
+        return stats
+
+    @classmethod
+    def merge(cls, parts: list, keep: int) -> "GameStats":
+        """
+        Combine stats of consecutive parts of one file (in file order).
+        Counts add, last-seen days take the max and the latest draws are
+        re-ranked, so the result equals a single pass over the whole file.
+        """
+        out = cls(parts[0].spec)
+        ranked = []
+        for shard_no, p in enumerate(parts):
+            out.draws += p.draws
+            out.rows_read += p.rows_read
+            out.rejected.update(p.rejected)
+            out.ball_counts.update(p.ball_counts)
+            out.special_counts.update(p.special_counts)
+            out.extra_counts.update(p.extra_counts)
+            for seen, other in ((out.ball_last_seen, p.ball_last_seen),
+                                (out.special_last_seen, p.special_last_seen)):
+                for n, day in other.items():
+                    if day > seen.get(n, day - 1):
+                        seen[n] = day
+            # Within a part, same-day draws are already newest (later row) first.
+            ranked.extend(((dr.day, shard_no, -rank), dr) for rank, dr in enumerate(p.latest))
+        ranked.sort(key=lambda item: item[0], reverse=True)
+        out.latest = [dr for _, dr in ranked[:keep]]
+        return out
+
+    def window_ball_counts(self, n: int) -> Counter:
+        """Main-ball counts over the latest n draws (n <= keep)."""
+        c = Counter()
+        for dr in self.latest[:n]:
+            c.update(dr.balls)
+        return c
+
+    def window_special_counts(self, n: int) -> Counter:
+        c = Counter()
+        for dr in self.latest[:n]:
+            c.update(dr.special)
+        return c
+
+
+def _update_last_seen(seen: dict, days, balls, width: int) -> None:
+    if not width:
+        return
+    for i, n in enumerate(balls):
+        day = days[i // width]
+        if day > seen.get(n, day - 1):
+            seen[n] = day
+
+
+class StreamingAggregator:
+    """
+    Builds GameStats from sorted DrawTable chunks with bounded state:
+    per-number counters plus a min-heap holding the latest `keep` draws.
+
+    Chunks may arrive in any date order. Ties on the same day keep file
+    order, matching DrawTable's stable sort.
+    """
+
+    def __init__(self, spec: GameSpec, keep: int):
+        self.stats = GameStats(spec)
+        self.keep = keep
+        self._heap = []  # (day, chunk_no, pos, draw)
+        self._chunk_no = 0
+
+    def add_chunk(self, chunk: DrawTable) -> None:
+        st = self.stats
+        st.draws += len(chunk)
+        st.ball_counts.update(chunk.balls)
+        st.special_counts.update(chunk.special)
+        st.extra_counts.update(chunk.extra_counts())
+        _update_last_seen(st.ball_last_seen, chunk.days, chunk.balls, chunk.spec.n_balls)
+        _update_last_seen(st.special_last_seen, chunk.days, chunk.special, chunk.spec.n_special)
+
+        # A sorted chunk can only contribute its own newest `keep` draws.
+        heap, keep = self._heap, self.keep
+        first = max(len(chunk) - keep, 0)
+        for pos in range(first, len(chunk)):
+            day = chunk.days[pos]
+            if len(heap) >= keep and (day, self._chunk_no, pos) <= heap[0][:3]:
+                continue
+            item = (day, self._chunk_no, pos, chunk[pos])
+            if len(heap) < keep:
+                heapq.heappush(heap, item)
+            else:
+                heapq.heapreplace(heap, item)
+        self._chunk_no += 1
+
+    def result(self, parser: DrawParser = None) -> GameStats:
+        st = self.stats
+        if parser is not None:
+            st.rows_read = parser.rows_read
+            st.rejected = Counter(parser.rejected)
+        st.latest = [item[3] for item in sorted(self._heap, reverse=True)]
+        return st
+
+
+def iter_chunks(spec: GameSpec, path: str = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                parser_out: list = None):
+    """
+    Yield DrawTable chunks of up to chunk_size rows without reading the
+    whole file. The shared DrawParser is appended to parser_out (if given)
+    so callers can read row/reject counts afterwards.
+    """
+    path = path or spec.csv_path
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"CSV file not found: {path}")
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        parser = DrawParser(spec, header)
+        if parser_out is not None:
+            parser_out.append(parser)
+        while True:
+            records = list(islice(reader, chunk_size))
+            if not records:
+                return
+            yield DrawTable.from_records(spec, header, records, parser)
+
+
+def _timer(metrics, name: str, spec: GameSpec):
+    return metrics.timer(name, game=spec.key) if metrics is not None else nullcontext()
+
+
+def stream_stats(spec: GameSpec, path: str = None, keep: int = 50,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, metrics=None, where: str = None) -> GameStats:
+    """
+    Out-of-core equivalent of GameStats.from_table(DrawTable.from_csv(...)).
+    Peak memory depends on chunk_size and keep, not on file size. With
+    `where`, only draws matching the query are counted.
+    """
+    query = compile_query(where, spec) if where else None
+    agg = StreamingAggregator(spec, keep)
+    parsers = []
+    t0 = time.perf_counter()
+    chunks = iter_chunks(spec, path, chunk_size, parsers)
+    while True:
+        with _timer(metrics, "analyze_parse_seconds", spec):
+            chunk = next(chunks, None)
+        if chunk is None:
+            break
+        with _timer(metrics, "analyze_compute_seconds", spec):
+            agg.add_chunk(query.filter(chunk) if query else chunk)
+
+    stats = agg.result(parsers[0] if parsers else None)
+    elapsed = time.perf_counter() - t0
+    rate = stats.draws / elapsed if elapsed > 0 else 0.0
+    print(f"Streamed {stats.draws} draws in {elapsed:.2f}s ({rate:,.0f} draws/sec)")
+    if metrics is not None:
+        metrics.set("analyze_draws_per_second", rate, game=spec.key)
+    return stats
+
+
+# ================== ANALYZER ENTRY POINT ==================
+def analysis_arg_parser(description: str) -> argparse.ArgumentParser:
+    """Options shared by every analyze_*.py script."""
+    ap = argparse.ArgumentParser(description=description)
+    ap.add_argument("--stream", action="store_true",
+                    help="read the CSV in fixed-size chunks with constant memory")
+    ap.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                    help=f"rows per chunk in --stream mode (default {DEFAULT_CHUNK_SIZE})")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="count shards of the CSV in N worker processes (default 1)")
+    ap.add_argument("--where", type=where_arg, default=None,
+                    help="report only draws matching a filter (see below)")
+    ap.add_argument("--current-matrix", action="store_true",
+                    help="report only draws since the game's number range last changed "
+                         "(detected from the data)")
+    add_report_args(ap)
+    ap.epilog = QUERY_HELP
+    ap.formatter_class = argparse.RawDescriptionHelpFormatter
+    return ap
+
+
+def filter_matched_nothing(stats: GameStats, args=None) -> bool:
+    """
+    True (and says so) when the CSV has valid draws but --where, or
+    --current-matrix, kept none of them: the analyzers' "check the CSV"
+    hint would point at the wrong problem.
+    """
+    parsed = stats.rows_read - sum(stats.rejected.values())
+    if stats.draws or not parsed or not (getattr(args, "where", None)
+                                         or getattr(args, "current_matrix", False)):
+        return False
+    print(f"⚠️ --where filter matched 0 of {parsed} draws.")
+    return True
+
+
+def load_stats(spec: GameSpec, path: str, keep: int, args=None, metrics=None) -> GameStats:
+    """
+    Compute GameStats for one game: in memory (default), streaming, or
+    sharded across worker processes. Parse/compute durations and row counts
+    are recorded in metrics. The CSV is read from the data generation this
+    process pinned, so a concurrent fetch never changes it mid-run.
+    With --where, every statistic covers only the matching draws;
+    --current-matrix adds a "since <start of the current range>" clause.
+    """
+    path = str(pinned_path(path or spec.csv_path))
+    workers = getattr(args, "workers", 1) or 1
+    streaming = workers > 1 or (args is not None and args.stream)
+    where = getattr(args, "where", None)
+    table = None
+    if getattr(args, "current_matrix", False):
+        from drift import current_matrix_start, stream_matrix_start
+
+        if streaming:
+            # One extra chunked pass keeping only days and per-draw maxima.
+            start = stream_matrix_start(spec, iter_chunks(spec, path, args.chunk_size))
+        else:
+            with _timer(metrics, "analyze_parse_seconds", spec):
+                table = DrawTable.from_csv(spec, path)
+            start = current_matrix_start(table)
+        if start is None:
+            print("Current matrix: whole history")
+        else:
+            since = f"since {date.fromordinal(start).isoformat()}"
+            where = f"{since} and ({where})" if where else since
+    query = None
+    if where:
+        try:
+            query = compile_query(where, spec)
+        except QueryError as e:
+            raise SystemExit(f"❌ --where: {e}")
+        print("Filter:", where)
+
+    if workers > 1:
+        from parallel import parallel_stats  # parallel imports this module
+
+        with _timer(metrics, "analyze_parse_seconds", spec):
+            stats = parallel_stats(spec, path, keep, workers, args.chunk_size, metrics, where)
+    elif args is not None and args.stream:
+        stats = stream_stats(spec, path, keep, args.chunk_size, metrics, where)
+    else:
+        if table is None:
+            with _timer(metrics, "analyze_parse_seconds", spec):
+                table = DrawTable.from_csv(spec, path)
+        with _timer(metrics, "analyze_compute_seconds", spec):
+            if query is not None:
+                table = query.filter(table)
+            stats = GameStats.from_table(table, keep)
+
+    if metrics is not None:
+        metrics.set("analyze_rows_read", stats.rows_read, game=spec.key)
+        metrics.set("analyze_draws_parsed", stats.draws, game=spec.key)
+        for reason, n in stats.rejected.items():
+            metrics.inc("analyze_rows_rejected_total", n, game=spec.key, reason=reason)
+    return stats
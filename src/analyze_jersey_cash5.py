@@ -1,67 +1,29 @@
 import os
 import sys
-import csv
-import re
 from collections import Counter
 
 sys.path.append("src")
-from common import parse_date  # noqa: E402
+from aggregate import analysis_arg_parser, filter_matched_nothing, load_stats  # noqa: E402
+from buckets import HOT_MIN, MED_MIN, classify_bucket  # noqa: E402
+from common import GAMES, DrawTable, top_n  # noqa: E402
+from report import Report, emit_report  # noqa: E402
+from metrics import Metrics  # noqa: E402
 
 JC5_CSV = "data/nj/jersey_cash5.csv"
 
+METRICS = Metrics("analyze_jersey_cash5")
 
-def normalize_xtra(x: str) -> str:
-    if not x:
-        return "N/A"
-    x = x.strip().upper()
-    if x in ("NA", "N/A", "NONE"):
-        return "N/A"
-    digits = re.findall(r"\d+", x)
-    if not digits:
-        return "N/A"
-    return digits[0]  # "03" -> "03" (we'll display as-is); or make int if you want
+LATEST_N = 10
+LAST_N_FOR_TOP = 50
 
 
-def classify_bucket(freq: int, hot_min: int, med_min: int) -> str:
-    if freq >= hot_min:
-        return "HOT"
-    if freq >= med_min:
-        return "MEDIUM"
-    return "COLD"
+def read_draws(path: str) -> DrawTable:
+    return DrawTable.from_csv(GAMES["jersey_cash5"], path)
 
 
-def top_n(counter: Counter, n: int = 10):
-    return counter.most_common(n)
+def main(argv=None):
+    args = analysis_arg_parser("Jersey Cash 5 frequency analysis").parse_args(argv)
 
-
-def read_draws(path: str):
-    draws = []
-    with open(path, newline="", encoding="utf-8") as f:
-        r = csv.DictReader(f)
-        for row in r:
-            d = (row.get("draw_date") or "").strip()
-            nums = (row.get("numbers") or "").strip()
-            xtra = normalize_xtra(row.get("xtra") or "N/A")
-
-            if not d or not nums:
-                continue
-
-            dt = parse_date(d)
-            if dt is None:
-                continue
-
-            try:
-                balls = list(map(int, nums.split()))
-                if len(balls) != 5:
-                    continue
-            except Exception:
-                continue
-
-            draws.append((d, dt, balls, xtra))
-    return draws
-
-
-def main():
     print("\n===== JERSEY CASH 5 =====")
     print("Looking for:", JC5_CSV)
     print("Exists?:", os.path.exists(JC5_CSV))
@@ -71,88 +33,73 @@ def main():
         print("✅ Fix: Ensure src/fetch_nj_latest.py writes data/nj/jersey_cash5.csv")
         return
 
-    draws = read_draws(JC5_CSV)
-    print("Valid draws parsed:", len(draws))
+    stats = load_stats(GAMES["jersey_cash5"], JC5_CSV, LAST_N_FOR_TOP, args, METRICS)
+    print("Valid draws parsed:", stats.draws)
 
-    if not draws:
-        print("❌ No valid draws found — check CSV contents.")
+    if not stats.draws:
+        if not filter_matched_nothing(stats, args):
+            print("❌ No valid draws found — check CSV contents.")
         return
 
-    draws.sort(key=lambda x: x[1], reverse=True)
+    emit_report(build_report(stats), args)
 
-    latest_d, _, latest_nums, latest_xtra = draws[0]
 
-    print("\nLatest 10 draws")
-    print("-" * 80)
-    for d, _, nums, xtra in draws[:10]:
-        print(f"{d} | Numbers: {' '.join(map(str, nums))} | XTRA: {xtra}")
+def build_report(stats) -> Report:
+    report = Report("jersey_cash5", "JERSEY CASH 5", {"draws": stats.draws, "rows_read": stats.rows_read})
 
-    # frequencies (full)
-    all_nums = []
-    all_xtra = []
-    for _, _, nums, xtra in draws:
-        all_nums.extend(nums)
-        all_xtra.append(xtra)
+    latest = stats.latest[:LATEST_N]
+    latest_d, latest_nums, latest_xtra = latest[0].source_date, latest[0].balls, latest[0].extra
 
-    freq_full = Counter(all_nums)
-    xtra_full = Counter(all_xtra)
+    # frequencies (full)
+    freq_full = stats.ball_counts
+    xtra_full = stats.extra_counts
 
     # last 50
-    last_n = 50
-    last_draws = draws[:last_n]
-    last_nums = []
-    for _, _, nums, _ in last_draws:
-        last_nums.extend(nums)
-    freq_last = Counter(last_nums)
-
-    # thresholds (tune later)
-    HOT_MIN = 210
-    MED_MIN = 180
+    freq_last = stats.window_ball_counts(LAST_N_FOR_TOP)
 
-    print("\nLATEST DRAW SUMMARY")
-    print("-" * 80)
-    print(f"{latest_d} | Numbers: {' '.join(map(str, latest_nums))} | XTRA: {latest_xtra}")
+    draw_cols = ["draw_date", "numbers", "xtra"]
+    draw_fmt = "{0} | Numbers: {1} | XTRA: {2}"
+    report.add("latest_draws", f"Latest {LATEST_N} draws", draw_cols,
+               [(dr.source_date, " ".join(map(str, dr.balls)), dr.extra) for dr in latest],
+               draw_fmt, width=80)
+    report.add("latest_summary", "LATEST DRAW SUMMARY", draw_cols,
+               [(latest_d, " ".join(map(str, latest_nums)), latest_xtra)], draw_fmt, width=80)
 
     # latest draw frequency check
     mix = Counter()
-    print("\nLATEST DRAW: FREQUENCY CHECK (FULL)")
-    print("-" * 80)
+    rows = []
     for n in latest_nums:
         f = freq_full.get(n, 0)
         b = classify_bucket(f, HOT_MIN, MED_MIN)
         mix[b] += 1
-        print(f"{n:2d} -> {f} times -> {b}")
-
-    print("\nLATEST DRAW MIX LABEL")
-    print("-" * 80)
-    print(f"{mix.get('HOT',0)} HOT | {mix.get('MEDIUM',0)} MEDIUM | {mix.get('COLD',0)} COLD")
-
-    print("\nTOP 10 NUMBERS (FULL HISTORY)")
-    print("-" * 80)
-    for n, c in top_n(freq_full, 10):
-        print(f"{n:2d} -> {c} times")
-
-    print("\nTOP 10 NUMBERS (LAST 50 DRAWS)")
-    print("-" * 80)
-    for n, c in top_n(freq_last, 10):
-        print(f"{n:2d} -> {c} times")
-
-    print("\nXTRA FREQUENCY (FULL HISTORY)")
-    print("-" * 80)
-    for k, c in xtra_full.most_common():
-        print(f"{k} -> {c} times")
-
-    print("\nXTRA FREQUENCY (2–5) [FULL]")
-    print("-" * 80)
-    for i in range(2, 6):
-        print(f"{i} -> {xtra_full.get(str(i), 0)} times")
+        rows.append((n, f, b))
+    report.add("latest_check", "LATEST DRAW: FREQUENCY CHECK (FULL)",
+               ["number", "full_count", "bucket"], rows, "{0:2d} -> {1} times -> {2}", width=80)
+    report.add("latest_mix", "LATEST DRAW MIX LABEL", ["hot", "medium", "cold"],
+               [(mix.get("HOT", 0), mix.get("MEDIUM", 0), mix.get("COLD", 0))],
+               "{0} HOT | {1} MEDIUM | {2} COLD", width=80)
+
+    count_fmt = "{0:2d} -> {1} times"
+    report.add("top_full", "TOP 10 NUMBERS (FULL HISTORY)",
+               ["number", "count"], top_n(freq_full, 10), count_fmt, width=80)
+    report.add("top_last", f"TOP 10 NUMBERS (LAST {LAST_N_FOR_TOP} DRAWS)",
+               ["number", "count"], top_n(freq_last, 10), count_fmt, width=80)
+
+    report.add("xtra_full", "XTRA FREQUENCY (FULL HISTORY)",
+               ["xtra", "count"], top_n(xtra_full, None), "{0} -> {1} times", width=80)
+    report.add("xtra_frequency", "XTRA FREQUENCY (2–5) [FULL]",
+               ["xtra", "count"], [(i, xtra_full.get(str(i), 0)) for i in range(2, 6)],
+               "{0} -> {1} times", width=80)
 
     # Full tables (1–45)
-    print("\nNUMBER FREQUENCY (1–45) [FULL]")
-    print("-" * 80)
-    for i in range(1, 46):
-        print(f"{i:2d} -> {freq_full.get(i, 0)} times")
+    report.add("number_frequency", "NUMBER FREQUENCY (1–45) [FULL]",
+               ["number", "count"], [(i, freq_full.get(i, 0)) for i in range(1, 46)],
+               count_fmt, width=80)
+    return report
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        METRICS.write()
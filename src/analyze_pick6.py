@@ -1,37 +1,24 @@
-import re
 from collections import Counter
 from pathlib import Path
 
-from common import parse_date, read_csv
+from aggregate import analysis_arg_parser, filter_matched_nothing, load_stats
+from common import GAMES
+from metrics import Metrics
+from report import Report, emit_report
 
 PICK6_CSV = Path("data/nj/pick6.csv")
-REPORTS_DIR = Path("reports")
 
+METRICS = Metrics("analyze_pick6")
 
-def parse_numbers(s: str) -> list[int]:
-    return [int(x) for x in re.findall(r"\d+", s or "")]
 
+def add_freq_table(report: Report, key: str, title: str, counter: Counter, lo: int, hi: int) -> None:
+    report.add(key, f"{title} ({lo}–{hi})", ["number", "count"],
+               [(n, counter.get(n, 0)) for n in range(lo, hi + 1)], "{0:2d} -> {1} times")
 
-def in_range(nums: list[int], lo: int, hi: int) -> bool:
-    return all(lo <= n <= hi for n in nums)
 
+def main(top_n: int = 10, argv=None) -> None:
+    args = analysis_arg_parser("Pick-6 frequency analysis").parse_args(argv)
 
-def write_frequency_csv(path: Path, counter: Counter, lo: int, hi: int) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8", newline="") as f:
-        f.write("number,count\n")
-        for n in range(lo, hi + 1):
-            f.write(f"{n},{counter.get(n, 0)}\n")
-
-
-def print_freq_table(title: str, counter: Counter, lo: int, hi: int) -> None:
-    print(f"\n{title} ({lo}–{hi})")
-    print("-" * 60)
-    for n in range(lo, hi + 1):
-        print(f"{n:2d} -> {counter.get(n, 0)} times")
-
-
-def main(top_n: int = 10) -> None:
     print("\n===== PICK 6 (NJ) =====")
     print("Looking for:", str(PICK6_CSV))
     print("Exists?:", PICK6_CSV.exists())
@@ -40,77 +27,45 @@ def main(top_n: int = 10) -> None:
         print("⚠️ pick6.csv not found. Skipping Pick 6 analysis.")
         return
 
-    rows = read_csv(str(PICK6_CSV))
-    if not rows:
+    stats = load_stats(GAMES["pick6"], str(PICK6_CSV), top_n, args, METRICS)
+
+    if not stats.rows_read:
         print("⚠️ Warning: CSV exists but has no data rows ->", str(PICK6_CSV))
         print("⚠️ pick6.csv exists but has 0 rows (likely blocked in CI).")
         print("⚠️ Skipping Pick 6 analysis gracefully.")
         return
 
-    draws = []
-    bad = 0
-
-    for r in rows:
-        try:
-            d = (r.get("draw_date") or "").strip()
-            main_str = (r.get("main_numbers") or "").strip()
-            dp_str = (r.get("double_play_numbers") or "").strip()
-
-            if not d or not main_str or not dp_str:
-                bad += 1
-                continue
-
-            main_nums = parse_numbers(main_str)
-            dp_nums = parse_numbers(dp_str)
-
-            if len(main_nums) != 6 or len(dp_nums) != 6:
-                bad += 1
-                continue
-
-            # Pick-6 expected range: 1–46 (adjust if needed)
-            if not in_range(main_nums, 1, 46) or not in_range(dp_nums, 1, 46):
-                bad += 1
-                continue
-
-            draws.append((d, main_nums, dp_nums))
-        except Exception:
-            bad += 1
-
-    if not draws:
-        print("⚠️ No valid Pick-6 draws parsed. Skipping analysis.")
+    if not stats.draws:
+        if not filter_matched_nothing(stats, args):
+            print("⚠️ No valid Pick-6 draws parsed. Skipping analysis.")
         return
 
-    draws.sort(key=lambda x: parse_date(x[0]), reverse=True)
+    saved = emit_report(build_report(stats, top_n), args)
+    if saved:
+        print("\n✅ Saved reports:")
+        for path in saved:
+            print(" -", path)
 
-    # Mega-style latest section
-    print("\nLATEST DRAWS")
-    print("-" * 60)
-    for d, main_nums, dp_nums in draws[:top_n]:
-        main_fmt = " ".join(map(str, main_nums))
-        dp_fmt = " ".join(map(str, dp_nums))
-        print(f"{d} | Main: {main_fmt} | DP: {dp_fmt}")
-
-    # Frequency
-    main_all = []
-    dp_all = []
-    for _, main_nums, dp_nums in draws:
-        main_all.extend(main_nums)
-        dp_all.extend(dp_nums)
 
-    mc = Counter(main_all)
-    dc = Counter(dp_all)
+def build_report(stats, top_n: int = 10) -> Report:
+    report = Report("pick6", "PICK 6 (NJ)", {"draws": stats.draws, "rows_read": stats.rows_read})
 
-    print_freq_table("MAIN BALL FREQUENCY", mc, 1, 46)
-    print_freq_table("DOUBLE PLAY FREQUENCY", dc, 1, 46)
-
-    REPORTS_DIR.mkdir(parents=True, exist_ok=True)
-    write_frequency_csv(REPORTS_DIR / "pick6_main_frequency.csv", mc, 1, 46)
-    write_frequency_csv(REPORTS_DIR / "pick6_double_play_frequency.csv", dc, 1, 46)
+    # Mega-style latest section
+    report.add(
+        "latest_draws", "LATEST DRAWS", ["draw_date", "main_numbers", "double_play_numbers"],
+        [(dr.source_date, " ".join(map(str, dr.balls)), " ".join(map(str, dr.special)))
+         for dr in stats.latest[:top_n]],
+        "{0} | Main: {1} | DP: {2}",
+    )
 
-    print("\n✅ Saved reports:")
-    print(" -", REPORTS_DIR / "pick6_main_frequency.csv")
-    print(" -", REPORTS_DIR / "pick6_double_play_frequency.csv")
+    # Frequency (main balls; Double Play is stored as the special set)
+    add_freq_table(report, "main_frequency", "MAIN BALL FREQUENCY", stats.ball_counts, 1, 46)
+    add_freq_table(report, "double_play_frequency", "DOUBLE PLAY FREQUENCY", stats.special_counts, 1, 46)
+    return report
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        METRICS.write()
@@ -3,54 +3,23 @@ import sys
 from collections import Counter
 
 sys.path.append("src")
-from common import parse_date, read_csv  # noqa: E402
+from aggregate import analysis_arg_parser, filter_matched_nothing, load_stats  # noqa: E402
+from buckets import classify_special_6 as classify_pb_6, classify_white_6  # noqa: E402
+from common import GAMES, top_n  # noqa: E402
+from report import MIX6_LEVELS, Report, emit_report  # noqa: E402
+from metrics import Metrics  # noqa: E402
 
 PB_CSV = "data/nj/powerball.csv"
 
+METRICS = Metrics("analyze_powerball")
+
 LATEST_N = 20
 LAST_N_FOR_TOP = 50
 
 
-# ------------------ 6-level buckets ------------------
-# White balls use your FULL frequency-based ranges (1–69).
-def classify_white_6(freq: int) -> str:
-    if freq >= 225:
-        return "VERY HOT"
-    if 210 <= freq <= 224:
-        return "HOT"
-    if 195 <= freq <= 209:
-        return "MEDIUM"
-    if 180 <= freq <= 194:
-        return "LESS MEDIUM"
-    if 150 <= freq <= 179:
-        return "LOW"
-    return "VERY LOW"
-
-
-# Powerball (1–26) has smaller counts, so we classify relative to max freq in FULL history.
-def classify_pb_6(freq: int, max_freq: int) -> str:
-    if max_freq <= 0:
-        return "VERY LOW"
-
-    # relative bands (tuned for small ranges like 1–26)
-    if freq >= 0.85 * max_freq:
-        return "VERY HOT"
-    if freq >= 0.70 * max_freq:
-        return "HOT"
-    if freq >= 0.55 * max_freq:
-        return "MEDIUM"
-    if freq >= 0.40 * max_freq:
-        return "LESS MEDIUM"
-    if freq >= 0.25 * max_freq:
-        return "LOW"
-    return "VERY LOW"
-
-
-def top_n(counter: Counter, n: int = 10):
-    return counter.most_common(n)
-
-
-def main():
+def main(argv=None):
+    args = analysis_arg_parser("Powerball frequency analysis").parse_args(argv)
+
     print("\n===== POWERBALL =====")
     print("Looking for:", PB_CSV)
     print("Exists?:", os.path.exists(PB_CSV))
@@ -60,145 +29,106 @@ def main():
         print("✅ Fix: Ensure src/fetch_nj_latest.py runs and saves to data/nj/powerball.csv")
         return
 
-    rows = read_csv(PB_CSV)
+    stats = load_stats(GAMES["powerball"], PB_CSV, LAST_N_FOR_TOP, args, METRICS)
 
-    if not rows:
+    if not stats.rows_read:
         print("❌ ERROR: powerball.csv exists but has 0 rows (only header or empty file).")
         print("✅ Fix: Check fetch_nj_latest.py parsing and row-writing logic.")
         return
 
-    draws = []
-    bad_rows = 0
-
-    for r in rows:
-        try:
-            draw_date = (r.get("draw_date") or "").strip()
-            white_str = (r.get("white_numbers") or "").strip()
-            pb_str = (r.get("powerball") or "").strip()
-
-            if not draw_date or not white_str or not pb_str:
-                bad_rows += 1
-                continue
-
-            dt = parse_date(draw_date)
-            if dt is None:
-                bad_rows += 1
-                continue
+    print("Total rows read:", stats.rows_read)
+    print("Valid draws parsed:", stats.draws)
+    print("Bad/Skipped rows:", sum(stats.rejected.values()))
 
-            white = list(map(int, white_str.split()))
-            pb = int(pb_str)
-
-            if len(white) != 5:
-                bad_rows += 1
-                continue
+    if not stats.draws:
+        if not filter_matched_nothing(stats, args):
+            print("❌ ERROR: No valid draws parsed.")
+            print("✅ Fix: Inspect CSV headers/values in data/nj/powerball.csv")
+        return
 
-            draws.append((draw_date, dt, white, pb))
-        except Exception:
-            bad_rows += 1
+    emit_report(build_report(stats), args)
 
-    print("Total rows read:", len(rows))
-    print("Valid draws parsed:", len(draws))
-    print("Bad/Skipped rows:", bad_rows)
 
-    if not draws:
-        print("❌ ERROR: No valid draws parsed.")
-        print("✅ Fix: Inspect CSV headers/values in data/nj/powerball.csv")
-        return
+def build_report(stats) -> Report:
+    report = Report("powerball", "POWERBALL", {"draws": stats.draws, "rows_read": stats.rows_read})
 
-    # Sort newest first
-    draws.sort(key=lambda x: x[1], reverse=True)
+    # Newest first
+    latest = stats.latest[:LATEST_N]
 
-    # Show latest 20 draws (was 10)
-    print(f"\nLatest {LATEST_N} draws")
-    print("-" * 60)
-    for d, _, w, pb in draws[:LATEST_N]:
-        print(f"{d} | White: {' '.join(map(str, w))} | PB: {pb} | Multiplier: N/A")
-
-    # Build FULL-history frequency
-    white_all, pb_all = [], []
-    for _, _, w, pb in draws:
-        white_all.extend(w)
-        pb_all.append(pb)
-
-    white_full = Counter(white_all)
-    pb_full = Counter(pb_all)
+    # FULL-history frequency
+    white_full = stats.ball_counts
+    pb_full = stats.special_counts
     pb_full_max = max(pb_full.values()) if pb_full else 0
 
     # Rolling window (last 50 draws) — unchanged
-    last_draws = draws[:LAST_N_FOR_TOP]
-    white_last, pb_last = [], []
-    for _, _, w, pb in last_draws:
-        white_last.extend(w)
-        pb_last.append(pb)
+    white_last_c = stats.window_ball_counts(LAST_N_FOR_TOP)
+    pb_last_c = stats.window_special_counts(LAST_N_FOR_TOP)
 
-    white_last_c = Counter(white_last)
-    pb_last_c = Counter(pb_last)
-
-    # ---- New: frequency check for EACH of the latest 20 draws (FULL counts) ----
-    print(f"\nLAST {LATEST_N} DRAWS: FREQUENCY CHECK (WHITE BALLS) [FULL]")
-    print("-" * 60)
-
-    for d, _, w, pb in draws[:LATEST_N]:
-        print(f"{d} | White: {' '.join(map(str, w))} | PB: {pb} | Multiplier: N/A")
+    # Show latest 20 draws (was 10)
+    report.add(
+        "latest_draws", f"Latest {LATEST_N} draws", ["draw_date", "white_numbers", "powerball"],
+        [(dr.source_date, " ".join(map(str, dr.balls)), dr.special[0]) for dr in latest],
+        "{0} | White: {1} | PB: {2} | Multiplier: N/A",
+    )
+
+    # ---- Frequency check for EACH of the latest 20 draws (FULL counts) ----
+    rows, mix_rows, text = [], [], []
+    for dr in latest:
+        d, w, pb = dr.source_date, dr.balls, dr.special[0]
+        text.append(f"{d} | White: {' '.join(map(str, w))} | PB: {pb} | Multiplier: N/A")
 
         mix6 = Counter()
         for num in w:
             f = white_full.get(num, 0)  # FULL history count
             b = classify_white_6(f)
             mix6[b] += 1
-            print(f"{num:2d} -> {f} times -> {b}")
-
-        print("\nMIX LABEL (WHITE BALLS)")
-        print(f"{mix6.get('VERY HOT', 0)} VERY HOT | "
-              f"{mix6.get('HOT', 0)} HOT | "
-              f"{mix6.get('MEDIUM', 0)} MEDIUM | "
-              f"{mix6.get('LESS MEDIUM', 0)} LESS MEDIUM | "
-              f"{mix6.get('LOW', 0)} LOW | "
-              f"{mix6.get('VERY LOW', 0)} VERY LOW")
-        print("-" * 35)
-
-    print(f"\nLAST {LATEST_N} DRAWS: FREQUENCY CHECK (POWERBALL) [FULL]")
-    print("-" * 60)
-
-    for d, _, w, pb in draws[:LATEST_N]:
+            rows.append((d, num, f, b))
+            text.append(f"{num:2d} -> {f} times -> {b}")
+
+        mix_rows.append([d] + [mix6.get(level, 0) for level in MIX6_LEVELS])
+        text.append("\nMIX LABEL (WHITE BALLS)")
+        text.append(" | ".join(f"{mix6.get(level, 0)} {level}" for level in MIX6_LEVELS))
+        text.append("-" * 35)
+
+    report.add("latest_white_check", f"LAST {LATEST_N} DRAWS: FREQUENCY CHECK (WHITE BALLS) [FULL]",
+               ["draw_date", "number", "full_count", "bucket"], rows, text=text)
+    report.add("latest_white_mix", None,
+               ["draw_date"] + [level.lower().replace(" ", "_") for level in MIX6_LEVELS], mix_rows)
+
+    rows, text = [], []
+    for dr in latest:
+        d, pb = dr.source_date, dr.special[0]
         pb_freq = pb_full.get(pb, 0)  # FULL history count
         pb_bucket = classify_pb_6(pb_freq, pb_full_max)
-        print(f"{d} | PB: {pb} | Multiplier: N/A")
-        print(f"{pb:2d} -> {pb_freq} times -> {pb_bucket}")
-        print("-" * 35)
+        rows.append((d, pb, pb_freq, pb_bucket))
+        text.append(f"{d} | PB: {pb} | Multiplier: N/A")
+        text.append(f"{pb:2d} -> {pb_freq} times -> {pb_bucket}")
+        text.append("-" * 35)
+
+    report.add("latest_powerball_check", f"LAST {LATEST_N} DRAWS: FREQUENCY CHECK (POWERBALL) [FULL]",
+               ["draw_date", "number", "full_count", "bucket"], rows, text=text)
 
     # ---- Top lists (Full vs Last 50) — unchanged ----
-    print("\nTOP 10 WHITE BALLS (FULL HISTORY)")
-    print("-" * 60)
-    for n, c in top_n(white_full, 10):
-        print(f"{n:2d} -> {c} times")
-
-    print("\nTOP 10 WHITE BALLS (LAST 50 DRAWS)")
-    print("-" * 60)
-    for n, c in top_n(white_last_c, 10):
-        print(f"{n:2d} -> {c} times")
-
-    print("\nTOP 10 POWERBALL NUMBERS (FULL HISTORY)")
-    print("-" * 60)
-    for n, c in top_n(pb_full, 10):
-        print(f"{n:2d} -> {c} times")
-
-    print("\nTOP 10 POWERBALL NUMBERS (LAST 50 DRAWS)")
-    print("-" * 60)
-    for n, c in top_n(pb_last_c, 10):
-        print(f"{n:2d} -> {c} times")
+    count_fmt = "{0:2d} -> {1} times"
+    report.add("top_white_full", "TOP 10 WHITE BALLS (FULL HISTORY)",
+               ["number", "count"], top_n(white_full, 10), count_fmt)
+    report.add("top_white_last", f"TOP 10 WHITE BALLS (LAST {LAST_N_FOR_TOP} DRAWS)",
+               ["number", "count"], top_n(white_last_c, 10), count_fmt)
+    report.add("top_powerball_full", "TOP 10 POWERBALL NUMBERS (FULL HISTORY)",
+               ["number", "count"], top_n(pb_full, 10), count_fmt)
+    report.add("top_powerball_last", f"TOP 10 POWERBALL NUMBERS (LAST {LAST_N_FOR_TOP} DRAWS)",
+               ["number", "count"], top_n(pb_last_c, 10), count_fmt)
 
     # ---- Full distributions — unchanged ----
-    print("\nWHITE BALL FREQUENCY (1–69) [FULL]")
-    print("-" * 60)
-    for i in range(1, 70):
-        print(f"{i:2d} -> {white_full.get(i, 0)} times")
-
-    print("\nPOWERBALL FREQUENCY (1–26) [FULL]")
-    print("-" * 60)
-    for i in range(1, 27):
-        print(f"{i:2d} -> {pb_full.get(i, 0)} times")
+    report.add("white_frequency", "WHITE BALL FREQUENCY (1–69) [FULL]",
+               ["number", "count"], [(i, white_full.get(i, 0)) for i in range(1, 70)], count_fmt)
+    report.add("powerball_frequency", "POWERBALL FREQUENCY (1–26) [FULL]",
+               ["number", "count"], [(i, pb_full.get(i, 0)) for i in range(1, 27)], count_fmt)
+    return report
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        METRICS.write()
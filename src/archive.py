@@ -0,0 +1,181 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import time
+import zlib
+from pathlib import Path
+
+from common import atomic_write_bytes, log
+
+ARCHIVE_DIR = Path("data/archive")
+
+# Response headers worth keeping with a payload
+KEPT_HEADERS = ("Content-Type", "Content-Length", "Content-Encoding", "ETag",
+                "Last-Modified", "Date")
+
+
+class Archive:
+    """
+    Content-addressed store of raw fetched payloads:
+
+        data/archive/objects/ab/abcd....gz   gzip of the payload, named by
+                                             the sha256 of the raw bytes
+        data/archive/manifest.jsonl          one line per download
+
+    Identical payloads share one object, so storage grows only when a
+    source actually changes; the manifest still records every fetch (run,
+    source, URL, time, HTTP status and headers). Failed downloads are
+    recorded without an object, so replaying a run reproduces them too.
+    Objects are written atomically and gzipped with a fixed mtime, so the
+    same payload always yields the same bytes.
+    """
+
+    def __init__(self, root: Path = ARCHIVE_DIR):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.manifest = self.root / "manifest.jsonl"
+
+    # ------------------ objects ------------------
+    def object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}.gz"
+
+    def put(self, payload: bytes) -> tuple[str, bool]:
+        """Store payload; returns (sha256, newly stored)."""
+        digest = hashlib.sha256(payload).hexdigest()
+        path = self.object_path(digest)
+        if path.exists():
+            return digest, False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(path, gzip.compress(payload, mtime=0))
+        return digest, True
+
+    def get(self, digest: str) -> bytes:
+        """
+        Payload for a digest, checked against it. A damaged or truncated
+        object raises ValueError; a missing one FileNotFoundError.
+        """
+        data = self.object_path(digest).read_bytes()
+        try:
+            payload = gzip.decompress(data)
+        except (OSError, EOFError, zlib.error) as e:
+            raise ValueError(f"Archive object {digest} is corrupt ({e})") from e
+        if hashlib.sha256(payload).hexdigest() != digest:
+            raise ValueError(f"Archive object {digest} is corrupt")
+        return payload
+
+    # ------------------ manifest ------------------
+    def record(self, run: str, source: str, url: str, payload, status: int,
+               headers=None, elapsed: float = 0.0) -> dict:
+        """
+        Archive one download (payload None if nothing usable came back)
+        and append its manifest line.
+        """
+        entry = {
+            "run": run,
+            "source": source,
+            "url": url,
+            "fetched_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "status": status,
+            "elapsed": round(elapsed, 3),
+            "headers": {k: headers[k] for k in KEPT_HEADERS if headers and headers.get(k)},
+            "sha256": None,
+            "bytes": 0,
+            "new": False,
+        }
+        if payload is not None:
+            digest, new = self.put(payload)
+            entry.update(sha256=digest, bytes=len(payload), new=new)
+        self.root.mkdir(parents=True, exist_ok=True)
+        # One O_APPEND write per line: concurrent downloads never interleave.
+        line = (json.dumps(entry, sort_keys=True) + "\n").encode("utf-8")
+        fd = os.open(self.manifest, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+        return entry
+
+    def entries(self) -> list[dict]:
+        """Every manifest line, oldest first (unreadable lines skipped)."""
+        out = []
+        try:
+            with self.manifest.open(encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        out.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return out
+
+    def runs(self) -> list[str]:
+        """Run ids in the order they were recorded."""
+        return list(dict.fromkeys(e["run"] for e in self.entries()))
+
+    def snapshot(self, run: str = None) -> dict:
+        """{source: manifest entry} of one run (default: the latest)."""
+        entries = self.entries()
+        if run is None:
+            if not entries:
+                raise FileNotFoundError(f"No archived runs in {self.root}")
+            run = entries[-1]["run"]
+        snap = {e["source"]: e for e in entries if e["run"] == run}
+        if not snap:
+            raise FileNotFoundError(f"No archived run {run!r} in {self.root}")
+        return snap
+
+    def payload(self, entry: dict) -> bytes:
+        """Payload of a manifest entry (b"" for a failed download)."""
+        return self.get(entry["sha256"]) if entry.get("sha256") else b""
+
+    # ------------------ maintenance ------------------
+    def verify(self) -> list[str]:
+        """Digests referenced by the manifest that are missing or corrupt."""
+        bad = []
+        for digest in dict.fromkeys(e["sha256"] for e in self.entries() if e.get("sha256")):
+            try:
+                self.get(digest)
+            except (OSError, ValueError):
+                bad.append(digest)
+        return bad
+
+    def stored_bytes(self) -> int:
+        if not self.objects_dir.exists():
+            return 0
+        return sum(p.stat().st_size for p in self.objects_dir.glob("*/*.gz"))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="List and verify archived raw payloads")
+    ap.add_argument("--archive-dir", default=str(ARCHIVE_DIR),
+                    help=f"archive directory (default {ARCHIVE_DIR})")
+    ap.add_argument("--verify", action="store_true", help="re-hash every archived object")
+    args = ap.parse_args(argv)
+
+    archive = Archive(args.archive_dir)
+    entries = archive.entries()
+    print("\n===== RAW PAYLOAD ARCHIVE =====")
+    print(f"{len(entries)} downloads in {len(archive.runs())} runs | "
+          f"{archive.stored_bytes():,} bytes stored")
+    print("-" * 60)
+    for run in archive.runs():
+        snap = archive.snapshot(run)
+        parts = [f"{src} {e['bytes']:,}B{'*' if e.get('new') else ''}" if e.get("sha256")
+                 else f"{src} failed ({e.get('status')})" for src, e in sorted(snap.items())]
+        print(f"{run} | {' | '.join(parts)}")
+    print("(* = new content in that run)")
+
+    if args.verify:
+        bad = archive.verify()
+        if bad:
+            for digest in bad:
+                log(f"❌ Missing or corrupt object: {digest}")
+        else:
+            print("✅ Every archived object matches its hash.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Frequency buckets shared by the analyzers and games.Game. Importing this
+module has no side effects, unlike importing an analyzer script.
+"""
+
+# Jersey Cash 5 full-history bucket thresholds (tune later)
+HOT_MIN = 210
+MED_MIN = 180
+
+
+# ------------------ 6-level buckets ------------------
+# White balls use your FULL frequency-based ranges (1–69 / 1–70).
+def classify_white_6(freq: int) -> str:
+    if freq >= 225:
+        return "VERY HOT"
+    if 210 <= freq <= 224:
+        return "HOT"
+    if 195 <= freq <= 209:
+        return "MEDIUM"
+    if 180 <= freq <= 194:
+        return "LESS MEDIUM"
+    if 150 <= freq <= 179:
+        return "LOW"
+    return "VERY LOW"
+
+
+def classify_special_6(freq: int, max_freq: int) -> str:
+    """
+    Powerball (1–26) and Mega Ball (1–25) frequencies are much smaller,
+    so we classify relative to FULL-history max frequency.
+    """
+    if max_freq <= 0:
+        return "VERY LOW"
+
+    # relative bands (tuned for small ranges like 1–26)
+    if freq >= 0.85 * max_freq:
+        return "VERY HOT"
+    if freq >= 0.70 * max_freq:
+        return "HOT"
+    if freq >= 0.55 * max_freq:
+        return "MEDIUM"
+    if freq >= 0.40 * max_freq:
+        return "LESS MEDIUM"
+    if freq >= 0.25 * max_freq:
+        return "LOW"
+    return "VERY LOW"
+
+
+def classify_bucket(freq: int, hot_min: int, med_min: int) -> str:
+    if freq >= hot_min:
+        return "HOT"
+    if freq >= med_min:
+        return "MEDIUM"
+    return "COLD"
@@ -0,0 +1,265 @@
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from datetime import date
+from operator import add
+from pathlib import Path
+
+sys.path.append("src")
+from common import GAMES, DrawTable, GameSpec, atomic_write_text, top_n  # noqa: E402
+from generations import pinned_path  # noqa: E402
+
+CUBES_DIR = Path("data/nj/cubes")
+
+# Saved cubes of another format version are rebuilt from the CSV.
+CUBE_VERSION = 2
+
+DIMS = ("year", "month", "weekday")
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+# A cell is one (year, month, weekday) combination, packed into an int.
+def _cell(year: int, month: int, weekday: int) -> int:
+    return (year << 7) | (month << 3) | weekday
+
+
+def _unpack(cell: int) -> tuple[int, int, int]:
+    return cell >> 7, (cell >> 3) & 15, cell & 7
+
+
+def _cell_str(cell: int) -> str:
+    y, m, wd = _unpack(cell)
+    return f"{y}-{m:02d}-{WEEKDAYS[wd]}"
+
+
+def _parse_cell(s: str) -> int:
+    y, m, wd = s.split("-")
+    return _cell(int(y), int(m), WEEKDAYS.index(wd))
+
+
+def _weekday(value) -> int:
+    if isinstance(value, str):
+        return WEEKDAYS.index(value.strip()[:3].title())
+    return int(value)
+
+
+def _count_by_cell(cells: list[int], balls, width: int) -> dict:
+    """Per-cell Counters of balls, from one pass over the ball column."""
+    out = {}
+    if not width:
+        return out
+    keys = [c << 8 for c in cells for _ in range(width)]
+    for key, n in Counter(map(add, keys, balls)).items():
+        cell = key >> 8
+        if cell not in out:
+            out[cell] = Counter()
+        out[cell][key & 255] = n
+    return out
+
+
+class CalendarCube:
+    """
+    Number x (year, month, weekday) draw counts for one game, stored per
+    (year, month, weekday) cell. Any slice, e.g. Saturdays of 2024 or all
+    Mondays, is a sum over matching cells, so it never rescans the draws.
+
+        cube = update_cube("powerball")
+        cube.counts(weekday="Sat")             # Counter of main balls
+        cube.counts(year=2024, special=True)   # Powerballs drawn in 2024
+        cube.by("weekday")                     # {"Mon": Counter, ...}
+    """
+
+    def __init__(self, spec: GameSpec):
+        self.spec = spec
+        self.rows = 0
+        self.last_day = None
+        self.digest = None      # DrawTable.digest() of the draws counted so far
+        self.draws = Counter()  # cell -> draws
+        self.main = {}          # cell -> Counter of main balls
+        self.special = {}       # cell -> Counter of special balls
+
+    # ------------------ building ------------------
+    def add(self, table: DrawTable) -> None:
+        """
+        Add draws (all newer than last_day) in one pass over the columns.
+        The caller sets `digest` afterwards (see update()).
+        """
+        if not len(table):
+            return
+        cells = []
+        for day in table.days:
+            d = date.fromordinal(day)
+            cells.append(_cell(d.year, d.month, d.weekday()))
+        self.draws.update(cells)
+        for store, balls, width in ((self.main, table.balls, self.spec.n_balls),
+                                    (self.special, table.special, self.spec.n_special)):
+            for cell, c in _count_by_cell(cells, balls, width).items():
+                store.setdefault(cell, Counter()).update(c)
+        self.rows += len(table)
+        self.last_day = table.days[-1]
+
+    def update(self, table: DrawTable) -> tuple[int, bool]:
+        """
+        Bring the cube up to date with table. If every draw already counted
+        is unchanged (same count and digest) only newer draws are added;
+        otherwise it is rebuilt. Returns (draws added, rebuilt).
+        """
+        counted = table.until(self.last_day) if self.last_day is not None else None
+        rebuild = (
+            counted is None
+            or len(counted) != self.rows
+            or counted.digest() != self.digest
+        )
+        if rebuild:
+            self.__init__(self.spec)
+            new = table
+        else:
+            new = table[len(counted):]
+        self.add(new)
+        if len(new) or rebuild:
+            self.digest = table.digest()
+        return len(new), rebuild
+
+    # ------------------ queries ------------------
+    def _cells(self, year=None, month=None, weekday=None) -> list[int]:
+        def wanted(value, conv=int):
+            if value is None:
+                return None
+            if isinstance(value, (list, tuple, set, range)):
+                return {conv(v) for v in value}
+            return {conv(value)}
+
+        years, months, weekdays = wanted(year), wanted(month), wanted(weekday, _weekday)
+        out = []
+        for cell in self.draws:
+            y, m, wd = _unpack(cell)
+            if (years is None or y in years) and (months is None or m in months) \
+                    and (weekdays is None or wd in weekdays):
+                out.append(cell)
+        return out
+
+    def counts(self, year=None, month=None, weekday=None, special: bool = False) -> Counter:
+        """
+        Ball counts over draws matching every given filter. Each filter is a
+        value or a collection of values; weekday takes 0-6 or a name.
+        """
+        store = self.special if special else self.main
+        out = Counter()
+        for cell in self._cells(year, month, weekday):
+            out.update(store.get(cell, ()))
+        return out
+
+    def draw_count(self, year=None, month=None, weekday=None) -> int:
+        return sum(self.draws[cell] for cell in self._cells(year, month, weekday))
+
+    def values(self, dim: str) -> list:
+        """Values of a dimension that have draws (weekdays as names)."""
+        idx = DIMS.index(dim)
+        found = sorted({_unpack(cell)[idx] for cell in self.draws})
+        return [WEEKDAYS[v] for v in found] if dim == "weekday" else found
+
+    def by(self, dim: str, special: bool = False) -> dict:
+        """{value: Counter} for every value of one dimension."""
+        return {v: self.counts(special=special, **{dim: v}) for v in self.values(dim)}
+
+    # ------------------ persistence ------------------
+    def to_dict(self) -> dict:
+        # Sparse {number: count} per cell: numbers outside the game's current
+        # range (older matrices) are kept like any other.
+        def sparse(store):
+            return {_cell_str(cell): {str(n): k for n, k in sorted(c.items())}
+                    for cell, c in sorted(store.items())}
+
+        return {
+            "version": CUBE_VERSION,
+            "game": self.spec.key,
+            "rows": self.rows,
+            "last_day": self.last_day,
+            "last_date": date.fromordinal(self.last_day).isoformat() if self.last_day else None,
+            "digest": self.digest,
+            "draws": {_cell_str(cell): n for cell, n in sorted(self.draws.items())},
+            "main": sparse(self.main),
+            "special": sparse(self.special),
+        }
+
+    @classmethod
+    def from_dict(cls, spec: GameSpec, data: dict) -> "CalendarCube":
+        cube = cls(spec)
+        cube.rows = data["rows"]
+        cube.last_day = data["last_day"]
+        cube.digest = data["digest"]
+        cube.draws = Counter({_parse_cell(k): n for k, n in data["draws"].items()})
+        for store, key in ((cube.main, "main"), (cube.special, "special")):
+            for k, counts in data[key].items():
+                store[_parse_cell(k)] = Counter({int(n): c for n, c in counts.items()})
+        return cube
+
+    def save(self, path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(path, json.dumps(self.to_dict(), separators=(",", ":")) + "\n")
+
+    @classmethod
+    def load(cls, spec: GameSpec, path) -> "CalendarCube":
+        """The saved cube, or an empty one if missing or unreadable."""
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls(spec)
+        if data.get("game") != spec.key or data.get("version") != CUBE_VERSION:
+            return cls(spec)
+        return cls.from_dict(spec, data)
+
+
+def cube_path(spec: GameSpec, cubes_dir: Path = CUBES_DIR) -> Path:
+    return Path(cubes_dir) / f"{spec.key}_calendar.json"
+
+
+def update_cube(spec_key: str, path: str = None, cubes_dir: Path = CUBES_DIR,
+                verbose: bool = False) -> CalendarCube:
+    """Load the persisted cube for a game, fold in new draws and save it."""
+    spec = GAMES[spec_key]
+    out = cube_path(spec, cubes_dir)
+    cube = CalendarCube.load(spec, out)
+    added, rebuilt = cube.update(DrawTable.from_csv(spec, str(pinned_path(path or spec.csv_path))))
+    if added or rebuilt:
+        cube.save(out)
+    if verbose:
+        mode = "rebuilt" if rebuilt else "incremental"
+        print(f"✅ {spec.key}: {cube.rows} draws in cube, {added} added ({mode}) -> {out}")
+    return cube
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Number frequencies by draw weekday, month and year")
+    ap.add_argument("--games", default=",".join(GAMES),
+                    help=f"comma-separated games (default {','.join(GAMES)})")
+    ap.add_argument("--by", choices=DIMS, default="weekday", help="dimension to break down by")
+    ap.add_argument("--special", action="store_true", help="special balls instead of main balls")
+    ap.add_argument("--top", type=int, default=5, help="numbers shown per value (default 5)")
+    ap.add_argument("--cubes-dir", default=str(CUBES_DIR))
+    args = ap.parse_args(argv)
+
+    print("\n===== CALENDAR CUBE =====")
+    for key in [g.strip() for g in args.games.split(",") if g.strip()]:
+        spec = GAMES[key]
+        if not os.path.exists(spec.csv_path):
+            print(f"⚠️ {spec.csv_path} not found. Skipping {key}.")
+            continue
+        cube = update_cube(key, cubes_dir=Path(args.cubes_dir), verbose=True)
+        if args.special and not spec.n_special:
+            continue
+
+        ball = spec.special_label if args.special else "main"
+        print(f"\n{spec.title}: top {args.top} {ball} numbers by {args.by}")
+        print("-" * 60)
+        for value, counts in cube.by(args.by, args.special).items():
+            draws = cube.draw_count(**{args.by: value})
+            top = ", ".join(f"{n} ({c})" for n, c in top_n(counts, args.top))
+            print(f"{value} | draws: {draws} | {top}")
+
+
+if __name__ == "__main__":
+    main()
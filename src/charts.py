@@ -0,0 +1,215 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.append("src")
+from aggregate import GameStats  # noqa: E402
+from common import GAMES, DrawTable, top_n  # noqa: E402
+from generations import pinned_path  # noqa: E402
+
+CHARTS_DIR = Path("reports/charts")
+
+LAST_N_FOR_TOP = 50
+SERIES_TOP = 5
+
+
+# ================== CHART JOBS ==================
+# A job is a plain dict (kind, title, data, path) so it pickles cheaply to
+# workers. Building jobs never touches matplotlib.
+def job_hash(job: dict) -> str:
+    payload = json.dumps({k: job[k] for k in ("kind", "title", "data")}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def frequency_job(out_dir: Path, key: str, title: str, counts, hi: int) -> dict:
+    return {
+        "kind": "bar",
+        "title": title,
+        "data": {"x": list(range(1, hi + 1)), "y": [counts.get(n, 0) for n in range(1, hi + 1)]},
+        "path": str(out_dir / f"{key}.png"),
+    }
+
+
+def window_job(out_dir: Path, key: str, title: str, full, last, draws: int, window: int,
+               hi: int) -> dict:
+    """Full vs last-N as appearances per draw, so both fit on one axis."""
+    window = max(min(window, draws), 1)
+    xs = list(range(1, hi + 1))
+    return {
+        "kind": "compare",
+        "title": title,
+        "data": {
+            "x": xs,
+            "full": [full.get(n, 0) / max(draws, 1) for n in xs],
+            "last": [last.get(n, 0) / window for n in xs],
+            "labels": ["Full history", f"Last {window} draws"],
+        },
+        "path": str(out_dir / f"{key}.png"),
+    }
+
+
+def series_job(out_dir: Path, key: str, title: str, table: DrawTable, numbers: list[int]) -> dict:
+    """Cumulative appearances over time for the given main-ball numbers."""
+    w = table.spec.n_balls
+    wanted = set(numbers)
+    running = {n: 0 for n in numbers}
+    series = {n: [] for n in numbers}
+    for i in range(len(table)):
+        for n in table.balls[i * w:(i + 1) * w]:
+            if n in wanted:
+                running[n] += 1
+        for n in numbers:
+            series[n].append(running[n])
+    return {
+        "kind": "series",
+        "title": title,
+        "data": {
+            "days": list(table.days),
+            "series": {str(n): series[n] for n in numbers},
+        },
+        "path": str(out_dir / f"{key}.png"),
+    }
+
+
+def game_jobs(spec_key: str, path: str = None, out_dir: Path = CHARTS_DIR,
+              numbers: list[int] = None, window: int = LAST_N_FOR_TOP) -> list[dict]:
+    spec = GAMES[spec_key]
+    table = DrawTable.from_csv(spec, str(pinned_path(path or spec.csv_path)))
+    if not table:
+        return []
+    stats = GameStats.from_table(table, window)
+    title = spec.title.title()
+
+    jobs = [
+        frequency_job(out_dir, f"{spec.key}_frequency", f"{title}: main ball frequency (full history)",
+                      stats.ball_counts, spec.ball_max),
+        window_job(out_dir, f"{spec.key}_last_vs_full", f"{title}: last {window} draws vs full history",
+                   stats.ball_counts, stats.window_ball_counts(window), stats.draws, window,
+                   spec.ball_max),
+    ]
+    if spec.n_special:
+        label = spec.special_label
+        jobs.append(frequency_job(out_dir, f"{spec.key}_{label.lower()}_frequency",
+                                  f"{title}: {label} frequency (full history)",
+                                  stats.special_counts, spec.special_max))
+        jobs.append(window_job(out_dir, f"{spec.key}_{label.lower()}_last_vs_full",
+                               f"{title}: {label} last {window} draws vs full history",
+                               stats.special_counts, stats.window_special_counts(window),
+                               stats.draws, window, spec.special_max))
+
+    numbers = numbers or [n for n, _ in top_n(stats.ball_counts, SERIES_TOP)]
+    jobs.append(series_job(out_dir, f"{spec.key}_series",
+                           f"{title}: cumulative appearances", table, numbers))
+    return jobs
+
+
+# ================== RENDERING (worker side) ==================
+def render_job(job: dict) -> str:
+    """Render one chart with the Agg backend. matplotlib is imported here only."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from datetime import date
+
+    data = job["data"]
+    fig, ax = plt.subplots(figsize=(12, 4.5))
+    if job["kind"] == "bar":
+        ax.bar(data["x"], data["y"], color="#4c72b0")
+        ax.set_xlabel("Number")
+        ax.set_ylabel("Times drawn")
+    elif job["kind"] == "compare":
+        xs = data["x"]
+        ax.bar([x - 0.2 for x in xs], data["full"], width=0.4, label=data["labels"][0])
+        ax.bar([x + 0.2 for x in xs], data["last"], width=0.4, label=data["labels"][1])
+        ax.set_xlabel("Number")
+        ax.set_ylabel("Appearances per draw")
+        ax.legend()
+    elif job["kind"] == "series":
+        dates = [date.fromordinal(d) for d in data["days"]]
+        for n, ys in data["series"].items():
+            ax.plot(dates, ys, label=n)
+        ax.set_xlabel("Draw date")
+        ax.set_ylabel("Cumulative appearances")
+        ax.legend(title="Number")
+    else:
+        raise ValueError(f"Unknown chart kind: {job['kind']}")
+
+    ax.set_title(job["title"])
+    fig.tight_layout()
+    fig.savefig(job["path"], dpi=100)
+    plt.close(fig)
+    return job["path"]
+
+
+def render_all(jobs: list[dict], workers: int = None, force: bool = False) -> tuple[list, list]:
+    """
+    Render jobs whose input hash changed, spread across a process pool.
+    Hashes live next to each PNG as <name>.png.sha256.
+    Returns (rendered, skipped) paths.
+    """
+    todo, skipped = [], []
+    for job in jobs:
+        digest = job_hash(job)
+        stamp = Path(job["path"] + ".sha256")
+        if not force and Path(job["path"]).exists() and stamp.exists() \
+                and stamp.read_text(encoding="utf-8").strip() == digest:
+            skipped.append(job["path"])
+            continue
+        todo.append((job, stamp, digest))
+
+    rendered = []
+    if todo:
+        Path(todo[0][0]["path"]).parent.mkdir(parents=True, exist_ok=True)
+        workers = max(1, min(workers or os.cpu_count() or 1, len(todo)))
+        if workers == 1:
+            paths = [render_job(job) for job, _, _ in todo]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                paths = list(pool.map(render_job, [job for job, _, _ in todo]))
+        for (job, stamp, digest), path in zip(todo, paths):
+            stamp.write_text(digest + "\n", encoding="utf-8")
+            rendered.append(path)
+    return rendered, skipped
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Render frequency charts for every game")
+    ap.add_argument("--games", default=",".join(GAMES),
+                    help=f"comma-separated games (default {','.join(GAMES)})")
+    ap.add_argument("--numbers", default="",
+                    help="main-ball numbers for the time-series chart (default: top 5)")
+    ap.add_argument("--out-dir", default=str(CHARTS_DIR))
+    ap.add_argument("--workers", type=int, default=None, help="render processes (default: CPUs)")
+    ap.add_argument("--force", action="store_true", help="re-render even if inputs are unchanged")
+    args = ap.parse_args(argv)
+
+    out_dir = Path(args.out_dir)
+    numbers = [int(x) for x in args.numbers.split(",") if x.strip()]
+
+    print("\n===== CHARTS =====")
+    jobs = []
+    for key in [g.strip() for g in args.games.split(",") if g.strip()]:
+        spec = GAMES[key]
+        if not os.path.exists(spec.csv_path):
+            print(f"⚠️ {spec.csv_path} not found. Skipping {key} charts.")
+            continue
+        jobs.extend(game_jobs(key, out_dir=out_dir, numbers=numbers or None))
+
+    try:
+        rendered, skipped = render_all(jobs, args.workers, args.force)
+    except ImportError:
+        print("❌ ERROR: matplotlib is not installed.")
+        print("✅ Fix: python -m pip install matplotlib")
+        return
+    print(f"✅ Charts rendered: {len(rendered)} | unchanged (skipped): {len(skipped)}")
+    for path in rendered:
+        print(" -", path)
+
+
+if __name__ == "__main__":
+    main()
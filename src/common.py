@@ -1,6 +1,22 @@
 import csv
+import hashlib
 import os
-from datetime import datetime
+import re
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+
+DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%m/%d/%Y",
+    "%Y-%m-%dT%H:%M:%S",
+]
 
 
 def parse_date(d: str, strict: bool = False) -> datetime:
@@ -22,13 +38,7 @@ def parse_date(d: str, strict: bool = False) -> datetime:
 
     d = d.strip()
 
-    formats = [
-        "%Y-%m-%d",
-        "%m/%d/%Y",
-        "%Y-%m-%dT%H:%M:%S",
-    ]
-
-    for fmt in formats:
+    for fmt in DATE_FORMATS:
         try:
             return datetime.strptime(d, fmt)
         except ValueError:
@@ -54,3 +64,499 @@ def read_csv(path: str):
         print(f"⚠️ Warning: CSV exists but has no data rows -> {path}")
 
     return rows
+
+
+def log(*args) -> None:
+    """print() for worker threads: one write per line, so lines never interleave."""
+    sys.stdout.write(" ".join(map(str, args)) + "\n")
+
+
+# mkstemp creates files 0600; atomic writes restore the usual umask-based mode.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def atomic_write_text(path, text: str) -> None:
+    """
+    Write text to path atomically: write a temp file in the same directory,
+    fsync it, then rename over the target. Readers never see a partial file.
+    """
+    atomic_write_bytes(path, text.encode("utf-8"))
+
+
+def atomic_write_bytes(path, data: bytes) -> None:
+    """atomic_write_text for binary content."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, 0o666 & ~_UMASK)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+# ================== NORMALIZERS ==================
+def normalize_multiplier(m: str) -> str:
+    """
+    Normalize multiplier values to:
+      - "2X", "3X", ... or "N/A"
+    """
+    if not m:
+        return "N/A"
+    m = m.strip().upper()
+    if m in ("NA", "N/A", "NONE"):
+        return "N/A"
+    digits = re.findall(r"\d+", m)
+    if not digits:
+        return "N/A"
+    return f"{digits[0]}X"
+
+
+def normalize_xtra(x: str) -> str:
+    """
+    Normalize XTRA to:
+      - "N/A" or a single digit (2/3/4/5 etc)
+    """
+    if not x:
+        return "N/A"
+    x = x.strip().upper()
+    if x in ("NA", "N/A", "NONE"):
+        return "N/A"
+    digits = re.findall(r"\d+", x)
+    if not digits:
+        return "N/A"
+    return digits[0]
+
+
+def top_n(counter: Counter, n: int = 10):
+    """
+    Most common (key, count) pairs. Ties are broken by key so the result
+    does not depend on the order draws were counted in.
+    """
+    items = sorted(counter.items(), key=lambda kv: (-kv[1], kv[0]))
+    return items if n is None else items[:n]
+
+
+# ================== GAMES ==================
+class GameSpec(NamedTuple):
+    """
+    Shape of one game's CSV in data/nj.
+
+    balls_col holds the main numbers (n_balls of 1..ball_max). special_col is
+    the bonus ball(s): Powerball / Mega Ball (1 number) or Pick-6 Double Play
+    (a second set of 6). extra_col is a label column (multiplier / XTRA).
+    """
+    key: str
+    title: str
+    csv_path: str
+    balls_col: str
+    n_balls: int
+    ball_max: int
+    special_col: str = ""
+    n_special: int = 0
+    special_max: int = 0
+    special_label: str = ""
+    extra_col: str = ""
+    extra_normalizer: Callable = None
+    # Reject rows with numbers outside 1..max (otherwise they are kept as-is)
+    enforce_range: bool = False
+
+
+GAMES = {
+    "powerball": GameSpec(
+        "powerball", "POWERBALL", "data/nj/powerball.csv",
+        "white_numbers", 5, 69,
+        special_col="powerball", n_special=1, special_max=26, special_label="PB",
+    ),
+    "mega": GameSpec(
+        "mega", "MEGA MILLIONS", "data/nj/mega_millions.csv",
+        "white_numbers", 5, 70,
+        special_col="mega_ball", n_special=1, special_max=25, special_label="MB",
+        extra_col="multiplier", extra_normalizer=normalize_multiplier,
+    ),
+    "jersey_cash5": GameSpec(
+        "jersey_cash5", "JERSEY CASH 5", "data/nj/jersey_cash5.csv",
+        "numbers", 5, 45,
+        extra_col="xtra", extra_normalizer=normalize_xtra,
+    ),
+    "pick6": GameSpec(
+        "pick6", "PICK 6 (NJ)", "data/nj/pick6.csv",
+        "main_numbers", 6, 46,
+        special_col="double_play_numbers", n_special=6, special_max=46, special_label="DP",
+        enforce_range=True,
+    ),
+}
+
+
+# ================== DATES AS DAY ORDINALS ==================
+def _iso_ordinal(s: str) -> int:
+    return date.fromisoformat(s[:10]).toordinal()
+
+
+def _us_ordinal(s: str) -> int:
+    mm, dd, yyyy = s[:10].split("/")
+    return date(int(yyyy), int(mm), int(dd)).toordinal()
+
+
+_ORDINAL_PARSERS = {
+    "%Y-%m-%d": _iso_ordinal,
+    "%Y-%m-%dT%H:%M:%S": _iso_ordinal,
+    "%m/%d/%Y": _us_ordinal,
+}
+
+
+def infer_date_format(value: str):
+    """
+    Guess the date format of a column from one sample value.
+    ISO dates are recognised without calling strptime.
+    """
+    value = (value or "").strip()
+    if len(value) >= 10 and value[4] == "-" and value[7] == "-":
+        return "%Y-%m-%d"
+    for fmt in DATE_FORMATS:
+        try:
+            datetime.strptime(value, fmt)
+            return fmt
+        except ValueError:
+            continue
+    return None
+
+
+def to_ordinal(value) -> int:
+    """
+    Day ordinal from an int (returned as-is), date/datetime or date string.
+    """
+    if isinstance(value, int):
+        return value
+    if isinstance(value, datetime):
+        return value.toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    dt = parse_date(str(value), strict=True)
+    return dt.toordinal()
+
+
+def parse_numbers(s: str) -> list[int]:
+    """
+    Space-separated numbers ("01 22 33"), falling back to any digit runs.
+    """
+    try:
+        return [int(x) for x in s.split()]
+    except ValueError:
+        return [int(x) for x in re.findall(r"\d+", s)]
+
+
+# ================== DRAW RECORDS ==================
+class Draw:
+    """
+    One draw: day ordinal, main balls, special ball(s) and extra label.
+    `fmt` is the date format of the CSV it came from, if known.
+    """
+
+    __slots__ = ("day", "balls", "special", "extra", "fmt")
+
+    def __init__(self, day: int, balls: tuple, special: tuple = (), extra: str = "", fmt: str = None):
+        self.day = day
+        self.balls = balls
+        self.special = special
+        self.extra = extra
+        self.fmt = fmt
+
+    @property
+    def date(self) -> date:
+        return date.fromordinal(self.day)
+
+    @property
+    def date_str(self) -> str:
+        return self.date.isoformat()
+
+    @property
+    def source_date(self) -> str:
+        """The date as the CSV writes it (e.g. 06/08/2026), for console output."""
+        return self.date.strftime(self.fmt) if self.fmt else self.date_str
+
+    def __repr__(self) -> str:
+        return f"Draw({self.date_str}, {self.balls}, {self.special}, {self.extra!r})"
+
+
+class DrawParser:
+    """
+    Turns raw CSV records (lists) into (day, balls, special, extra) tuples
+    for one game. The date format is inferred from the first dated row and
+    reused for the rest of the column; rows that do not match fall back to
+    parse_date(). Rejected rows are counted by reason in `rejected`. If the
+    header lacks a required column, `missing` names it and every row is
+    rejected, so callers report "no valid draws" instead of crashing.
+    """
+
+    def __init__(self, spec: GameSpec, header: list[str]):
+        self.spec = spec
+        self.rejected = Counter()
+        self.rows_read = 0
+        self.date_format = None
+        self._date_parser = None
+
+        idx = {name.strip(): i for i, name in enumerate(header)}
+        missing = [c for c in (spec.balls_col, spec.special_col) if c and c not in idx]
+        if "draw_date" not in idx:
+            missing.insert(0, "draw_date")
+        self.missing = missing
+        if missing:
+            return
+
+        self._i_date = idx["draw_date"]
+        self._i_balls = idx[spec.balls_col]
+        self._i_special = idx[spec.special_col] if spec.special_col else None
+        self._i_extra = idx.get(spec.extra_col) if spec.extra_col else None
+        self._width = max(self._i_date, self._i_balls, self._i_special or 0) + 1
+
+    def _day(self, s: str):
+        if self._date_parser is None:
+            fmt = infer_date_format(s)
+            if fmt is None:
+                return None
+            self.date_format = fmt
+            self._date_parser = _ORDINAL_PARSERS[fmt]
+        try:
+            return self._date_parser(s)
+        except (ValueError, IndexError):
+            dt = parse_date(s)
+            return dt.toordinal() if dt else None
+
+    def parse(self, rec: list[str]):
+        """Parsed tuple, or None (and a counted reason) for a bad row."""
+        spec = self.spec
+        if not rec:
+            return None  # blank line (csv.DictReader skips these too)
+        self.rows_read += 1
+        if self.missing:
+            self.rejected["missing_columns"] += 1
+            return None
+        if len(rec) < self._width:
+            self.rejected["missing_fields"] += 1
+            return None
+
+        d = rec[self._i_date].strip()
+        balls_s = rec[self._i_balls].strip()
+        special_s = rec[self._i_special].strip() if self._i_special is not None else ""
+        if not d or not balls_s or (self._i_special is not None and not special_s):
+            self.rejected["missing_fields"] += 1
+            return None
+
+        day = self._day(d)
+        if day is None:
+            self.rejected["bad_date"] += 1
+            return None
+
+        balls = parse_numbers(balls_s)
+        special = parse_numbers(special_s) if special_s else []
+        if len(balls) != spec.n_balls or len(special) != spec.n_special:
+            self.rejected["bad_numbers"] += 1
+            return None
+
+        if spec.enforce_range:
+            ok = all(1 <= n <= spec.ball_max for n in balls) and all(
+                1 <= n <= spec.special_max for n in special
+            )
+        else:
+            ok = all(0 <= n <= 255 for n in balls) and all(0 <= n <= 255 for n in special)
+        if not ok:
+            self.rejected["out_of_range"] += 1
+            return None
+
+        extra = ""
+        if self._i_extra is not None:
+            raw = rec[self._i_extra] if self._i_extra < len(rec) else ""
+            extra = spec.extra_normalizer(raw) if spec.extra_normalizer else raw.strip()
+
+        return day, balls, special, extra
+
+
+class DrawTable:
+    """
+    Columnar draw history for one game, sorted oldest -> newest.
+
+    Storage is compact arrays: `days` (int day ordinals), `balls` (n_balls
+    bytes per draw), `special` (n_special bytes per draw) and `extra_codes`
+    indexing into `extra_values`. Date-range queries (since/until/between)
+    are binary searches over `days` and return zero-copy-ish slices.
+    `date_format` is the CSV's date format, kept for console output.
+    """
+
+    __slots__ = ("spec", "days", "balls", "special", "extra_codes", "extra_values",
+                 "rows_read", "rejected", "date_format")
+
+    def __init__(self, spec: GameSpec, days=None, balls=None, special=None,
+                 extra_codes=None, extra_values=None, date_format: str = None):
+        self.spec = spec
+        self.days = days if days is not None else array("l")
+        self.balls = balls if balls is not None else array("B")
+        self.special = special if special is not None else array("B")
+        self.extra_codes = extra_codes if extra_codes is not None else array("B")
+        self.extra_values = extra_values if extra_values is not None else []
+        self.rows_read = 0
+        self.rejected = Counter()
+        self.date_format = date_format
+
+    # ------------------ building ------------------
+    @classmethod
+    def from_records(cls, spec: GameSpec, header: list[str], records,
+                     parser: DrawParser = None) -> "DrawTable":
+        """
+        Build a table from raw CSV records. Pass a shared `parser` when
+        building several chunks of one file so the date format is inferred
+        once and rows_read/rejected accumulate across chunks.
+        """
+        parser = parser or DrawParser(spec, header)
+        table = cls(spec)
+        codes = {}
+        for rec in records:
+            parsed = parser.parse(rec)
+            if parsed is not None:
+                table._append(parsed, codes)
+        table.rows_read = parser.rows_read
+        table.rejected = parser.rejected
+        table.date_format = parser.date_format
+        table._sort()
+        return table
+
+    @classmethod
+    def from_csv(cls, spec: GameSpec, path: str = None) -> "DrawTable":
+        path = path or spec.csv_path
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"CSV file not found: {path}")
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return cls(spec)
+            return cls.from_records(spec, header, reader)
+
+    def _append(self, parsed: tuple, codes: dict) -> None:
+        day, balls, special, extra = parsed
+        self.days.append(day)
+        self.balls.extend(balls)
+        self.special.extend(special)
+        code = codes.get(extra)
+        if code is None:
+            code = codes[extra] = len(self.extra_values)
+            self.extra_values.append(extra)
+        self.extra_codes.append(code)
+
+    def _sort(self) -> None:
+        days = self.days
+        n = len(days)
+        if all(days[i] <= days[i + 1] for i in range(n - 1)):
+            return
+        if all(days[i] > days[i + 1] for i in range(n - 1)):
+            order = range(n - 1, -1, -1)
+        else:
+            order = sorted(range(n), key=days.__getitem__)
+        sorted_t = self.take(order)
+        self.days, self.balls, self.special, self.extra_codes = (
+            sorted_t.days, sorted_t.balls, sorted_t.special, sorted_t.extra_codes
+        )
+
+    def take(self, order) -> "DrawTable":
+        """Table of the draws at the given indices, in that order."""
+        wb, ws = self.spec.n_balls, self.spec.n_special
+        out = DrawTable(self.spec, extra_values=self.extra_values, date_format=self.date_format)
+        for i in order:
+            out.days.append(self.days[i])
+            out.balls.extend(self.balls[i * wb:(i + 1) * wb])
+            if ws:
+                out.special.extend(self.special[i * ws:(i + 1) * ws])
+            out.extra_codes.append(self.extra_codes[i])
+        return out
+
+    # ------------------ access ------------------
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step != 1:
+                return self.take(range(start, stop, step))
+            return self._slice(start, stop)
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("draw index out of range")
+        wb, ws = self.spec.n_balls, self.spec.n_special
+        return Draw(
+            self.days[i],
+            tuple(self.balls[i * wb:(i + 1) * wb]),
+            tuple(self.special[i * ws:(i + 1) * ws]),
+            self.extra_values[self.extra_codes[i]] if self.extra_values else "",
+            self.date_format,
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def _slice(self, start: int, stop: int) -> "DrawTable":
+        wb, ws = self.spec.n_balls, self.spec.n_special
+        out = DrawTable(
+            self.spec,
+            self.days[start:stop],
+            self.balls[start * wb:stop * wb],
+            self.special[start * ws:stop * ws],
+            self.extra_codes[start:stop],
+            self.extra_values,
+            self.date_format,
+        )
+        return out
+
+    def newest(self, n: int) -> list[Draw]:
+        """Latest n draws, newest first."""
+        return [self[i] for i in range(len(self) - 1, max(len(self) - n, 0) - 1, -1)]
+
+    def last(self, n: int) -> "DrawTable":
+        """Table of the latest n draws (the rolling window)."""
+        return self._slice(max(len(self) - n, 0), len(self))
+
+    # ------------------ date ranges ------------------
+    def since(self, start) -> "DrawTable":
+        """Draws on or after start (day ordinal, date or date string)."""
+        return self._slice(bisect_left(self.days, to_ordinal(start)), len(self))
+
+    def until(self, end) -> "DrawTable":
+        """Draws on or before end."""
+        return self._slice(0, bisect_right(self.days, to_ordinal(end)))
+
+    def between(self, start, end) -> "DrawTable":
+        lo = bisect_left(self.days, to_ordinal(start))
+        hi = bisect_right(self.days, to_ordinal(end))
+        return self._slice(lo, max(lo, hi))
+
+    def digest(self) -> str:
+        """sha256 of every draw's date, balls, special balls and extra label, in order."""
+        h = hashlib.sha256()
+        h.update(",".join(map(str, self.days)).encode("ascii"))
+        h.update(bytes(self.balls))
+        h.update(bytes(self.special))
+        if self.extra_values:
+            h.update("\n".join(self.extra_values[c] for c in self.extra_codes).encode("utf-8"))
+        return h.hexdigest()
+
+    # ------------------ counting ------------------
+    def ball_counts(self) -> Counter:
+        return Counter(self.balls)
+
+    def special_counts(self) -> Counter:
+        return Counter(self.special)
+
+    def extra_counts(self) -> Counter:
+        codes = Counter(self.extra_codes)
+        return Counter({self.extra_values[c]: n for c, n in codes.items()})
@@ -0,0 +1,329 @@
+import argparse
+import os
+import sys
+import time
+from array import array
+from datetime import date
+from itertools import accumulate, chain
+from math import ceil, log, log1p, log2
+from typing import NamedTuple
+
+sys.path.append("src")
+from common import GAMES, DrawTable, GameSpec  # noqa: E402
+from generations import pinned_path  # noqa: E402
+from randomness import chi2_sf  # noqa: E402
+from transitions import occurrence_bitsets  # noqa: E402
+
+DEFAULT_RECENT = 100
+DEFAULT_REFERENCE = 500
+
+# Windows overlap heavily, so a single position needs strong evidence.
+ALPHA = 0.001
+
+# A full era window must miss the top number with at most this probability
+# before a lower observed maximum counts as a narrower (older) range.
+MISS_PROB = 1e-6
+
+
+class Era(NamedTuple):
+    """Draws [start, end) that share one number range 1..top."""
+    start: int
+    end: int
+    top: int
+
+
+class DriftPoint(NamedTuple):
+    """Recent window [position - recent, position) vs its reference window."""
+    position: int
+    chi2: float
+    df: int
+    p: float
+    js: float
+
+
+# ================== MATRIX ERAS ==================
+def draw_maxima(values, width: int) -> list[int]:
+    """Largest number of every draw, column-wise."""
+    if width == 1:
+        return list(values)
+    return list(map(max, *(values[j::width] for j in range(width))))
+
+
+def probe_length(width: int, hi: int) -> int:
+    """Draws after which every number of 1..hi has shown up w.p. >= 1 - MISS_PROB."""
+    return max(1, ceil(log(MISS_PROB) / log1p(-width / hi)))
+
+
+def detect_eras(maxima: list[int], probe: int) -> list[Era]:
+    """
+    Split a history into spans with one number range ("matrix"), oldest
+    first, from per-draw maxima alone. Walking back from the newest draw in
+    `probe`-draw windows, the current range ends where a window
+
+      - holds a number above the current top: an older, wider range, which
+        ends with its last draw above our top (exact), or
+      - never reaches the current top although a full window would almost
+        surely have: an older, narrower range, replaced at the first draw
+        that uses a number beyond it.
+    """
+    eras = []
+    end = len(maxima)
+    while end > 0:
+        top = max(maxima[max(0, end - probe):end])
+        i = end
+        while i > 0:
+            lo = max(0, i - probe)
+            wmax = max(maxima[lo:i])
+            if wmax > top:
+                i = lo + max(j for j in range(i - lo) if maxima[lo + j] > top) + 1
+                break
+            if wmax < top and i - lo == probe:
+                while maxima[i] <= wmax:
+                    i += 1
+                break
+            i = lo
+        eras.append(Era(i, end, top))
+        end = i
+    eras.reverse()
+    return eras
+
+
+def table_eras(table: DrawTable, special: bool = False) -> list[Era]:
+    spec = table.spec
+    width = spec.n_special if special else spec.n_balls
+    hi = spec.special_max if special else spec.ball_max
+    values = table.special if special else table.balls
+    if not len(table) or not width:
+        return []
+    return detect_eras(draw_maxima(values, width), probe_length(width, hi))
+
+
+def current_matrix_start(table: DrawTable):
+    """
+    Day ordinal of the first draw in the current number range of every
+    ball set (the later start wins), or None if the whole history is one
+    range.
+    """
+    spec = table.spec
+    maxima = {special: draw_maxima(table.special if special else table.balls,
+                                   spec.n_special if special else spec.n_balls)
+              for special in _ball_sets(spec)}
+    return matrix_start(spec, table.days, maxima)
+
+
+def stream_matrix_start(spec: GameSpec, chunks):
+    """
+    current_matrix_start over DrawTable chunks (see aggregate.iter_chunks)
+    without holding the table: only each draw's day and per-ball-set
+    maximum are kept, a few bytes per draw.
+    """
+    parts = []
+    for chunk in chunks:
+        if not len(chunk):
+            continue
+        cols = {special: array("B", draw_maxima(chunk.special if special else chunk.balls,
+                                                spec.n_special if special else spec.n_balls))
+                for special in _ball_sets(spec)}
+        parts.append((chunk.days, cols))
+    if not parts:
+        return None
+    # Chunks are sorted each; a newest-first file yields them newest first.
+    if parts[0][0][0] > parts[-1][0][-1]:
+        parts.reverse()
+    days = array("l")
+    maxima = {special: array("B") for special in _ball_sets(spec)}
+    for chunk_days, cols in parts:
+        days.extend(chunk_days)
+        for special, col in cols.items():
+            maxima[special].extend(col)
+    if any(days[i] > days[i + 1] for i in range(len(days) - 1)):
+        order = sorted(range(len(days)), key=days.__getitem__)
+        days = array("l", (days[i] for i in order))
+        maxima = {s: array("B", (col[i] for i in order)) for s, col in maxima.items()}
+    return matrix_start(spec, days, maxima)
+
+
+def matrix_start(spec: GameSpec, days, maxima: dict):
+    """current_matrix_start from date-sorted days and {special: per-draw maxima}."""
+    starts = []
+    for special, col in maxima.items():
+        width = spec.n_special if special else spec.n_balls
+        hi = spec.special_max if special else spec.ball_max
+        if not len(col):
+            continue
+        eras = detect_eras(col, probe_length(width, hi))
+        if len(eras) > 1:
+            starts.append(eras[-1].start)
+    return days[max(starts)] if starts else None
+
+
+def _ball_sets(spec: GameSpec) -> list[bool]:
+    return [False, True] if spec.n_special else [False]
+
+
+# ================== PREFIX COUNTS ==================
+class PrefixCounts:
+    """
+    prefix[x][i] = draws among [0, i) that contain x, for every number x, so
+    the counts of any window are one subtraction per number: O(range).
+    """
+
+    def __init__(self, values, width: int, hi: int, n: int):
+        self.hi = hi
+        self.prefix = [array("l", [0] * (n + 1))]
+        for bits in occurrence_bitsets(values, width, hi, n)[1:]:
+            flags = map(int, format(bits, f"0{n}b")[::-1]) if n else ()
+            self.prefix.append(array("l", accumulate(chain((0,), flags))))
+
+    def counts(self, lo: int, hi: int) -> list[int]:
+        """Occurrences of each number in draws [lo, hi); index 0 unused."""
+        return [p[hi] - p[lo] for p in self.prefix]
+
+
+def compare(recent: list[int], ref: list[int], width: int, top: int) -> tuple[float, int, float, float]:
+    """
+    Two-sample chi-square homogeneity test and Jensen-Shannon divergence
+    (bits) of two count vectors over 1..top. Returns (chi2, df, p, js).
+    """
+    total_a = sum(recent[1:top + 1])
+    total_b = sum(ref[1:top + 1])
+    if not total_a or not total_b:
+        return 0.0, 0, 1.0, 0.0
+    chi2 = js = 0.0
+    used = 0
+    for x in range(1, top + 1):
+        a, b = recent[x], ref[x]
+        if not a + b:
+            continue
+        used += 1
+        chi2 += (a * total_b - b * total_a) ** 2 / (a + b)
+        p, q = a / total_a, b / total_b
+        m = (p + q) / 2
+        if p:
+            js += p * log2(p / m)
+        if q:
+            js += q * log2(q / m)
+    chi2 /= total_a * total_b
+    # Numbers in one draw are distinct, which shrinks count variance by
+    # (top-width)/(top-1); rescale as in the randomness battery.
+    if top > width:
+        chi2 *= (top - 1) / (top - width)
+    df = max(used - 1, 0)
+    return chi2, df, chi2_sf(chi2, df), js / 2
+
+
+# ================== SCAN ==================
+def scan(prefix: PrefixCounts, era: Era, width: int, recent: int = DEFAULT_RECENT,
+         reference: int = DEFAULT_REFERENCE, step: int = 1) -> list[DriftPoint]:
+    """
+    Compare the latest `recent` draws with the `reference` draws just
+    before them (0: every earlier draw of the era) at each position of one
+    era, every `step` draws. Windows never cross an era boundary.
+    """
+    first = era.start + recent + (reference or recent)
+    points = []
+    for i in range(first, era.end + 1, step):
+        lo = era.start if not reference else i - recent - reference
+        a = prefix.counts(i - recent, i)
+        b = prefix.counts(lo, i - recent)
+        points.append(DriftPoint(i, *compare(a, b, width, era.top)))
+    return points
+
+
+def change_points(points: list[DriftPoint], alpha: float = ALPHA, gap: int = 0) -> list[DriftPoint]:
+    """
+    The strongest position of every run of positions with p < alpha. Runs
+    less than `gap` draws apart are one event (their windows overlap).
+    """
+    out, run = [], []
+    for pt in points:
+        if pt.p >= alpha:
+            continue
+        if run and pt.position - run[-1].position > gap:
+            out.append(min(run, key=lambda q: q.p))
+            run = []
+        run.append(pt)
+    if run:
+        out.append(min(run, key=lambda q: q.p))
+    return out
+
+
+# ================== CLI ==================
+def _day(table: DrawTable, i: int) -> str:
+    return date.fromordinal(table.days[min(i, len(table) - 1)]).isoformat()
+
+
+def scan_ball_set(table: DrawTable, special: bool, args) -> None:
+    spec: GameSpec = table.spec
+    width = spec.n_special if special else spec.n_balls
+    hi = spec.special_max if special else spec.ball_max
+    ball = spec.special_label if special else "main"
+    eras = table_eras(table, special)
+
+    print(f"\n{spec.title} {ball}: number ranges seen")
+    print("-" * 60)
+    for era in eras:
+        print(f"{_day(table, era.start)} .. {_day(table, era.end - 1)} | "
+              f"{era.end - era.start} draws | 1..{era.top}")
+    cur = eras[-1]
+    if cur.top != hi:
+        print(f"⚠️ Current draws reach {cur.top}, the analyzers assume 1..{hi}.")
+    if len(eras) > 1:
+        print(f"⚠️ {cur.start} older draws use another range. Analyzer tables mix them in "
+              f"unless run with --current-matrix (draws since {_day(table, cur.start)}).")
+
+    values = table.special if special else table.balls
+    prefix = PrefixCounts(values, width, max(era.top for era in eras), len(table))
+    scope = f"previous {args.reference}" if args.reference else "all earlier"
+    points = []
+    for era in eras:
+        points += scan(prefix, era, width, args.recent, args.reference, args.step)
+
+    print(f"\nLast {args.recent} vs {scope} draws: {len(points)} positions")
+    print("-" * 60)
+    if not points:
+        print("Not enough draws in any range for these windows.")
+        return
+    js = [pt.js for pt in points]
+    print(f"JS divergence: mean {sum(js) / len(js):.4f} | max {max(js):.4f} | "
+          f"latest {points[-1].js:.4f} (p = {points[-1].p:.4f})")
+    found = change_points(points, args.alpha, gap=args.recent)
+    print(f"Change points (p < {args.alpha}): {len(found)}")
+    for pt in found:
+        print(f"{_day(table, pt.position - args.recent)} | chi2 {pt.chi2:.1f} on {pt.df} df | "
+              f"p = {pt.p:.2g} | JS {pt.js:.4f}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Window-to-window distribution drift and matrix changes")
+    ap.add_argument("--games", default=",".join(GAMES),
+                    help=f"comma-separated games (default {','.join(GAMES)})")
+    ap.add_argument("--recent", type=int, default=DEFAULT_RECENT,
+                    help=f"draws in the recent window (default {DEFAULT_RECENT})")
+    ap.add_argument("--reference", type=int, default=DEFAULT_REFERENCE,
+                    help=f"draws in the reference window before it, 0 for all earlier draws "
+                         f"(default {DEFAULT_REFERENCE})")
+    ap.add_argument("--step", type=int, default=1, help="draws between compared positions (default 1)")
+    ap.add_argument("--alpha", type=float, default=ALPHA, help=f"change-point level (default {ALPHA})")
+    ap.add_argument("--special", action="store_true", help="also scan special balls")
+    args = ap.parse_args(argv)
+
+    print("\n===== DRIFT SCAN =====")
+    t0 = time.perf_counter()
+    for key in [g.strip() for g in args.games.split(",") if g.strip()]:
+        spec = GAMES[key]
+        if not os.path.exists(spec.csv_path):
+            print(f"⚠️ {spec.csv_path} not found. Skipping {key}.")
+            continue
+        table = DrawTable.from_csv(spec, str(pinned_path(spec.csv_path)))
+        if not table:
+            print(f"⚠️ {key}: no valid draws.")
+            continue
+        scan_ball_set(table, False, args)
+        if args.special and spec.n_special:
+            scan_ball_set(table, True, args)
+    print(f"\n✅ Scan finished in {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+import argparse
+import json
+import os
+import sys
+from datetime import date
+from pathlib import Path
+
+sys.path.append("src")
+from aggregate import GameStats  # noqa: E402
+from common import GAMES, DrawTable, GameSpec, atomic_write_text  # noqa: E402
+from generations import pinned_path  # noqa: E402
+
+EXPORT_DIR = Path("exports")
+
+LAST_N_FOR_TOP = 50
+
+# date32 counts days since 1970-01-01; DrawTable stores proleptic ordinals.
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _pyarrow():
+    """Import pyarrow lazily: it is optional and only needed for exports."""
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("pyarrow is required for exports (python -m pip install pyarrow)") from e
+    return pa, feather, pq
+
+
+# ================== SCHEMAS ==================
+def ball_columns(spec: GameSpec) -> tuple[list[str], list[str]]:
+    main = [f"ball_{i}" for i in range(1, spec.n_balls + 1)]
+    if spec.n_special == 1:
+        special = [spec.special_col]
+    else:
+        special = [f"{spec.special_label.lower()}_{i}" for i in range(1, spec.n_special + 1)]
+    return main, special
+
+
+def draws_to_arrow(table: DrawTable):
+    """
+    Draws as fixed-width columns: draw_date (date32), ball_1..ball_k (uint8),
+    special ball column(s) (uint8) and the extra label (dictionary string).
+    """
+    pa, _, _ = _pyarrow()
+    spec = table.spec
+    main_cols, special_cols = ball_columns(spec)
+
+    arrays = [pa.array([d - EPOCH_ORDINAL for d in table.days], type=pa.int32()).cast(pa.date32())]
+    names = ["draw_date"]
+
+    wb = spec.n_balls
+    for i, name in enumerate(main_cols):
+        arrays.append(pa.array(table.balls[i::wb], type=pa.uint8()))
+        names.append(name)
+
+    ws = spec.n_special
+    for i, name in enumerate(special_cols):
+        arrays.append(pa.array(table.special[i::ws], type=pa.uint8()))
+        names.append(name)
+
+    if spec.extra_col:
+        arrays.append(pa.DictionaryArray.from_arrays(
+            pa.array(table.extra_codes, type=pa.uint8()),
+            pa.array(table.extra_values, type=pa.string()),
+        ))
+        names.append(spec.extra_col)
+
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def frequency_to_arrow(stats: GameStats, window: int):
+    """Per-number full-history and last-N counts for main and special balls."""
+    pa, _, _ = _pyarrow()
+    spec = stats.spec
+    kinds, numbers, full, last = [], [], [], []
+    groups = [("main", spec.ball_max, stats.ball_counts, stats.window_ball_counts(window))]
+    if spec.n_special:
+        groups.append((spec.special_label.lower(), spec.special_max, stats.special_counts,
+                       stats.window_special_counts(window)))
+    for kind, hi, full_c, last_c in groups:
+        for n in range(1, hi + 1):
+            kinds.append(kind)
+            numbers.append(n)
+            full.append(full_c.get(n, 0))
+            last.append(last_c.get(n, 0))
+    return pa.table({
+        "ball": pa.array(kinds, type=pa.string()),
+        "number": pa.array(numbers, type=pa.uint8()),
+        "full_count": pa.array(full, type=pa.uint32()),
+        f"last_{window}_count": pa.array(last, type=pa.uint32()),
+    })
+
+
+# ================== WRITING ==================
+def _write_pair(tbl, base: Path, split: bool = False, publish: bool = True) -> list[tuple[Path, Path]]:
+    """
+    Write <base>.arrow (uncompressed IPC, mmap-able) and <base>.parquet.
+    With split=True they go to <dir>/arrow/<name>.arrow and
+    <dir>/parquet/<name>.parquet so each directory is a one-format dataset.
+    With publish=False the files stay under their hidden temp names and the
+    (temp, final) pairs are returned for the caller to rename.
+    """
+    _, feather, pq = _pyarrow()
+    pending = []
+    for suffix, write in ((".arrow", lambda p: feather.write_feather(tbl, p, compression="uncompressed")),
+                          (".parquet", lambda p: pq.write_table(tbl, p))):
+        if split:
+            final = base.parent / suffix[1:] / (base.name + suffix)
+            final.parent.mkdir(parents=True, exist_ok=True)
+        else:
+            final = base.with_suffix(suffix)
+        tmp = _tmp_name(final)
+        write(str(tmp))
+        pending.append((tmp, final))
+    if publish:
+        for tmp, final in pending:
+            os.replace(tmp, final)
+        return []
+    return pending
+
+
+def _tmp_name(final: Path) -> Path:
+    # Dataset readers skip files starting with "." by default.
+    return final.with_name(f".{final.name}.tmp")
+
+
+def _reconcile(ds_dir: Path, parts: list[str]) -> bool:
+    """
+    Make the part files on disk match the manifest's `parts`: delete parts
+    (and temp files) it does not list, then publish listed parts still
+    under temp names. A crash between writing the manifest and publishing
+    is repaired by the next call. False if a listed part is lost.
+    """
+    listed = set(parts)
+    for fmt in ("arrow", "parquet"):
+        fmt_dir = ds_dir / fmt
+        if not fmt_dir.is_dir():
+            continue
+        for p in fmt_dir.iterdir():
+            name = p.name.lstrip(".").split(".")[0]
+            if name.startswith("part-") and name not in listed:
+                p.unlink()
+    complete = True
+    for name in parts:
+        for fmt in ("arrow", "parquet"):
+            final = ds_dir / fmt / f"{name}.{fmt}"
+            tmp = _tmp_name(final)
+            if tmp.exists():
+                os.replace(tmp, final)
+            elif not final.exists():
+                complete = False
+    return complete
+
+
+def export_draws(table: DrawTable, out_dir: Path = EXPORT_DIR) -> tuple[int, bool]:
+    """
+    Export draws incrementally into out_dir/<game>_draws/{arrow,parquet}/
+    as numbered parts, readable with pyarrow.dataset.dataset(<dir>/parquet)
+    or dataset(<dir>/arrow, format="ipc").
+
+    If every previously exported draw is unchanged (same count and the
+    manifest's digest of their values), only draws newer than the
+    manifest's last_day are written, as one new part (a new row group for
+    dataset readers). Otherwise the directory is rewritten.
+
+    New parts are written under hidden temp names and renamed into place
+    only after the manifest listing them is saved, so a crash never leaves
+    readers an orphan or duplicate part; the next run finishes or discards
+    the interrupted write. Part numbers are never reused.
+    Returns (rows written, full_rewrite).
+    """
+    spec = table.spec
+    ds_dir = out_dir / f"{spec.key}_draws"
+    ds_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = ds_dir / "manifest.json"
+    manifest = {}
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+
+    parts = manifest.get("parts", [])
+    complete = _reconcile(ds_dir, parts)
+    last_day = manifest.get("last_day")
+    exported = table.until(last_day) if last_day is not None else None
+    rewrite = (
+        not complete
+        or exported is None
+        or len(exported) != manifest.get("rows")
+        or exported.digest() != manifest.get("digest")
+        or manifest.get("schema") != _schema_id(spec)
+    )
+    next_part = manifest.get("next_part", len(parts))
+
+    if rewrite:
+        new = table
+        parts = []
+    else:
+        new = table[len(exported):]
+
+    if len(new):
+        name = f"part-{next_part:05d}"
+        _write_pair(draws_to_arrow(new), ds_dir / name, split=True, publish=False)
+        parts = parts + [name]
+        next_part += 1
+
+    if rewrite or len(new):
+        manifest = {
+            "game": spec.key,
+            "schema": _schema_id(spec),
+            "rows": len(table),
+            "digest": table.digest(),
+            "last_day": table.days[-1] if len(table) else None,
+            "last_date": table[-1].date_str if len(table) else None,
+            "parts": parts,
+            "next_part": next_part,
+        }
+        atomic_write_text(manifest_path, json.dumps(manifest, indent=2) + "\n")
+        _reconcile(ds_dir, parts)
+    return len(new), rewrite
+
+
+def _schema_id(spec: GameSpec) -> str:
+    main, special = ball_columns(spec)
+    return ",".join(["draw_date"] + main + special + ([spec.extra_col] if spec.extra_col else []))
+
+
+def export_game(spec_key: str, path: str = None, out_dir: Path = EXPORT_DIR,
+                window: int = LAST_N_FOR_TOP) -> None:
+    spec = GAMES[spec_key]
+    table = DrawTable.from_csv(spec, str(pinned_path(path or spec.csv_path)))
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    written, rewrite = export_draws(table, out_dir)
+    stats = GameStats.from_table(table, window)
+    _write_pair(frequency_to_arrow(stats, window), out_dir / f"{spec.key}_frequency")
+
+    mode = "full rewrite" if rewrite else "append"
+    print(f"✅ {spec.key}: {len(table)} draws, {written} new rows ({mode}) -> {out_dir}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Export draws and frequency results as Arrow IPC + Parquet")
+    ap.add_argument("--games", default=",".join(GAMES),
+                    help=f"comma-separated games (default {','.join(GAMES)})")
+    ap.add_argument("--out-dir", default=str(EXPORT_DIR))
+    args = ap.parse_args(argv)
+
+    print("\n===== ARROW / PARQUET EXPORT =====")
+    try:
+        _pyarrow()
+    except ImportError as e:
+        print(f"❌ ERROR: {e}")
+        return
+
+    for key in [g.strip() for g in args.games.split(",") if g.strip()]:
+        spec = GAMES[key]
+        if not os.path.exists(spec.csv_path):
+            print(f"⚠️ {spec.csv_path} not found. Skipping {key} export.")
+            continue
+        export_game(key, out_dir=Path(args.out_dir))
+
+
+if __name__ == "__main__":
+    main()
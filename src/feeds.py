@@ -0,0 +1,137 @@
+import csv
+import io
+import re
+from pathlib import Path
+from typing import NamedTuple
+
+from common import GAMES, GameSpec, log
+
+
+class Feed(NamedTuple):
+    """
+    One CSV source and how its columns map onto a game's CSV in data/nj.
+
+    The output file, columns, ball counts and extra-label normaliser come
+    from GAMES[game]. special_col="" means the special ball(s) are the
+    trailing numbers of numbers_col (e.g. Powerball's "Winning Numbers").
+    The first non-empty column in extra_cols is the extra label.
+    """
+    game: str
+    name: str
+    url: str
+    date_col: str = "Draw Date"
+    numbers_col: str = "Winning Numbers"
+    special_col: str = ""
+    extra_cols: tuple = ()
+    required: tuple = ("Draw Date", "Winning Numbers")
+
+
+# NY Open Data CSV endpoints
+FEEDS = {
+    "powerball": Feed(
+        "powerball", "Powerball",
+        "https://data.ny.gov/api/views/d6yy-54nr/rows.csv?accessType=DOWNLOAD",
+    ),
+    "mega": Feed(
+        "mega", "Mega Millions",
+        "https://data.ny.gov/api/views/5xaw-6ayf/rows.csv?accessType=DOWNLOAD",
+        special_col="Mega Ball", extra_cols=("Multiplier",),
+    ),
+    # ✅ Jersey Cash 5 (CSV, stable like PB/Mega)
+    "jersey_cash5": Feed(
+        "jersey_cash5", "Jersey Cash 5",
+        "https://data.ny.gov/api/views/qpqk-8p3g/rows.csv?accessType=DOWNLOAD",
+        # Some datasets use "XTRA" column name; handle all cases
+        extra_cols=("XTRA", "Xtra", "xtra"),
+    ),
+}
+
+
+def looks_like_csv(text: str, required_cols) -> bool:
+    if not text:
+        return False
+    head = text[:4000].lower()
+    if "<html" in head or "<!doctype html" in head:
+        return False
+    return all(col.lower() in head for col in required_cols)
+
+
+def output_header(spec: GameSpec) -> list[str]:
+    return ["draw_date", spec.balls_col] + [c for c in (spec.special_col, spec.extra_col) if c]
+
+
+_DIGITS = re.compile(r"\d+")
+
+
+def transform_row(feed: Feed, spec: GameSpec, r: dict):
+    """
+    One source record -> (output row, None), or (None, reject reason).
+    """
+    draw_date = (r.get(feed.date_col) or "").split("T")[0].strip()
+    winning = (r.get(feed.numbers_col) or "").strip()
+    special_raw = (r.get(feed.special_col) or "").strip() if feed.special_col else None
+    if not draw_date or not winning or special_raw == "":
+        return None, "missing_fields"
+
+    nums = _DIGITS.findall(winning)
+    if special_raw is None:
+        # Special ball(s) ride at the end of the winning numbers.
+        if len(nums) != spec.n_balls + spec.n_special:
+            return None, "bad_numbers"
+        nums, special = nums[:spec.n_balls], nums[spec.n_balls:]
+    else:
+        if len(nums) != spec.n_balls:
+            return None, "bad_numbers"
+        special = _DIGITS.findall(special_raw)[:spec.n_special]
+        if len(special) < spec.n_special:
+            return None, "bad_special"
+
+    row = [draw_date, " ".join(nums)]
+    if spec.special_col:
+        row.append(" ".join(special))
+    if spec.extra_col:
+        raw = next((r.get(c) for c in feed.extra_cols if r.get(c)), "")
+        row.append(spec.extra_normalizer(raw.strip()))
+    return row, None
+
+
+def write_feed(feed: Feed, text: str, metrics=None, out: Path = None) -> int:
+    """
+    Validate a downloaded payload and transform it row by row into the
+    game's CSV (or `out`). An invalid payload leaves a header-only file.
+    Returns rows written.
+    """
+    spec = GAMES[feed.game]
+    out = Path(out or spec.csv_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    header = output_header(spec)
+
+    reader = None
+    if not looks_like_csv(text, feed.required):
+        log(f"⚠️ {feed.name} response is not a valid CSV (blocked/redirected).")
+        reason = "not_csv"
+    else:
+        reader = csv.DictReader(io.StringIO(text))
+        reason = None if reader.fieldnames else "no_headers"
+        if reason:
+            log(f"⚠️ {feed.name} CSV has no headers.")
+
+    count = 0
+    with out.open("w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(header)
+        if reason is None:
+            for r in reader:
+                row, rejected = transform_row(feed, spec, r)
+                if row is None:
+                    if metrics is not None:
+                        metrics.inc("fetch_rows_rejected_total", source=feed.game, reason=rejected)
+                    continue
+                w.writerow(row)
+                count += 1
+
+    if metrics is not None:
+        if reason:
+            metrics.inc("fetch_invalid_payload_total", source=feed.game, reason=reason)
+        metrics.set("fetch_rows_written", count, source=feed.game)
+    return count
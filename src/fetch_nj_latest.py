@@ -1,39 +1,55 @@
 import re
-import csv
 import io
+import csv
+import time
+import argparse
+import contextlib
+import tempfile
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from urllib.error import HTTPError, URLError
 from pathlib import Path
 
-# ================== URLs ==================
-# NY Open Data CSV endpoints (Powerball + Mega Millions)
-POWERBALL_URL = "https://data.ny.gov/api/views/d6yy-54nr/rows.csv?accessType=DOWNLOAD"
-MEGA_URL = "https://data.ny.gov/api/views/5xaw-6ayf/rows.csv?accessType=DOWNLOAD"
+from archive import ARCHIVE_DIR, Archive
+from common import GAMES, log
+from feeds import FEEDS, Feed, write_feed
+from generations import Generation, GenerationStore
+from metrics import Metrics
 
-# ✅ Jersey Cash 5 (CSV, stable like PB/Mega)
-JERSEY_CASH5_URL = "https://data.ny.gov/api/views/qpqk-8p3g/rows.csv?accessType=DOWNLOAD"
+# ================== URLs ==================
+# CSV sources (Powerball, Mega Millions, Jersey Cash 5) are declared in feeds.FEEDS.
 
 # NJ Lottery official page (Pick-6 page includes recent results + Double Play in HTML)
 PICK6_URL = "https://www.njlottery.com/en-us/drawgames/pick6lotto.html"
 
+# Feeds are downloaded concurrently (network-bound)
+FETCH_WORKERS = 8
+
 # ================== PATHS ==================
 OUT_DIR = Path("data/nj")
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
-PB_FILE = OUT_DIR / "powerball.csv"
-MEGA_FILE = OUT_DIR / "mega_millions.csv"
 PICK6_FILE = OUT_DIR / "pick6.csv"
 PICK6_RAW = OUT_DIR / "pick6_raw.html"
 
-JC5_FILE = OUT_DIR / "jersey_cash5.csv"
+METRICS = Metrics("fetch")
 
 
 # ================== NETWORK ==================
-def download(url: str) -> str:
+def download(url: str, source: str = "", archive: Archive = None, run: str = "") -> str:
     """
     Download text from a URL. If blocked (e.g., 403) or network fails,
     return empty string so pipeline can continue.
+
+    Latency, payload bytes and HTTP status (0 = no response) are recorded
+    per source in METRICS. With an archive, the raw response (or the
+    failure) is stored under `run` for later replay.
     """
+    source = source or url
+    status = 0
+    body = headers = None
+    t0 = time.perf_counter()
     try:
         req = urllib.request.Request(
             url,
@@ -45,192 +61,67 @@ def download(url: str) -> str:
             },
         )
         with urllib.request.urlopen(req, timeout=60) as r:
-            return r.read().decode("utf-8", errors="replace")
+            status = r.status
+            headers = r.headers
+            body = r.read()
+        METRICS.set("fetch_http_bytes", len(body), source=source)
+        return body.decode("utf-8", errors="replace")
 
     except HTTPError as e:
-        print(f"⚠️ HTTP error {e.code} for URL: {url}")
+        status = e.code
+        headers = e.headers
+        log(f"⚠️ HTTP error {e.code} for URL: {url}")
         return ""
     except URLError as e:
-        print(f"⚠️ Network error for URL: {url} -> {e}")
+        log(f"⚠️ Network error for URL: {url} -> {e}")
         return ""
     except Exception as e:
-        print(f"⚠️ Unexpected error for URL: {url} -> {repr(e)}")
+        log(f"⚠️ Unexpected error for URL: {url} -> {repr(e)}")
         return ""
+    finally:
+        elapsed = time.perf_counter() - t0
+        METRICS.set("fetch_http_seconds", elapsed, source=source)
+        METRICS.set("fetch_http_status", status, source=source)
+        if archive is not None:
+            try:
+                entry = archive.record(run, source, url, body, status, headers, elapsed)
+                if entry["new"]:
+                    METRICS.inc("fetch_archive_new_total", source=source)
+            except OSError as e:
+                log(f"⚠️ Could not archive {source} payload: {e}")
+
+
+def replayed(archive: Archive, snapshot: dict, url: str, source: str = "") -> str:
+    """download() stand-in: the payload `source` had in an archived run."""
+    entry = snapshot.get(source or url)
+    if entry is None:
+        log(f"⚠️ No archived payload for {source or url}.")
+        return ""
+    METRICS.set("fetch_http_bytes", entry["bytes"], source=source)
+    METRICS.set("fetch_http_status", entry["status"], source=source)
+    return archive.payload(entry).decode("utf-8", errors="replace")
 
 
-def looks_like_csv(text: str, required_cols: list[str]) -> bool:
-    if not text:
-        return False
-    head = text[:4000].lower()
-    if "<html" in head or "<!doctype html" in head:
-        return False
-    return all(col.lower() in head for col in required_cols)
-
-
-def normalize_multiplier(m: str) -> str:
-    """
-    Normalize multiplier values to:
-      - "2X", "3X", ... or "N/A"
-    """
-    if not m:
-        return "N/A"
-    m = m.strip().upper()
-    if m in ("NA", "N/A", "NONE"):
-        return "N/A"
-    digits = re.findall(r"\d+", m)
-    if not digits:
-        return "N/A"
-    return f"{digits[0]}X"
-
-
-def normalize_xtra(x: str) -> str:
-    """
-    Normalize XTRA to:
-      - "N/A" or a single digit (2/3/4/5 etc)
-    """
-    if not x:
-        return "N/A"
-    x = x.strip().upper()
-    if x in ("NA", "N/A", "NONE"):
-        return "N/A"
-    digits = re.findall(r"\d+", x)
-    if not digits:
-        return "N/A"
-    return digits[0]
-
-
-# ================== SAVE POWERBALL ==================
-def save_powerball(text: str) -> int:
-    if not looks_like_csv(text, ["Draw Date", "Winning Numbers"]):
-        print("⚠️ Powerball response is not a valid CSV (blocked/redirected).")
-        with PB_FILE.open("w", newline="", encoding="utf-8") as f:
-            w = csv.writer(f)
-            w.writerow(["draw_date", "white_numbers", "powerball"])
-        return 0
-
-    reader = csv.DictReader(io.StringIO(text))
-    if not reader.fieldnames:
-        print("⚠️ Powerball CSV has no headers.")
-        with PB_FILE.open("w", newline="", encoding="utf-8") as f:
-            w = csv.writer(f)
-            w.writerow(["draw_date", "white_numbers", "powerball"])
-        return 0
-
-    with PB_FILE.open("w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["draw_date", "white_numbers", "powerball"])
-
-        count = 0
-        for r in reader:
-            nums = (r.get("Winning Numbers") or "").split()
-            if len(nums) != 6:
-                continue
-
-            draw_date = (r.get("Draw Date") or "").split("T")[0]
-            if not draw_date:
-                continue
-
-            w.writerow([draw_date, " ".join(nums[:5]), nums[5]])
-            count += 1
-
-    print(f"✅ Powerball rows written: {count}")
-    return count
-
-
-# ================== SAVE MEGA MILLIONS ==================
-def save_mega(text: str) -> int:
-    if not looks_like_csv(text, ["Draw Date", "Winning Numbers"]):
-        print("⚠️ Mega Millions response is not a valid CSV (blocked/redirected).")
-        with MEGA_FILE.open("w", newline="", encoding="utf-8") as f:
-            w = csv.writer(f)
-            w.writerow(["draw_date", "white_numbers", "mega_ball", "multiplier"])
-        return 0
-
-    reader = csv.DictReader(io.StringIO(text))
-    if not reader.fieldnames:
-        print("⚠️ Mega Millions CSV has no headers.")
-        with MEGA_FILE.open("w", newline="", encoding="utf-8") as f:
-            w = csv.writer(f)
-            w.writerow(["draw_date", "white_numbers", "mega_ball", "multiplier"])
-        return 0
-
-    with MEGA_FILE.open("w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["draw_date", "white_numbers", "mega_ball", "multiplier"])
-
-        count = 0
-        for r in reader:
-            draw_date = (r.get("Draw Date") or "").strip()
-            winning = (r.get("Winning Numbers") or "").strip()
-            mega_ball = (r.get("Mega Ball") or "").strip()
-            multiplier_raw = (r.get("Multiplier") or "").strip()
-
-            if not draw_date or not winning or not mega_ball:
-                continue
-
-            white_nums = re.findall(r"\d+", winning)
-            if len(white_nums) != 5:
-                continue
-
-            mb = re.findall(r"\d+", mega_ball)
-            if not mb:
-                continue
-
-            multiplier = normalize_multiplier(multiplier_raw)
-            w.writerow([draw_date.split("T")[0], " ".join(white_nums), mb[0], multiplier])
-            count += 1
-
-    print(f"✅ Mega Millions rows written: {count}")
-    return count
-
-
-# ================== SAVE JERSEY CASH 5 (CSV) ==================
-def save_jersey_cash5(text: str) -> int:
-    # Validate CSV
-    if not looks_like_csv(text, ["Draw Date", "Winning Numbers"]):
-        print("⚠️ Jersey Cash 5 response is not a valid CSV (blocked/redirected).")
-        with JC5_FILE.open("w", newline="", encoding="utf-8") as f:
-            w = csv.writer(f)
-            w.writerow(["draw_date", "numbers", "xtra"])
-        return 0
-
-    reader = csv.DictReader(io.StringIO(text))
-    if not reader.fieldnames:
-        print("⚠️ Jersey Cash 5 CSV has no headers.")
-        with JC5_FILE.open("w", newline="", encoding="utf-8") as f:
-            w = csv.writer(f)
-            w.writerow(["draw_date", "numbers", "xtra"])
-        return 0
-
-    with JC5_FILE.open("w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["draw_date", "numbers", "xtra"])
+def reject(source: str, reason: str) -> None:
+    METRICS.inc("fetch_rows_rejected_total", source=source, reason=reason)
 
-        count = 0
-        for r in reader:
-            draw_date = (r.get("Draw Date") or "").split("T")[0].strip()
-            winning = (r.get("Winning Numbers") or "").strip()
 
-            # Some datasets use "XTRA" column name; handle both cases
-            xtra_raw = (r.get("XTRA") or r.get("Xtra") or r.get("xtra") or "").strip()
+def invalid_payload(source: str, reason: str) -> None:
+    METRICS.inc("fetch_invalid_payload_total", source=source, reason=reason)
+    METRICS.set("fetch_rows_written", 0, source=source)
 
-            if not draw_date or not winning:
-                continue
 
-            nums = re.findall(r"\d+", winning)
-            if len(nums) != 5:
-                continue
+# ================== CSV FEEDS ==================
+def feed_file(feed: Feed) -> str:
+    return Path(GAMES[feed.game].csv_path).name
 
-            xtra = normalize_xtra(xtra_raw) if xtra_raw else "N/A"
-            w.writerow([draw_date, " ".join(nums), xtra])
-            count += 1
 
-    print(f"✅ Jersey Cash 5 rows written: {count}")
-    return count
+def fetch_feed(feed: Feed, gen: Generation, get=download) -> int:
+    return write_feed(feed, get(feed.url, feed.game), METRICS, gen.path(feed_file(feed)))
 
 
 # ================== SAVE PICK 6 ==================
-def save_pick6(html: str) -> int:
+def save_pick6(html: str, out: Path = PICK6_FILE, raw: Path = PICK6_RAW) -> int:
     OUT_DIR.mkdir(parents=True, exist_ok=True)
 
     def to_iso(mmddyyyy: str) -> str:
@@ -253,7 +144,7 @@ def save_pick6(html: str) -> int:
     try:
         matches = list(pattern.finditer(html or ""))
 
-        with PICK6_FILE.open("w", newline="", encoding="utf-8") as f:
+        with out.open("w", newline="", encoding="utf-8") as f:
             w = csv.writer(f)
             w.writerow(["draw_date", "main_numbers", "double_play_numbers"])
 
@@ -263,6 +154,7 @@ def save_pick6(html: str) -> int:
                 dp_nums = re.findall(r"\d+", m.group("dp") or "")
 
                 if len(main_nums) != 6 or len(dp_nums) != 6:
+                    reject("pick6", "bad_numbers")
                     continue
 
                 draw_date = to_iso(raw_date)
@@ -271,6 +163,7 @@ def save_pick6(html: str) -> int:
 
                 key = (draw_date, main_str, dp_str)
                 if key in seen:
+                    reject("pick6", "duplicate")
                     continue
                 seen.add(key)
 
@@ -278,89 +171,174 @@ def save_pick6(html: str) -> int:
                 count += 1
 
     except Exception as e:
-        PICK6_RAW.write_text(html or "", encoding="utf-8", errors="replace")
+        raw.write_text(html or "", encoding="utf-8", errors="replace")
         print("⚠️ Pick-6 parsing crashed.")
+        invalid_payload("pick6", "parse_error")
         print("Error:", repr(e))
-        print("✅ Debug saved:", PICK6_RAW)
+        print("✅ Debug saved:", raw)
         return 0
 
     if count == 0:
-        PICK6_RAW.write_text(html or "", encoding="utf-8", errors="replace")
+        raw.write_text(html or "", encoding="utf-8", errors="replace")
         print("⚠️ Pick-6 parse returned 0 rows (blocked/JS-rendered likely).")
-        print("✅ Debug saved:", PICK6_RAW)
+        invalid_payload("pick6", "no_matches")
+        print("✅ Debug saved:", raw)
 
+    METRICS.set("fetch_rows_written", count, source="pick6")
     print(f"✅ Pick-6 rows written: {count}")
     return count
 
 
-def pick6_cached_has_data(min_bytes: int = 80) -> bool:
+def cached_has_data(store: GenerationStore, name: str, min_bytes: int = 80) -> bool:
+    """Whether the published generation has more than a header for `name`."""
     try:
-        return PICK6_FILE.exists() and PICK6_FILE.stat().st_size >= min_bytes
+        path = store.current_file(name)
+        return path is not None and path.stat().st_size >= min_bytes
     except Exception:
         return False
 
 
+# ================== BENCHMARK ==================
+def bench(archive: Archive, run: str = None, repeat: int = 5) -> None:
+    """
+    Time the CSV feed transforms and the Pick-6 HTML parser on the payloads
+    of one archived run, offline. Output goes to a temp dir and parser
+    chatter is suppressed; the best of `repeat` runs is reported.
+    """
+    snapshot = archive.snapshot(run)
+    run = next(iter(snapshot.values()))["run"]
+    print(f"\n===== PARSER BENCHMARK (run {run}) =====")
+    print("-" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        out, raw = Path(tmp) / "out.csv", Path(tmp) / "raw.html"
+        for source, entry in sorted(snapshot.items()):
+            payload = archive.payload(entry)
+            text = payload.decode("utf-8", errors="replace")
+            if source == "pick6":
+                parse = partial(save_pick6, text, out, raw)
+            elif source in FEEDS:
+                parse = partial(write_feed, FEEDS[source], text, None, out)
+            else:
+                continue
+
+            best, rows = float("inf"), 0
+            for _ in range(max(repeat, 1)):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    t0 = time.perf_counter()
+                    rows = parse()
+                    best = min(best, time.perf_counter() - t0)
+            mb_s = len(payload) / best / 1e6 if best else 0.0
+            rows_s = rows / best if best else 0.0
+            print(f"{source}: {rows} rows from {len(payload):,} bytes | best {best * 1000:.2f} ms | "
+                  f"{mb_s:.1f} MB/s | {rows_s:,.0f} rows/s")
+
+
 # ================== MAIN ==================
-def main():
+def fetch(archive: Archive = None, replay: str = None) -> None:
+    """
+    Download every source (or, with `replay`, reuse the payloads archived
+    for that run id; "latest" for the newest) and publish a generation.
+    """
     print("=== FETCH NJ LATEST ===")
     print("Output dir:", OUT_DIR.resolve())
 
-    # Powerball
-    print("Downloading Powerball...")
-    pb_text = download(POWERBALL_URL)
-    pb_count = save_powerball(pb_text)
-    print("✅ Saved:", PB_FILE.resolve())
-
-    # Mega Millions
-    print("Downloading Mega Millions...")
-    mega_text = download(MEGA_URL)
-    mega_count = save_mega(mega_text)
-    print("✅ Saved:", MEGA_FILE.resolve())
-
-    # ✅ Jersey Cash 5 (CSV)
-    print("Downloading Jersey Cash 5...")
-    jc5_text = download(JERSEY_CASH5_URL)
-    jc5_count = save_jersey_cash5(jc5_text)
-    print("✅ Saved:", JC5_FILE.resolve())
-
-    # Pick 6
-    print("Downloading Pick-6 (NJ HTML)...")
-    pick6_html = download(PICK6_URL)
-
-    if not pick6_html:
-        if pick6_cached_has_data():
-            print("⚠️ Pick-6 blocked/empty in CI. Keeping existing cached pick6.csv (NOT overwriting).")
-            pick6_count = -1
+    snapshot = None
+    if replay:
+        try:
+            snapshot = archive.snapshot(None if replay == "latest" else replay)
+        except FileNotFoundError as e:
+            print(f"❌ ERROR: {e}")
+            return
+        print(f"Replaying archived run {next(iter(snapshot.values()))['run']} (no network)")
+
+    # Everything is written into a new generation and published at once
+    # on success; readers keep seeing the previous one until then.
+    store = GenerationStore(OUT_DIR)
+    with store.begin() as gen:
+        if snapshot is not None:
+            get = partial(replayed, archive, snapshot)
         else:
-            print("⚠️ Pick-6 blocked/empty and no cached file found. Creating header-only pick6.csv.")
-            with PICK6_FILE.open("w", newline="", encoding="utf-8") as f:
-                w = csv.writer(f)
-                w.writerow(["draw_date", "main_numbers", "double_play_numbers"])
-            pick6_count = 0
-    else:
-        pick6_count = save_pick6(pick6_html)
-        if pick6_count == 0 and pick6_cached_has_data():
-            print("⚠️ Pick-6 parse returned 0 but cached pick6.csv exists. Keeping cached file.")
+            # Archived under the generation id, so data and payloads line up
+            get = partial(download, archive=archive, run=gen.id)
+
+        # CSV feeds and the Pick-6 page download side by side
+        print("Downloading:", ", ".join(feed.name for feed in FEEDS.values()), "+ Pick-6 (NJ HTML)...")
+        with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(FEEDS) + 1)) as pool:
+            futures = {key: pool.submit(fetch_feed, feed, gen, get) for key, feed in FEEDS.items()}
+            pick6_html = pool.submit(get, PICK6_URL, "pick6").result()
+            counts = {key: fut.result() for key, fut in futures.items()}
+
+        for key, feed in FEEDS.items():
+            print(f"✅ {feed.name} rows written: {counts[key]}")
+            if counts[key] == 0 and cached_has_data(store, feed_file(feed)):
+                print(f"⚠️ {feed.name} wrote 0 rows. Keeping previous {feed_file(feed)}.")
+                METRICS.inc("fetch_cache_fallback_total", source=key)
+                gen.carry(feed_file(feed))
+                counts[key] = -1
+
+        pick6_out = gen.path(PICK6_FILE.name)
+        if not pick6_html:
+            if cached_has_data(store, PICK6_FILE.name):
+                print("⚠️ Pick-6 blocked/empty in CI. Keeping existing cached pick6.csv (NOT overwriting).")
+                METRICS.inc("fetch_cache_fallback_total", source="pick6")
+                gen.carry(PICK6_FILE.name)
+                pick6_count = -1
+            else:
+                print("⚠️ Pick-6 blocked/empty and no cached file found. Creating header-only pick6.csv.")
+                with pick6_out.open("w", newline="", encoding="utf-8") as f:
+                    w = csv.writer(f)
+                    w.writerow(["draw_date", "main_numbers", "double_play_numbers"])
+                pick6_count = 0
+        else:
+            pick6_count = save_pick6(pick6_html, pick6_out)
+            if pick6_count == 0 and cached_has_data(store, PICK6_FILE.name):
+                print("⚠️ Pick-6 parse returned 0 but cached pick6.csv exists. Keeping cached file.")
+                METRICS.inc("fetch_cache_fallback_total", source="pick6")
+                gen.carry(PICK6_FILE.name)
 
+    print(f"✅ Published generation {gen.id} (kept: {len(store.generations())})")
     print("✅ Pick-6 file:", PICK6_FILE.resolve())
 
-    if pb_count == 0:
-        print("⚠️ Powerball wrote 0 rows (blocked/unavailable).")
-    if mega_count == 0:
-        print("⚠️ Mega Millions wrote 0 rows (blocked/unavailable).")
-    if jc5_count == 0:
-        print("⚠️ Jersey Cash 5 wrote 0 rows (blocked/unavailable).")
+    for key, feed in FEEDS.items():
+        if counts[key] == 0:
+            print(f"⚠️ {feed.name} wrote 0 rows (blocked/unavailable).")
 
     print("=== DONE ===")
     print("Counts:")
-    print(" - Powerball:", pb_count)
-    print(" - Mega Millions:", mega_count)
-    print(" - Jersey Cash 5:", jc5_count)
+    for key, feed in FEEDS.items():
+        print(f" - {feed.name}:", counts[key])
     print(" - Pick-6:", pick6_count)
 
     print("Files created in data/nj:")
-    for p in sorted(OUT_DIR.glob("*")):
-        print(" -", p.name, f"({p.stat().st_size} bytes)")
+    for p in sorted(q for q in OUT_DIR.glob("*") if q.is_file()):
+        size = p.stat().st_size
+        METRICS.set("fetch_output_bytes", size, file=p.name)
+        print(" -", p.name, f"({size} bytes)")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Fetch the latest NJ draw data")
+    ap.add_argument("--archive-dir", default=str(ARCHIVE_DIR),
+                    help=f"raw payload archive (default {ARCHIVE_DIR})")
+    ap.add_argument("--no-archive", action="store_true", help="do not archive raw payloads")
+    ap.add_argument("--replay", nargs="?", const="latest", metavar="RUN",
+                    help="use the payloads archived for RUN (default: latest) instead of the network")
+    ap.add_argument("--bench", nargs="?", const="latest", metavar="RUN",
+                    help="only benchmark the parsers on the payloads archived for RUN")
+    ap.add_argument("--repeat", type=int, default=5, help="benchmark repetitions (default 5)")
+    args = ap.parse_args(argv)
+
+    archive = None if args.no_archive and not (args.replay or args.bench) else Archive(args.archive_dir)
+    if args.bench:
+        try:
+            bench(archive, None if args.bench == "latest" else args.bench, args.repeat)
+        except FileNotFoundError as e:
+            print(f"❌ ERROR: {e}")
+        return
+    try:
+        fetch(archive, args.replay)
+    finally:
+        METRICS.write()
 
 
 if __name__ == "__main__":
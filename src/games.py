@@ -0,0 +1,158 @@
+import os
+from collections import Counter
+from functools import cached_property
+
+from buckets import HOT_MIN, MED_MIN, classify_bucket, classify_special_6, classify_white_6
+from common import GAMES, Draw, DrawTable, GameSpec, top_n
+
+
+def file_signature(path: str):
+    """(mtime_ns, size, inode) of path, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def _classifiers(spec_key: str, ball_counts: Counter, special_counts: Counter):
+    """
+    (main, special) functions number -> bucket label, using the analyzers'
+    own thresholds (buckets.py) so results match the reports. None where a
+    game has no buckets.
+    """
+    if spec_key == "jersey_cash5":
+        return (lambda n: classify_bucket(ball_counts.get(n, 0), HOT_MIN, MED_MIN)), None
+    if spec_key not in ("powerball", "mega"):
+        return None, None
+
+    special_max = max(special_counts.values(), default=0)
+    return (lambda n: classify_white_6(ball_counts.get(n, 0)),
+            lambda n: classify_special_6(special_counts.get(n, 0), special_max))
+
+
+class Game:
+    """
+    Statistics for one game's CSV, each computed on first access and then
+    memoized. Nothing is read until a statistic is asked for.
+
+        mega = load_game("mega")
+        mega.top(10, window=50)        # top 10 white balls, last 50 draws
+        mega.extra_counts              # multiplier distribution
+        mega.mix_labels(20)            # bucket mix of the latest 20 draws
+        mega.where("since 2017 and mb <= 10").ball_counts()
+
+    The object is a snapshot: once the file changes, `stale` turns True and
+    load_game() returns a fresh one.
+    """
+
+    def __init__(self, spec: GameSpec, path: str = None):
+        self.spec = spec
+        self.path = str(path or spec.csv_path)
+        self.signature = file_signature(self.path)
+        self._windows = {}
+
+    def __repr__(self) -> str:
+        return f"Game({self.spec.key!r}, {self.path!r})"
+
+    @property
+    def stale(self) -> bool:
+        return file_signature(self.path) != self.signature
+
+    @cached_property
+    def table(self) -> DrawTable:
+        self.signature = file_signature(self.path)
+        return DrawTable.from_csv(self.spec, self.path)
+
+    @property
+    def draws(self) -> int:
+        return len(self.table)
+
+    @cached_property
+    def ball_counts(self) -> Counter:
+        return self.table.ball_counts()
+
+    @cached_property
+    def special_counts(self) -> Counter:
+        return self.table.special_counts()
+
+    @cached_property
+    def extra_counts(self) -> Counter:
+        """Multiplier (Mega Millions) or XTRA (Jersey Cash 5) distribution."""
+        return self.table.extra_counts()
+
+    def latest(self, n: int = 10) -> list[Draw]:
+        """The newest n draws, newest first."""
+        return self.table.newest(n)
+
+    def window_counts(self, n: int, special: bool = False) -> Counter:
+        """Main (or special) ball counts over the latest n draws."""
+        key = (n, special)
+        if key not in self._windows:
+            last = self.table.last(n)
+            self._windows[key] = last.special_counts() if special else last.ball_counts()
+        return self._windows[key]
+
+    def counts(self, window: int = None, special: bool = False) -> Counter:
+        if window is not None:
+            return self.window_counts(window, special)
+        return self.special_counts if special else self.ball_counts
+
+    def top(self, n: int = 10, window: int = None, special: bool = False) -> list[tuple[int, int]]:
+        """Most frequent numbers as (number, count), full history or last `window` draws."""
+        return top_n(self.counts(window, special), n)
+
+    def frequency(self, window: int = None, special: bool = False) -> list[tuple[int, int]]:
+        """(number, count) for every number in range, including zeros."""
+        counts = self.counts(window, special)
+        hi = self.spec.special_max if special else self.spec.ball_max
+        return [(i, counts.get(i, 0)) for i in range(1, hi + 1)]
+
+    @cached_property
+    def index(self):
+        """Bitset DrawIndex over the table, shared by every where() call."""
+        from query import DrawIndex
+
+        return DrawIndex(self.table)
+
+    def where(self, text: str) -> DrawTable:
+        """Draws matching a query (see query.QUERY_HELP), in date order."""
+        from query import compile_query
+
+        return self.index.select(compile_query(text, self.spec).mask(self.index))
+
+    @cached_property
+    def _classifiers(self):
+        return _classifiers(self.spec.key, self.ball_counts, self.special_counts)
+
+    def bucket(self, number: int, special: bool = False):
+        """Full-history bucket label of a number (None if the game has no buckets)."""
+        classify = self._classifiers[1 if special else 0]
+        return classify(number) if classify else None
+
+    def mix_labels(self, n: int = 1) -> list[tuple[str, Counter]]:
+        """(draw date, Counter of main-ball bucket labels) for the latest n draws."""
+        classify = self._classifiers[0]
+        if classify is None:
+            return []
+        return [(dr.date_str, Counter(classify(b) for b in dr.balls)) for dr in self.latest(n)]
+
+
+_loaded = {}
+
+
+def load_game(key: str, path: str = None) -> Game:
+    """
+    Memoized Game for a key in GAMES. Repeated calls return the same object
+    (and its cached statistics) until the CSV changes on disk.
+    """
+    spec = GAMES[key]
+    path = str(path or spec.csv_path)
+    game = _loaded.get((key, path))
+    if game is None or game.stale:
+        game = _loaded[(key, path)] = Game(spec, path)
+    return game
+
+
+def clear_cache() -> None:
+    _loaded.clear()
@@ -0,0 +1,321 @@
+import atexit
+import os
+import shutil
+import time
+from pathlib import Path
+
+from common import atomic_write_text, log
+
+DATA_DIR = Path("data/nj")
+
+# Published generations kept for rollback (plus any a live reader has pinned)
+KEEP_GENERATIONS = 5
+
+# Pins older than this are treated as leftovers of dead processes
+PIN_MAX_AGE = 24 * 3600
+# Unpublished generation directories older than this are crashed writes
+TMP_MAX_AGE = 3600
+# Times pin() re-reads CURRENT when it names a generation that is gone
+PIN_ATTEMPTS = 5
+
+
+def _fsync_path(path: Path) -> None:
+    """fsync a file or directory (directories: best effort, not on Windows)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        return True  # os.kill would terminate it; rely on PIN_MAX_AGE instead
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Generation:
+    """
+    One generation being written. Files go into a hidden directory that no
+    reader looks at; commit() fsyncs them and publishes the whole set at
+    once. Used as a context manager it commits on success and discards the
+    directory on error.
+    """
+
+    def __init__(self, store: "GenerationStore", gen_id: str):
+        self.store = store
+        self.id = gen_id
+        self.dir = store.gens_dir / f".tmp-{gen_id}"
+        self.dir.mkdir(parents=True)
+
+    def path(self, name: str) -> Path:
+        return self.dir / name
+
+    def carry(self, name: str) -> bool:
+        """Reuse `name` from the current generation. False if there is none."""
+        src = self.store.current_file(name)
+        if src is None:
+            return False
+        dst = self.path(name)
+        if dst.exists():
+            dst.unlink()
+        _link_or_copy(src, dst)
+        return True
+
+    def commit(self) -> str:
+        for p in self.dir.iterdir():
+            _fsync_path(p)
+        _fsync_path(self.dir)
+        final = self.store.gens_dir / self.id
+        os.rename(self.dir, final)
+        self.dir = final
+        _fsync_path(self.store.gens_dir)
+        self.store.publish(self.id)
+        return self.id
+
+    def abort(self) -> None:
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def __enter__(self) -> "Generation":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+
+class GenerationStore:
+    """
+    Crash-safe, versioned data directory:
+
+        data/nj/generations/<id>/*.csv   immutable once published
+        data/nj/CURRENT                  id of the published generation
+        data/nj/pins/<pid>.pin           generation a reader process is using
+        data/nj/*.csv                    mirror of CURRENT for plain readers
+
+    A writer fills a new generation and publishes it by atomically
+    replacing CURRENT, so readers see the old set or the new set, never a
+    partial one. Readers pin the generation they started with (pin()) and
+    keep reading it even if a newer one is published meanwhile. Nobody
+    takes a lock. The newest KEEP_GENERATIONS stay on disk for rollback().
+    """
+
+    def __init__(self, root: Path = DATA_DIR, keep: int = KEEP_GENERATIONS):
+        self.root = Path(root)
+        self.keep = keep
+        self.gens_dir = self.root / "generations"
+        self.pins_dir = self.root / "pins"
+        self.pointer = self.root / "CURRENT"
+
+    # ------------------ reading ------------------
+    def current(self):
+        try:
+            gen_id = self.pointer.read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            return None
+        return gen_id or None
+
+    def generations(self) -> list[str]:
+        """Published generation ids, oldest first."""
+        if not self.gens_dir.exists():
+            return []
+        return sorted(p.name for p in self.gens_dir.iterdir()
+                      if p.is_dir() and not p.name.startswith("."))
+
+    def current_file(self, name: str):
+        """`name` in the current generation, else the plain mirror, else None."""
+        gen_id = self.current()
+        candidates = [self.gens_dir / gen_id / name] if gen_id else []
+        candidates.append(self.root / name)
+        for p in candidates:
+            if p.is_file():
+                return p
+        return None
+
+    # ------------------ writing ------------------
+    def begin(self) -> Generation:
+        """
+        Start a new generation. Ids are <UTC time to the nanosecond>-<pid>:
+        the timestamp orders them (prune and rollback sort ids as strings)
+        and the pid only keeps two processes' ids apart.
+        """
+        while True:
+            gen_id = f"{_timestamp_ns()}-{os.getpid()}"
+            if (self.gens_dir / gen_id).exists():
+                continue  # left by an earlier process with the same pid
+            try:
+                return Generation(self, gen_id)
+            except FileExistsError:
+                continue
+
+    def publish(self, gen_id: str) -> None:
+        """Make gen_id current, refresh the plain mirror and prune old generations."""
+        gen_dir = self.gens_dir / gen_id
+        if not gen_dir.is_dir():
+            raise FileNotFoundError(f"No such generation: {gen_id}")
+        atomic_write_text(self.pointer, gen_id + "\n")
+
+        # Each mirrored file is swapped by rename, so it is never partial.
+        for src in gen_dir.iterdir():
+            if not src.is_file():
+                continue
+            tmp = self.root / f".{src.name}.{os.getpid()}.tmp"
+            if tmp.exists():
+                tmp.unlink()
+            _link_or_copy(src, tmp)
+            os.replace(tmp, self.root / src.name)
+        self.prune()
+
+    def rollback(self, gen_id: str = None) -> str:
+        """Publish gen_id, or the generation before the current one."""
+        if gen_id is None:
+            gens = self.generations()
+            cur = self.current()
+            older = [g for g in gens if cur is None or g < cur]
+            if not older:
+                raise FileNotFoundError("No older generation to roll back to")
+            gen_id = older[-1]
+        self.publish(gen_id)
+        return gen_id
+
+    # ------------------ pins ------------------
+    def _live_pins(self) -> set:
+        pinned = set()
+        if not self.pins_dir.exists():
+            return pinned
+        now = time.time()
+        for p in self.pins_dir.glob("*.pin"):
+            try:
+                pid = int(p.stem)
+                gen_id = p.read_text(encoding="utf-8").strip()
+                fresh = now - p.stat().st_mtime < PIN_MAX_AGE
+            except (OSError, ValueError):
+                continue
+            if fresh and _pid_alive(pid):
+                pinned.add(gen_id)
+            else:
+                p.unlink(missing_ok=True)
+        return pinned
+
+    def pin(self):
+        """
+        Pin the current generation for the rest of this process and return
+        its id (None if nothing was published yet). Repeated calls return
+        the same generation.
+
+        If the pin file cannot be written (read-only data directory, reader
+        without write permission) the current generation is still used, just
+        unpinned: a writer may prune it later, and resolve() then falls back
+        to the plain mirror.
+
+        If CURRENT names a generation that does not exist and keeps naming
+        it (a broken store, not a writer mid-publish), nothing is pinned and
+        None is returned, so resolve() reads the plain mirror.
+        """
+        key = str(self.root.resolve())
+        if key in _pinned:
+            return _pinned[key]
+        pin_file = self.pins_dir / f"{os.getpid()}.pin"
+        pinned = True
+        gen_id = None
+        for _ in range(PIN_ATTEMPTS):
+            previous, gen_id = gen_id, self.current()
+            if gen_id is None or gen_id == previous:
+                break  # nothing published, or CURRENT is not moving
+            if pinned:
+                try:
+                    self.pins_dir.mkdir(parents=True, exist_ok=True)
+                    atomic_write_text(pin_file, gen_id + "\n")
+                except OSError as e:
+                    log(f"⚠️ Cannot pin data generation ({e}); reading it unpinned.")
+                    pinned = False
+            # A writer may have pruned it between reading CURRENT and pinning.
+            if (self.gens_dir / gen_id).is_dir():
+                _pinned[key] = gen_id
+                if pinned:
+                    atexit.register(pin_file.unlink, missing_ok=True)
+                return gen_id
+
+        if pinned and pin_file.exists():
+            pin_file.unlink()
+        if gen_id is not None:
+            log(f"⚠️ {self.pointer} names missing generation {gen_id}; reading {self.root} unpinned.")
+            _pinned[key] = None
+        return None
+
+    def resolve(self, path) -> Path:
+        """path (a file in root) inside the pinned generation, if it is there."""
+        path = Path(path)
+        gen_id = self.pin()
+        if gen_id is not None:
+            candidate = self.gens_dir / gen_id / path.name
+            if candidate.is_file():
+                return candidate
+        return path
+
+    # ------------------ cleanup ------------------
+    def prune(self) -> list[str]:
+        """Delete generations beyond the newest `keep`, unless current or pinned."""
+        gens = self.generations()
+        protected = set(gens[-self.keep:]) | self._live_pins()
+        cur = self.current()
+        if cur:
+            protected.add(cur)
+        removed = []
+        for gen_id in gens:
+            if gen_id not in protected:
+                shutil.rmtree(self.gens_dir / gen_id, ignore_errors=True)
+                removed.append(gen_id)
+
+        now = time.time()
+        for p in self.gens_dir.glob(".tmp-*"):
+            try:
+                if now - p.stat().st_mtime > TMP_MAX_AGE:
+                    shutil.rmtree(p, ignore_errors=True)
+            except OSError:
+                pass
+        return removed
+
+
+_pinned = {}
+_last_ns = 0
+
+
+def _timestamp_ns() -> str:
+    """UTC time as YYYYmmddTHHMMSS.nnnnnnnnnZ, strictly increasing within a process."""
+    global _last_ns
+    _last_ns = ns = max(time.time_ns(), _last_ns + 1)
+    seconds, nanos = divmod(ns, 10**9)
+    return time.strftime("%Y%m%dT%H%M%S", time.gmtime(seconds)) + f".{nanos:09d}Z"
+
+
+def pinned_path(path) -> Path:
+    """
+    Where a reader should open a data file: inside this process's pinned
+    generation when the file's directory is a GenerationStore, else as is.
+    """
+    path = Path(path)
+    store = GenerationStore(path.parent)
+    if not store.pointer.exists():
+        return path
+    return store.resolve(path)
@@ -0,0 +1,114 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from common import atomic_write_text
+
+# Where run metrics are written. Point METRICS_DIR at the node_exporter
+# textfile-collector directory in production.
+METRICS_DIR = Path(os.environ.get("METRICS_DIR", "metrics"))
+
+PREFIX = "lottery_"
+
+
+def _escape_label(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metrics:
+    """
+    In-memory metrics for one run (fetch or one analyzer).
+
+    Values are keyed by (name, labels). Nothing is printed or written until
+    write() is called, which produces:
+      - <job>.prom   Prometheus textfile format (atomically replaced)
+      - <job>.jsonl  one JSON object per run (appended)
+    """
+
+    def __init__(self, job: str):
+        self.job = job
+        self.started = time.time()
+        self._values = {}
+        self._types = {}
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> tuple:
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Add to a counter (created at 0)."""
+        key = self._key(name, labels)
+        self._types.setdefault(name, "counter")
+        self._values[key] = self._values.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        """Set a gauge to an absolute value."""
+        self._types.setdefault(name, "gauge")
+        self._values[self._key(name, labels)] = value
+
+    def get(self, name: str, default: float = 0, **labels) -> float:
+        return self._values.get(self._key(name, labels), default)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """
+        Time a block in seconds. Repeated blocks with the same name/labels
+        accumulate, so split phases can be timed around print statements.
+        """
+        key = self._key(name, labels)
+        self._types.setdefault(name, "gauge")
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._values[key] = self._values.get(key, 0) + (time.perf_counter() - t0)
+
+    # ------------------ output ------------------
+    def to_prometheus(self) -> str:
+        lines = []
+        by_name = {}
+        for (name, labels), value in self._values.items():
+            by_name.setdefault(name, []).append((labels, value))
+
+        for name in sorted(by_name):
+            full = PREFIX + name
+            lines.append(f"# TYPE {full} {self._types.get(name, 'gauge')}")
+            for labels, value in sorted(by_name[name]):
+                if labels:
+                    lbl = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels)
+                    lines.append(f"{full}{{{lbl}}} {value}")
+                else:
+                    lines.append(f"{full} {value}")
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> dict:
+        return {
+            "job": self.job,
+            "timestamp": self.started,
+            "metrics": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._values.items())
+            ],
+        }
+
+    def write(self, out_dir: Path = None) -> tuple[Path, Path]:
+        """
+        Finish the run and write both outputs. Safe to call from a finally
+        block: errors are reported but never raised.
+        """
+        out_dir = Path(out_dir or METRICS_DIR)
+        self.set("run_duration_seconds", time.time() - self.started, job=self.job)
+        self.set("run_timestamp_seconds", self.started, job=self.job)
+
+        prom_path = out_dir / f"{self.job}.prom"
+        jsonl_path = out_dir / f"{self.job}.jsonl"
+        try:
+            out_dir.mkdir(parents=True, exist_ok=True)
+            atomic_write_text(prom_path, self.to_prometheus())
+            with jsonl_path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(self.to_dict(), sort_keys=True) + "\n")
+        except OSError as e:
+            print(f"⚠️ Could not write metrics to {out_dir}: {e}")
+        return prom_path, jsonl_path
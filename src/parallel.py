@@ -0,0 +1,96 @@
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from aggregate import DEFAULT_CHUNK_SIZE, GameStats, StreamingAggregator
+from common import DrawParser, DrawTable, GameSpec
+from query import compile_query
+
+# Below this size a process pool costs more than it saves.
+MIN_PARALLEL_BYTES = 1 << 20
+
+
+def byte_shards(path: str, n: int) -> tuple[list[str], list[tuple[int, int]]]:
+    """
+    Split a CSV into up to n byte ranges that start and end on line
+    boundaries (header excluded). Returns (header, [(start, end), ...]).
+
+    Assumes no quoted field spans lines, which holds for data/nj CSVs.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header_line = f.readline()
+        body_start = f.tell()
+        header = next(csv.reader([header_line.decode("utf-8")]), [])
+
+        cuts = [body_start]
+        step = max((size - body_start) // max(n, 1), 1)
+        for k in range(1, n):
+            f.seek(max(body_start + k * step, cuts[-1]))
+            f.readline()  # move to the start of the next line
+            pos = f.tell()
+            if pos >= size:
+                break
+            if pos > cuts[-1]:
+                cuts.append(pos)
+        cuts.append(size)
+
+    return header, [(a, b) for a, b in zip(cuts, cuts[1:]) if b > a]
+
+
+def count_shard(spec: GameSpec, path: str, header: list[str], start: int, end: int,
+                keep: int, chunk_size: int = DEFAULT_CHUNK_SIZE, where: str = None) -> GameStats:
+    """
+    Map step: GameStats for the rows in bytes [start, end), counting only
+    draws that match `where` if given (compiled here: queries do not pickle).
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+
+    reader = csv.reader(io.StringIO(text, newline=""))
+    parser = DrawParser(spec, header)
+    query = compile_query(where, spec) if where else None
+    agg = StreamingAggregator(spec, keep)
+    while True:
+        records = list(islice(reader, chunk_size))
+        if not records:
+            break
+        chunk = DrawTable.from_records(spec, header, records, parser)
+        agg.add_chunk(query.filter(chunk) if query else chunk)
+    return agg.result(parser)
+
+
+def parallel_stats(spec: GameSpec, path: str = None, keep: int = 50, workers: int = None,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE, metrics=None, where: str = None) -> GameStats:
+    """
+    Map-reduce GameStats over byte shards of the CSV in a process pool.
+    The merged result is identical to the single-process path.
+    """
+    path = path or spec.csv_path
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"CSV file not found: {path}")
+    workers = workers or os.cpu_count() or 1
+
+    if workers <= 1 or os.path.getsize(path) < MIN_PARALLEL_BYTES:
+        # Not worth the pool: one shard, same code path.
+        header, shards = byte_shards(path, 1)
+        parts = [count_shard(spec, path, header, a, b, keep, chunk_size, where) for a, b in shards]
+        n_workers = 1
+    else:
+        header, shards = byte_shards(path, workers)
+        n_workers = min(workers, len(shards))
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = [
+                pool.submit(count_shard, spec, path, header, a, b, keep, chunk_size, where)
+                for a, b in shards
+            ]
+            parts = [fut.result() for fut in futures]
+
+    if metrics is not None:
+        metrics.set("analyze_workers", n_workers, game=spec.key)
+    if not parts:
+        return GameStats(spec)
+    return GameStats.merge(parts, keep)
@@ -0,0 +1,484 @@
+import argparse
+import operator
+import os
+import re
+import sys
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import date
+from functools import cached_property
+
+sys.path.append("src")
+from common import GAMES, DrawTable, GameSpec, to_ordinal, top_n  # noqa: E402
+from generations import pinned_path  # noqa: E402
+from shapes import shape_columns  # noqa: E402
+from transitions import occurrence_bitsets  # noqa: E402
+
+QUERY_HELP = """\
+Draw filter, e.g. "since 2017 and contains 7,23 and sum between 120 and 180 and mb <= 10".
+Predicates (combine with and / or / not / parentheses):
+  contains|all N,N..   any N,N..   none N,N..     main balls; prefix with
+                                                 special/mb/pb/dp for special balls
+  since DATE   until DATE   date|year OP DATE     DATE = 2017, 2017-06 or 2017-06-30
+  sum|odd|even|high|low|spread|run OP N           main-ball draw shape
+  special|mb|pb OP N                              single special ball
+  multiplier|xtra|extra OP VALUE                  Mega multiplier / Cash 5 XTRA
+  FIELD between A and B                           inclusive range
+OP is one of = != < <= > >= (also ≤ ≥ ≠)."""
+
+SET_MODES = {"contains": "all", "has": "all", "all": "all", "any": "any", "none": "none"}
+MAIN_ALIASES = {"main", "white", "balls"}
+SPECIAL_ALIASES = {"special", "mb", "pb", "dp"}
+DATE_FIELDS = {"date", "year"}
+SHAPE_FIELDS = {"sum", "odd", "even", "high", "low", "spread", "run"}
+EXTRA_FIELDS = {"extra", "multiplier", "xtra"}
+FIELDS = DATE_FIELDS | SHAPE_FIELDS | EXTRA_FIELDS | SPECIAL_ALIASES
+
+OPS = {
+    "=": operator.eq, "==": operator.eq, "!=": operator.ne, "≠": operator.ne,
+    "<": operator.lt, "<=": operator.le, "≤": operator.le,
+    ">": operator.gt, ">=": operator.ge, "≥": operator.ge,
+}
+
+_TOKEN = re.compile(r"\s*(?:(<=|>=|!=|==|[<>=(),≤≥≠])|([^\s<>=!(),≤≥≠]+))")
+
+
+class QueryError(ValueError):
+    pass
+
+
+# ================== PARSING ==================
+# Syntax tree nodes are tuples:
+#   ("and", a, b)  ("or", a, b)  ("not", a)
+#   ("set", ball_set, mode, numbers)        mode: all / any / none
+#   ("cmp", field, op, value)               op: a key of OPS
+#   ("between", field, low, high)
+# Date values are (first day, last day) ordinals of the period written.
+def _tokenize(text: str) -> list[str]:
+    tokens, pos = [], 0
+    text = text.strip()
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if not m or m.end() == pos:
+            raise QueryError(f"unexpected character at {pos}: {text[pos:pos + 10]!r}")
+        tokens.append(m.group(1) or m.group(2).lower())
+        pos = m.end()
+    return tokens
+
+
+def date_period(value: str) -> tuple[int, int]:
+    """(first, last) day ordinal of a year, a month or a single date."""
+    try:
+        if re.fullmatch(r"\d{4}", value):
+            y = int(value)
+            return date(y, 1, 1).toordinal(), date(y, 12, 31).toordinal()
+        m = re.fullmatch(r"(\d{4})-(\d{1,2})", value)
+        if m:
+            y, mo = int(m.group(1)), int(m.group(2))
+            nxt = date(y + (mo == 12), mo % 12 + 1, 1)
+            return date(y, mo, 1).toordinal(), nxt.toordinal() - 1
+        d = to_ordinal(value)
+    except ValueError:
+        raise QueryError(f"bad date {value!r}") from None
+    return d, d
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.tokens = _tokenize(text)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self, what: str = "more") -> str:
+        tok = self.peek()
+        if tok is None:
+            raise QueryError(f"expected {what} at end of query")
+        self.pos += 1
+        return tok
+
+    def expect(self, literal: str) -> None:
+        tok = self.take(repr(literal))
+        if tok != literal:
+            raise QueryError(f"expected {literal!r}, got {tok!r}")
+
+    def parse(self):
+        if self.peek() is None:
+            raise QueryError("empty query")
+        node = self.expr()
+        if self.peek() is not None:
+            raise QueryError(f"unexpected {self.peek()!r}")
+        return node
+
+    def expr(self):
+        node = self.term()
+        while self.peek() == "or":
+            self.take()
+            node = ("or", node, self.term())
+        return node
+
+    def term(self):
+        node = self.factor()
+        while self.peek() == "and":
+            self.take()
+            node = ("and", node, self.factor())
+        return node
+
+    def factor(self):
+        tok = self.peek()
+        if tok == "not":
+            self.take()
+            return ("not", self.factor())
+        if tok == "(":
+            self.take()
+            node = self.expr()
+            self.expect(")")
+            return node
+        return self.predicate()
+
+    def numbers(self) -> tuple:
+        nums = [self.integer()]
+        while self.peek() == "," or (self.peek() or "").isdigit():
+            if self.peek() == ",":
+                self.take()
+            nums.append(self.integer())
+        return tuple(nums)
+
+    def integer(self) -> int:
+        tok = self.take("a number")
+        if not tok.isdigit():
+            raise QueryError(f"expected a number, got {tok!r}")
+        return int(tok)
+
+    def value(self, field: str):
+        if field in DATE_FIELDS:
+            return date_period(self.take("a date"))
+        if field in EXTRA_FIELDS:
+            return self.take("a value").upper()
+        return self.integer()
+
+    def predicate(self):
+        tok = self.take("a predicate")
+        if tok in SET_MODES:
+            return ("set", "main", SET_MODES[tok], self.numbers())
+        if tok in ("since", "until"):
+            return ("cmp", "date", ">=" if tok == "since" else "<=", self.value("date"))
+        if tok in MAIN_ALIASES | SPECIAL_ALIASES and self.peek() in SET_MODES:
+            return ("set", tok, SET_MODES[self.take()], self.numbers())
+        if tok not in FIELDS:
+            raise QueryError(f"unknown field or predicate {tok!r}")
+        op = self.take("an operator")
+        if op == "between":
+            low = self.value(tok)
+            if self.peek() == "and":
+                self.take()
+            return ("between", tok, low, self.value(tok))
+        if op not in OPS:
+            raise QueryError(f"unknown operator {op!r} after {tok!r}")
+        return ("cmp", tok, op, self.value(tok))
+
+
+def parse_query(text: str):
+    """Syntax tree of a --where expression (raises QueryError)."""
+    return _Parser(text).parse()
+
+
+# ================== INDEX ==================
+def _value_bitsets(values) -> dict:
+    """{value: bitset of the positions holding it} for a per-draw column."""
+    rows = {}
+    n = len(values)
+    for i, v in enumerate(values):
+        row = rows.get(v)
+        if row is None:
+            row = rows[v] = bytearray((n + 7) // 8)
+        row[i >> 3] |= 1 << (i & 7)
+    return {v: int.from_bytes(r, "little") for v, r in rows.items()}
+
+
+class DrawIndex:
+    """
+    Bitset columns over one DrawTable: bit i of every mask is draw i.
+    Each column is built on first use, so a query only pays for what it
+    references.
+    """
+
+    def __init__(self, table: DrawTable):
+        self.table = table
+        self.n = len(table)
+        self.full = (1 << self.n) - 1
+
+    @cached_property
+    def balls(self) -> list[int]:
+        spec, t = self.table.spec, self.table
+        return occurrence_bitsets(t.balls, spec.n_balls, max(spec.ball_max, max(t.balls, default=0)),
+                                  self.n)
+
+    @cached_property
+    def special(self) -> list[int]:
+        spec, t = self.table.spec, self.table
+        return occurrence_bitsets(t.special, spec.n_special,
+                                  max(spec.special_max, max(t.special, default=0)), self.n)
+
+    @cached_property
+    def special_values(self) -> dict:
+        return _value_bitsets(self.table.special)
+
+    @cached_property
+    def extra_values(self) -> dict:
+        values = self.table.extra_values
+        return {values[c]: bits for c, bits in _value_bitsets(self.table.extra_codes).items()}
+
+    @cached_property
+    def shapes(self) -> dict:
+        spec = self.table.spec
+        feats = shape_columns(self.table.balls, spec.n_balls, spec.ball_max) if self.n else \
+            {"sum": [], "odd": [], "high": [], "spread": [], "run": []}
+        feats["even"] = [spec.n_balls - v for v in feats["odd"]]
+        feats["low"] = [spec.n_balls - v for v in feats["high"]]
+        return {name: _value_bitsets(col) for name, col in feats.items()}
+
+    def day_range(self, first: int, last: int) -> int:
+        """Mask of draws dated first..last (days are sorted)."""
+        lo = bisect_left(self.table.days, first)
+        hi = bisect_right(self.table.days, last)
+        if hi <= lo:
+            return 0
+        return ((1 << hi) - 1) ^ ((1 << lo) - 1)
+
+    def select(self, mask: int) -> DrawTable:
+        """Table of the draws whose bit is set, in date order."""
+        if mask == self.full:
+            return self.table
+        bits = format(mask, "b")[::-1]
+        return self.table.take([i for i, c in enumerate(bits) if c == "1"])
+
+
+# ================== COMPILING ==================
+def _leading_int(value: str):
+    m = re.match(r"\d+", value)
+    return int(m.group()) if m else None
+
+
+class Query:
+    """
+    A --where expression bound to one game: mask(index) evaluates it as
+    big-int ANDs/ORs over a DrawIndex, filter(table) returns the matching
+    draws. Game-specific names (mb on Powerball, xtra on Mega ...) are
+    rejected here with QueryError.
+    """
+
+    def __init__(self, text: str, spec: GameSpec):
+        self.text = text
+        self.spec = spec
+        self._mask = self._compile(parse_query(text))
+
+    def __repr__(self) -> str:
+        return f"Query({self.text!r}, {self.spec.key!r})"
+
+    def mask(self, index: DrawIndex) -> int:
+        return self._mask(index)
+
+    def filter(self, table: DrawTable) -> DrawTable:
+        """
+        The matching draws of table. rows_read and rejected are carried over:
+        they describe the file the draws came from, not the selection.
+        """
+        index = DrawIndex(table)
+        out = index.select(self.mask(index))
+        out.rows_read, out.rejected = table.rows_read, table.rejected
+        return out
+
+    # ------------------ node compilers ------------------
+    def _compile(self, node):
+        kind = node[0]
+        if kind in ("and", "or"):
+            a, b = self._compile(node[1]), self._compile(node[2])
+            if kind == "and":
+                return lambda ix: a(ix) & b(ix)
+            return lambda ix: a(ix) | b(ix)
+        if kind == "not":
+            a = self._compile(node[1])
+            return lambda ix: ix.full & ~a(ix)
+        if kind == "set":
+            return self._set(*node[1:])
+        if kind == "between":
+            _, field, low, high = node
+            return self._range(field, lambda v: low <= v <= high, low, high)
+        _, field, op, value = node
+        return self._compare(field, op, value)
+
+    def _special_set(self, name: str) -> None:
+        spec = self.spec
+        if not spec.n_special:
+            raise QueryError(f"{spec.title} has no special ball")
+        if name not in ("special", spec.special_label.lower()):
+            raise QueryError(f"{name!r} is not a {spec.title} ball (use special or "
+                             f"{spec.special_label.lower()})")
+
+    def _set(self, ball_set: str, mode: str, numbers: tuple):
+        special = ball_set in SPECIAL_ALIASES
+        if special:
+            self._special_set(ball_set)
+
+        def mask(ix: DrawIndex) -> int:
+            cols = ix.special if special else ix.balls
+            bits = [cols[x] if x < len(cols) else 0 for x in numbers]
+            if mode == "all":
+                acc = ix.full
+                for b in bits:
+                    acc &= b
+                return acc
+            acc = 0
+            for b in bits:
+                acc |= b
+            return acc if mode == "any" else ix.full & ~acc
+        return mask
+
+    def _compare(self, field: str, op: str, value):
+        if field in DATE_FIELDS:
+            first, last = value
+            # A period compares as a whole: "date <= 2017" includes all of 2017.
+            bounds = {
+                "=": (first, last), "==": (first, last),
+                "<": (None, first - 1), "<=": (None, last), "≤": (None, last),
+                ">": (last + 1, None), ">=": (first, None), "≥": (first, None),
+            }
+            if op in ("!=", "≠"):
+                inner = self._dates(first, last)
+                return lambda ix: ix.full & ~inner(ix)
+            return self._dates(*bounds[op])
+        if field in EXTRA_FIELDS:
+            return self._extra(field, op, value)
+        fn = OPS[op]
+        return self._range(field, lambda v: fn(v, value))
+
+    def _dates(self, first, last):
+        first = first if first is not None else 0
+        last = last if last is not None else 1 << 30
+        return lambda ix: ix.day_range(first, last)
+
+    def _range(self, field: str, test, *dates):
+        if field in DATE_FIELDS:
+            return self._dates(dates[0][0], dates[1][1])
+        if field in EXTRA_FIELDS:
+            raise QueryError(f"{field} does not support between")
+        if field in SPECIAL_ALIASES:
+            self._special_set(field)
+            if self.spec.n_special != 1:
+                raise QueryError(f"{field} has {self.spec.n_special} numbers per draw; "
+                                 f"use {field} contains/any/none")
+
+            def column(ix):
+                return ix.special_values
+        else:
+            def column(ix):
+                return ix.shapes[field]
+
+        def mask(ix: DrawIndex) -> int:
+            acc = 0
+            for v, bits in column(ix).items():
+                if test(v):
+                    acc |= bits
+            return acc
+        return mask
+
+    def _extra(self, field: str, op: str, value: str):
+        spec = self.spec
+        if not spec.extra_col:
+            raise QueryError(f"{spec.title} has no multiplier/XTRA column")
+        if field not in ("extra", spec.extra_col):
+            raise QueryError(f"{field!r} is not a {spec.title} field (use extra or {spec.extra_col})")
+        norm = spec.extra_normalizer(value) if spec.extra_normalizer else value
+        fn = OPS[op]
+        if fn in (operator.eq, operator.ne):
+            def test(v):
+                return fn(v, norm)
+        else:
+            target = _leading_int(norm)
+            if target is None:
+                raise QueryError(f"{value!r} is not a number")
+
+            def test(v):
+                num = _leading_int(v)
+                return num is not None and fn(num, target)
+
+        def mask(ix: DrawIndex) -> int:
+            acc = 0
+            for v, bits in ix.extra_values.items():
+                if test(v):
+                    acc |= bits
+            return acc
+        return mask
+
+
+def compile_query(text: str, spec: GameSpec) -> Query:
+    return Query(text, spec)
+
+
+def where_arg(value: str) -> str:
+    """argparse type for --where: syntax-checked, bound to a game later."""
+    try:
+        parse_query(value)
+    except QueryError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+
+# ================== CLI ==================
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Filter draw history and count the matches",
+                                 formatter_class=argparse.RawDescriptionHelpFormatter,
+                                 epilog=QUERY_HELP)
+    ap.add_argument("--games", default=",".join(GAMES),
+                    help=f"comma-separated games (default {','.join(GAMES)})")
+    ap.add_argument("--where", type=where_arg, required=True, help="draw filter (see below)")
+    ap.add_argument("--top", type=int, default=10, help="rows per table (default 10)")
+    ap.add_argument("--latest", type=int, default=10, help="matching draws to list (default 10)")
+    args = ap.parse_args(argv)
+
+    print("\n===== QUERY =====")
+    print(f"Where: {args.where}")
+    for key in [g.strip() for g in args.games.split(",") if g.strip()]:
+        spec = GAMES[key]
+        if not os.path.exists(spec.csv_path):
+            print(f"⚠️ {spec.csv_path} not found. Skipping {key}.")
+            continue
+        try:
+            query = compile_query(args.where, spec)
+        except QueryError as e:
+            print(f"⚠️ {key}: {e}. Skipping.")
+            continue
+        table = DrawTable.from_csv(spec, str(pinned_path(spec.csv_path)))
+
+        t0 = time.perf_counter()
+        index = DrawIndex(table)
+        mask = query.mask(index)
+        elapsed = time.perf_counter() - t0
+        hits = mask.bit_count()
+        print(f"\n{spec.title}: {hits} of {len(table)} draws match ({elapsed * 1000:.1f} ms)")
+        if not hits:
+            continue
+
+        print("-" * 60)
+        for dr in index.select(mask).newest(args.latest):
+            special = f" | {spec.special_label}: {' '.join(map(str, dr.special))}" if dr.special else ""
+            extra = f" | {dr.extra}" if dr.extra else ""
+            print(f"{dr.date_str} | {' '.join(map(str, dr.balls))}{special}{extra}")
+
+        # Counts over the matches straight from the bitsets
+        sets = [("MAIN BALLS", index.balls)]
+        if spec.n_special:
+            sets.append((f"{spec.special_label} BALLS", index.special))
+        for label, cols in sets:
+            counts = Counter({x: (c & mask).bit_count() for x, c in enumerate(cols) if c & mask})
+            print(f"\nTOP {args.top} {label} (matching draws)")
+            print("-" * 60)
+            for x, c in top_n(counts, args.top):
+                print(f"{x:2d} -> {c} times")
+
+
+if __name__ == "__main__":
+    main()
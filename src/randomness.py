@@ -0,0 +1,254 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import lru_cache
+from math import erfc, sqrt
+from statistics import NormalDist
+
+sys.path.append("src")
+from common import GAMES, DrawTable, GameSpec  # noqa: E402
+from generations import pinned_path  # noqa: E402
+from transitions import occurrence_bitsets  # noqa: E402
+
+DEFAULT_WINDOWS = [100, 500]
+ALPHA = 0.05
+
+# Below this many draws a window is skipped: the normal approximations break down.
+MIN_DRAWS = 30
+
+
+# ================== DISTRIBUTIONS (closed form) ==================
+def chi2_sf(x: float, df: int) -> float:
+    """Upper tail of chi-square(df), Wilson-Hilferty cube-root approximation."""
+    if df <= 0:
+        return 1.0
+    if x <= 0:
+        return 1.0
+    v = 2 / (9 * df)
+    z = ((x / df) ** (1 / 3) - (1 - v)) / sqrt(v)
+    return 0.5 * erfc(z / sqrt(2))
+
+
+@lru_cache(maxsize=None)
+def chi2_critical(df: int, alpha: float = ALPHA) -> float:
+    v = 2 / (9 * df)
+    z = NormalDist().inv_cdf(1 - alpha)
+    return df * (1 - v + z * sqrt(v)) ** 3
+
+
+@lru_cache(maxsize=None)
+def z_critical(alpha: float = ALPHA, tests: int = 1) -> float:
+    """Two-sided critical |z|, Bonferroni-corrected for `tests` tests."""
+    return NormalDist().inv_cdf(1 - alpha / (2 * tests))
+
+
+# ================== BATTERY ==================
+class BallSetResult:
+    """Every test for one ball set of one game over one window."""
+
+    __slots__ = ("game", "ball", "window", "draws", "excluded", "since", "chi2", "chi2_df",
+                 "chi2_p", "z", "runs_z", "serial_z")
+
+    def __init__(self, game: str, ball: str, window, draws: int):
+        self.game = game
+        self.ball = ball
+        self.window = window
+        self.draws = draws
+        self.excluded = 0   # older draws with another number range, left out
+        self.since = None   # day ordinal of the first tested draw if any were
+        self.chi2 = 0.0
+        self.chi2_df = 0
+        self.chi2_p = 1.0
+        self.z = {}         # number -> binomial z of its count
+        self.runs_z = {}    # number -> Wald-Wolfowitz z of its appearance sequence
+        self.serial_z = {}  # number -> z of its lag-1 autocorrelation
+
+
+def ball_set_tests(cols: list[int], n_total: int, width: int, hi: int, window=None,
+                  game: str = "", ball: str = "main") -> BallSetResult:
+    """
+    All tests for one ball set over the latest `window` draws (None = all).
+
+    cols[x] is the occurrence bitset of number x (bit i = drawn in draw i),
+    so counts, runs and lag-1 products for a number are popcounts of a few
+    shifted big ints, whatever the history length.
+    """
+    n = n_total if window is None else min(window, n_total)
+    lo = n_total - n
+    full = (1 << n) - 1
+    head = full >> 1  # positions with a successor
+    p = width / hi
+    expected = n * p
+    var = n * p * (1 - p)
+
+    res = BallSetResult(game, ball, window, n)
+    z, runs_z, serial_z = res.z, res.runs_z, res.serial_z
+    chi2 = 0.0
+    for x in range(1, hi + 1):
+        c = (cols[x] >> lo) & full
+        k = c.bit_count()
+
+        chi2 += (k - expected) ** 2 / expected
+        z[x] = (k - expected) / sqrt(var) if var else 0.0
+
+        # Wald-Wolfowitz: runs = 1 + number of changes between neighbours
+        n0 = n - k
+        if k and n0:
+            runs = 1 + ((c ^ (c >> 1)) & head).bit_count()
+            mu = 2 * k * n0 / n + 1
+            sigma2 = (mu - 1) * (mu - 2) / (n - 1)
+            runs_z[x] = (runs - mu) / sqrt(sigma2) if sigma2 > 0 else 0.0
+
+            # lag-1 autocorrelation of the 0/1 sequence; ~ N(-1/n, 1/n)
+            m = k / n
+            both = (c & (c >> 1) & head).bit_count()
+            s_prev = (c & head).bit_count()
+            s_next = (c >> 1).bit_count()
+            num = both - m * (s_prev + s_next) + (n - 1) * m * m
+            r1 = num / (n * m * (1 - m))
+            serial_z[x] = (r1 + 1 / n) * sqrt(n)
+        else:
+            runs_z[x] = serial_z[x] = 0.0
+
+    # Draws are without replacement, so counts are negatively correlated:
+    # scale by (hi-1)/(hi-width) for a chi-square(hi-1) reference.
+    res.chi2 = chi2 * ((hi - 1) / (hi - width) if hi > width else 1.0)
+    res.chi2_df = hi - 1
+    res.chi2_p = chi2_sf(res.chi2, res.chi2_df)
+    return res
+
+
+def ball_sets(spec: GameSpec) -> list[tuple[str, bool]]:
+    sets = [("main", False)]
+    if spec.n_special:
+        sets.append((spec.special_label, True))
+    return sets
+
+
+def run_battery(table: DrawTable, windows=DEFAULT_WINDOWS) -> list[BallSetResult]:
+    """
+    Every test for every ball set of a game, over full history and each
+    window. Expected counts assume one number range, so only draws of the
+    current range (drift.table_eras) are tested; older draws are left out
+    and counted in each result's `excluded`.
+    """
+    from drift import table_eras  # drift imports this module
+
+    spec = table.spec
+    results = []
+    for ball, special in ball_sets(spec):
+        width = spec.n_special if special else spec.n_balls
+        hi = spec.special_max if special else spec.ball_max
+        values = table.special if special else table.balls
+        eras = table_eras(table, special)
+        start = eras[-1].start if eras else 0
+        hi = max(hi, eras[-1].top) if eras else hi
+        n = len(table) - start
+        cols = occurrence_bitsets(values[start * width:], width, hi, n)
+        for window in [None] + [w for w in windows if w < n]:
+            if (window or n) < MIN_DRAWS:
+                continue
+            res = ball_set_tests(cols, n, width, hi, window, spec.key, ball)
+            if start:
+                res.excluded, res.since = start, table.days[start]
+            results.append(res)
+    return results
+
+
+def _battery_task(desc, windows) -> list[BallSetResult]:
+    """Worker: run_battery over a table shared by the parent (see shm)."""
+    from shm import attach
+
+    return run_battery(attach(desc), windows)
+
+
+def run_batteries(tables: list[DrawTable], windows=DEFAULT_WINDOWS,
+                  workers: int = 1) -> list[list[BallSetResult]]:
+    """
+    run_battery for several games, in order. With workers > 1 the games run
+    in a process pool; each table is published once in shared memory and
+    workers attach to it instead of receiving a pickled copy.
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tables)))
+    if workers == 1:
+        return [run_battery(table, windows) for table in tables]
+
+    from shm import SharedDraws
+
+    with SharedDraws() as shared, ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_battery_task, shared.publish(table), windows) for table in tables]
+        return [fut.result() for fut in futures]
+
+
+# ================== CLI ==================
+def _flagged(zs: dict, crit: float) -> str:
+    hits = sorted((x for x, v in zs.items() if abs(v) > crit), key=lambda x: -abs(zs[x]))
+    return ", ".join(f"{x} ({zs[x]:+.2f})" for x in hits) if hits else "none"
+
+
+def print_result(res: BallSetResult, alpha: float = ALPHA) -> None:
+    if res.window:
+        scope = f"last {res.window} draws"
+    elif res.since is not None:
+        scope = f"since {date.fromordinal(res.since).isoformat()}, {res.draws} draws"
+    else:
+        scope = f"full history, {res.draws} draws"
+    tests = len(res.z)
+    crit = z_critical(alpha)
+    crit_bonf = z_critical(alpha, tests)
+    verdict = "REJECT uniform" if res.chi2_p < alpha else "consistent with uniform"
+
+    print(f"\n{GAMES[res.game].title} {res.ball} ({scope})")
+    print("-" * 60)
+    print(f"Chi-square: {res.chi2:.2f} on {res.chi2_df} df | p = {res.chi2_p:.4f} "
+          f"| crit {chi2_critical(res.chi2_df, alpha):.2f} -> {verdict}")
+    if res.excluded and not res.window:
+        print(f"⚠️ {res.excluded} older draws with another number range left out.")
+    for label, zs in (("Binomial z (counts)", res.z), ("Runs test z", res.runs_z),
+                      ("Serial corr z", res.serial_z)):
+        beyond = sum(abs(v) > crit for v in zs.values())
+        print(f"{label}: {beyond}/{tests} beyond ±{crit:.2f} "
+              f"(~{alpha * tests:.1f} expected by chance) | "
+              f"Bonferroni ±{crit_bonf:.2f}: {_flagged(zs, crit_bonf)}")
+
+
+def parse_windows(value: str) -> list[int]:
+    return [int(w) for w in value.split(",") if w.strip()]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Randomness test battery for every game")
+    ap.add_argument("--games", default=",".join(GAMES),
+                    help=f"comma-separated games (default {','.join(GAMES)})")
+    ap.add_argument("--windows", type=parse_windows, default=DEFAULT_WINDOWS,
+                    help="comma-separated latest-N windows tested besides full history "
+                         f"(default {','.join(map(str, DEFAULT_WINDOWS))})")
+    ap.add_argument("--alpha", type=float, default=ALPHA, help=f"significance level (default {ALPHA})")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="test games in N processes sharing the draw tables (default 1)")
+    args = ap.parse_args(argv)
+
+    print("\n===== RANDOMNESS TESTS =====")
+    t0 = time.perf_counter()
+    tables = []
+    for key in [g.strip() for g in args.games.split(",") if g.strip()]:
+        spec = GAMES[key]
+        if not os.path.exists(spec.csv_path):
+            print(f"⚠️ {spec.csv_path} not found. Skipping {key}.")
+            continue
+        table = DrawTable.from_csv(spec, str(pinned_path(spec.csv_path)))
+        if len(table) < MIN_DRAWS:
+            print(f"⚠️ {key}: only {len(table)} draws, need {MIN_DRAWS}. Skipping.")
+            continue
+        tables.append(table)
+    for results in run_batteries(tables, args.windows, args.workers):
+        for res in results:
+            print_result(res, args.alpha)
+    print(f"\n✅ Battery finished in {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
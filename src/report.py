@@ -0,0 +1,155 @@
+import argparse
+import csv
+import io
+import json
+import sys
+from pathlib import Path
+
+from common import atomic_write_text
+
+REPORTS_DIR = Path("reports")
+
+FORMATS = ("text", "json", "csv")
+
+# Labels of the 6-level frequency buckets, hottest first
+MIX6_LEVELS = ["VERY HOT", "HOT", "MEDIUM", "LESS MEDIUM", "LOW", "VERY LOW"]
+
+
+class Section:
+    """
+    One block of a report: a table (columns + rows) plus how it reads as text.
+
+    Text is `text` if given, else each row through `row_fmt`. Sections with
+    title=None are data-only (JSON/CSV) and skipped in text output.
+    """
+
+    __slots__ = ("key", "title", "columns", "rows", "row_fmt", "text", "width")
+
+    def __init__(self, key: str, title, columns: list[str], rows: list, row_fmt: str = None,
+                 text: list[str] = None, width: int = 60):
+        self.key = key
+        self.title = title
+        self.columns = columns
+        self.rows = rows
+        self.row_fmt = row_fmt
+        self.text = text
+        self.width = width
+
+    def text_lines(self) -> list[str]:
+        if self.text is not None:
+            return self.text
+        return [self.row_fmt.format(*row) for row in self.rows]
+
+
+class Report:
+    """Structured result of one analyzer run."""
+
+    def __init__(self, game: str, title: str, meta: dict = None):
+        self.game = game
+        self.title = title
+        self.meta = meta or {}
+        self.sections = []
+
+    def add(self, key: str, title, columns: list[str], rows: list, row_fmt: str = None,
+            text: list[str] = None, width: int = 60) -> Section:
+        sec = Section(key, title, columns, [list(r) for r in rows], row_fmt, text, width)
+        self.sections.append(sec)
+        return sec
+
+    def section(self, key: str) -> Section:
+        for sec in self.sections:
+            if sec.key == key:
+                return sec
+        raise KeyError(key)
+
+    def to_dict(self) -> dict:
+        return {
+            "game": self.game,
+            "title": self.title,
+            "meta": self.meta,
+            "sections": {
+                sec.key: {"title": sec.title, "columns": sec.columns, "rows": sec.rows}
+                for sec in self.sections
+            },
+        }
+
+
+# ================== RENDERERS ==================
+def render_text(report: Report) -> str:
+    out = []
+    for sec in report.sections:
+        if sec.title is None:
+            continue
+        out.append(f"\n{sec.title}")
+        out.append("-" * sec.width)
+        out.extend(sec.text_lines())
+    return "\n".join(out) + "\n"
+
+
+def render_json(report: Report) -> str:
+    return json.dumps(report.to_dict(), indent=2) + "\n"
+
+
+def render_csv(sec: Section) -> str:
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    w.writerow(sec.columns)
+    w.writerows(sec.rows)
+    return buf.getvalue()
+
+
+def write_report(report: Report, formats=FORMATS, out_dir: Path = None) -> list[Path]:
+    """
+    Write the report into out_dir, one buffered (atomic) write per file:
+      text -> <game>.txt
+      json -> <game>.json
+      csv  -> <game>_<section>.csv for every section
+    """
+    out_dir = Path(out_dir or REPORTS_DIR)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+
+    if "text" in formats:
+        path = out_dir / f"{report.game}.txt"
+        atomic_write_text(path, render_text(report))
+        written.append(path)
+    if "json" in formats:
+        path = out_dir / f"{report.game}.json"
+        atomic_write_text(path, render_json(report))
+        written.append(path)
+    if "csv" in formats:
+        for sec in report.sections:
+            path = out_dir / f"{report.game}_{sec.key}.csv"
+            atomic_write_text(path, render_csv(sec))
+            written.append(path)
+    return written
+
+
+def parse_formats(value: str) -> list[str]:
+    """argparse type for --formats: comma-separated subset of FORMATS."""
+    selected = [f.strip() for f in value.split(",") if f.strip()]
+    unknown = [f for f in selected if f not in FORMATS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown format(s) {unknown}, expected {FORMATS}")
+    return selected
+
+
+def add_report_args(ap) -> None:
+    ap.add_argument("--formats", type=parse_formats, default=["json", "csv"],
+                    help="report files to write into reports/: any of text,json,csv "
+                         "(comma-separated, empty for none; default json,csv)")
+    ap.add_argument("--reports-dir", default=str(REPORTS_DIR),
+                    help="directory for report files (default reports)")
+    ap.add_argument("--quiet", action="store_true",
+                    help="do not print the report tables to stdout")
+
+
+def emit_report(report: Report, args=None) -> list[Path]:
+    """Print (unless --quiet) and write the report files selected by args."""
+    formats = getattr(args, "formats", ["json", "csv"])
+    if not getattr(args, "quiet", False):
+        sys.stdout.write(render_text(report))
+        sys.stdout.flush()
+    if not formats:
+        return []
+    return write_report(report, formats, getattr(args, "reports_dir", None))
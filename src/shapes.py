@@ -0,0 +1,230 @@
+import argparse
+import os
+import sys
+from collections import Counter
+from datetime import date
+from functools import lru_cache, reduce
+from math import comb
+from operator import add, or_, sub
+
+sys.path.append("src")
+from common import GAMES, DrawTable  # noqa: E402
+from generations import pinned_path  # noqa: E402
+
+FEATURES = ("sum", "odd", "high", "spread", "run")
+
+FEATURE_TITLES = {
+    "sum": "BALL SUM",
+    "odd": "ODD COUNT (rest even)",
+    "high": "HIGH COUNT (rest low)",
+    "spread": "SPREAD (max - min)",
+    "run": "LONGEST CONSECUTIVE RUN",
+}
+
+
+def high_threshold(hi: int) -> int:
+    """Numbers above this are "high": 1-35 low / 36-70 high for 1..70."""
+    return hi // 2
+
+
+# ================== OBSERVED ==================
+def shape_columns(balls, width: int, hi: int) -> dict:
+    """
+    Shape features of every draw, computed column-wise: the ball matrix
+    (one row per draw) is split into its `width` columns and each feature
+    is a reduction across columns, not a loop over draws.
+    Returns {feature: list, one value per draw}.
+    """
+    cols = [balls[j::width] for j in range(width)]
+    cut = high_threshold(hi)
+
+    sums = reduce(lambda acc, c: list(map(add, acc, c)), cols)
+    odd = reduce(lambda acc, c: list(map(add, acc, (b & 1 for b in c))), cols, [0] * len(cols[0]))
+    high = reduce(lambda acc, c: list(map(add, acc, (b > cut for b in c))), cols, [0] * len(cols[0]))
+    spread = list(map(sub, map(max, *cols), map(min, *cols))) if width > 1 else [0] * len(cols[0])
+
+    # Longest run of consecutive numbers = how many times mask &= mask << 1
+    # can be applied before the mask is empty.
+    masks = reduce(lambda acc, c: list(map(or_, acc, (1 << b for b in c))), cols, [0] * len(cols[0]))
+    run = [0] * len(masks)
+    while any(masks):
+        run = list(map(add, run, map(bool, masks)))
+        masks = [m & (m << 1) for m in masks]
+    return {"sum": sums, "odd": odd, "high": high, "spread": spread, "run": run}
+
+
+class DrawShapes:
+    """
+    Per-draw shape features for one ball set of a game (main balls, or the
+    Pick-6 Double Play set), with histograms over all draws or a window.
+    Expected distributions assume one number range, so only draws of the
+    current range (drift.table_eras) are kept; `excluded` counts the older
+    draws left out and `since` is the day ordinal of the first one kept.
+    """
+
+    def __init__(self, table: DrawTable, special: bool = False):
+        from drift import table_eras  # not at import time: query (and aggregate) import shapes
+
+        spec = table.spec
+        self.spec = spec
+        self.special = special
+        self.width = spec.n_special if special else spec.n_balls
+        self.hi = spec.special_max if special else spec.ball_max
+        eras = table_eras(table, special)
+        start = eras[-1].start if eras else 0
+        if eras:
+            self.hi = max(self.hi, eras[-1].top)
+        self.excluded = start
+        self.since = table.days[start] if start else None
+        self.days = table.days[start:]
+        balls = (table.special if special else table.balls)[start * self.width:]
+        self.features = shape_columns(balls, self.width, self.hi) if len(self.days) else \
+            {f: [] for f in FEATURES}
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def histogram(self, feature: str, window: int = None) -> Counter:
+        """Draws per feature value, over all draws or the latest `window`."""
+        values = self.features[feature]
+        if window is not None:
+            values = values[-window:] if window > 0 else []
+        return Counter(values)
+
+    def expected(self, feature: str) -> dict:
+        return expected_distributions(self.width, self.hi)[feature]
+
+
+# ================== EXPECTED (exact) ==================
+def _sum_counts(k: int, hi: int) -> dict:
+    """Number of k-subsets of 1..hi with each sum (subset-sum DP)."""
+    max_sum = sum(range(hi - k + 1, hi + 1))
+    dp = [[0] * (max_sum + 1) for _ in range(k + 1)]
+    dp[0][0] = 1
+    for n in range(1, hi + 1):
+        for j in range(min(k, n), 0, -1):
+            prev, cur = dp[j - 1], dp[j]
+            for s in range(max_sum, n - 1, -1):
+                if prev[s - n]:
+                    cur[s] += prev[s - n]
+    return {s: c for s, c in enumerate(dp[k]) if c}
+
+
+def _runs_at_most(k: int, hi: int, r: int) -> int:
+    """k-subsets of 1..hi whose consecutive runs are all <= r."""
+    if r <= 0:
+        return 1 if k == 0 else 0
+    # Compositions of k into m parts of size 1..r, times ways to place m
+    # runs among the hi-k gaps (C(hi-k+1, m)).
+    comp = [[0] * (k + 1) for _ in range(k + 1)]  # comp[m][total]
+    comp[0][0] = 1
+    for m in range(1, k + 1):
+        for total in range(m, k + 1):
+            comp[m][total] = sum(comp[m - 1][total - p] for p in range(1, min(r, total) + 1))
+    return sum(comb(hi - k + 1, m) * comp[m][k] for m in range(0, k + 1))
+
+
+@lru_cache(maxsize=None)
+def expected_distributions(k: int, hi: int) -> dict:
+    """
+    Exact probability of every feature value for k distinct numbers drawn
+    uniformly from 1..hi: {feature: {value: probability}}.
+    Cached per (k, hi), i.e. per game ball set.
+    """
+    total = comb(hi, k)
+    odd_n = (hi + 1) // 2
+    high_n = hi - high_threshold(hi)
+
+    def hyper(n_marked: int) -> dict:
+        return {i: comb(n_marked, i) * comb(hi - n_marked, k - i) / total for i in range(k + 1)
+                if comb(n_marked, i) * comb(hi - n_marked, k - i)}
+
+    if k == 1:
+        spread = {0: 1.0}
+    else:
+        # max - min = d: hi - d places for the pair, k - 2 numbers strictly inside
+        spread = {d: (hi - d) * comb(d - 1, k - 2) / total for d in range(k - 1, hi)}
+
+    at_most = [_runs_at_most(k, hi, r) for r in range(k + 1)]
+    run = {r: (at_most[r] - at_most[r - 1]) / total for r in range(1, k + 1)
+           if at_most[r] - at_most[r - 1]}
+
+    return {
+        "sum": {s: c / total for s, c in _sum_counts(k, hi).items()},
+        "odd": hyper(odd_n),
+        "high": hyper(high_n),
+        "spread": spread,
+        "run": run,
+    }
+
+
+def expected_mean(dist: dict) -> float:
+    return sum(v * p for v, p in dist.items())
+
+
+# ================== CLI ==================
+def ball_sets(spec) -> list[bool]:
+    """Ball sets with a shape: main balls, plus multi-number special sets (Double Play)."""
+    return [False, True] if spec.n_special > 1 else [False]
+
+
+def _binned(hist: Counter, expected: dict, width: int) -> list[tuple[str, int, float]]:
+    obs, exp = Counter(), Counter()
+    for v, n in hist.items():
+        obs[v // width] += n
+    for v, p in expected.items():
+        exp[v // width] += p
+    return [(f"{b * width}-{b * width + width - 1}", obs.get(b, 0), exp[b]) for b in sorted(exp)]
+
+
+def print_shapes(shapes: DrawShapes, window: int = None) -> None:
+    spec = shapes.spec
+    ball = spec.special_label if shapes.special else "main"
+    n = min(window, len(shapes)) if window else len(shapes)
+    if window:
+        scope = f"last {n} draws"
+    elif shapes.since is not None:
+        scope = f"since {date.fromordinal(shapes.since).isoformat()}, {n} draws"
+    else:
+        scope = f"{n} draws"
+    print(f"\n{spec.title}: {ball} draw shapes ({scope}) vs exact expectation")
+
+    for feature in FEATURES:
+        hist = shapes.histogram(feature, window)
+        expected = shapes.expected(feature)
+        observed_mean = sum(v * c for v, c in hist.items()) / n if n else 0.0
+        print(f"\n{FEATURE_TITLES[feature]} | mean {observed_mean:.2f} "
+              f"(expected {expected_mean(expected):.2f})")
+        print("-" * 60)
+        if feature in ("sum", "spread"):
+            rows = _binned(hist, expected, 25 if feature == "sum" else 10)
+        else:
+            rows = [(str(v), hist.get(v, 0), p) for v, p in sorted(expected.items())]
+        for label, count, p in rows:
+            share = count / n if n else 0.0
+            print(f"{label:>7} -> {count} draws ({share:.1%}) | expected {p:.1%}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Draw-shape histograms vs exact expected distributions")
+    ap.add_argument("--games", default=",".join(GAMES),
+                    help=f"comma-separated games (default {','.join(GAMES)})")
+    ap.add_argument("--window", type=int, default=None, help="latest N draws only (default all)")
+    args = ap.parse_args(argv)
+
+    print("\n===== DRAW SHAPES =====")
+    for key in [g.strip() for g in args.games.split(",") if g.strip()]:
+        spec = GAMES[key]
+        if not os.path.exists(spec.csv_path):
+            print(f"⚠️ {spec.csv_path} not found. Skipping {key}.")
+            continue
+        table = DrawTable.from_csv(spec, str(pinned_path(spec.csv_path)))
+        if not table:
+            print(f"⚠️ {key}: no valid draws.")
+            continue
+        for special in ball_sets(spec):
+            print_shapes(DrawShapes(table, special), args.window)
+
+
+if __name__ == "__main__":
+    main()
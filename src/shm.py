@@ -0,0 +1,144 @@
+import atexit
+from array import array
+from multiprocessing import shared_memory
+from typing import NamedTuple
+
+from common import DrawTable, GameSpec
+
+
+class ShmDescriptor(NamedTuple):
+    """
+    Everything a worker needs to attach to a shared DrawTable. Small and
+    cheap to pickle, whatever the history length.
+    """
+    name: str
+    spec: GameSpec
+    draws: int
+    extra_values: tuple
+    date_format: str = None
+
+
+def _layout(spec: GameSpec, n: int) -> tuple[list[tuple[str, str, int, int]], int]:
+    """
+    Column placement in one block: ([(field, typecode, offset, length)], size).
+    days (8-byte ints) come first, so every column is naturally aligned.
+    """
+    fields = [
+        ("days", "l", n),
+        ("balls", "B", n * spec.n_balls),
+        ("special", "B", n * spec.n_special),
+        ("extra_codes", "B", n),
+    ]
+    out, offset = [], 0
+    for field, code, length in fields:
+        out.append((field, code, offset, length))
+        offset += length * array(code).itemsize
+    return out, max(offset, 1)
+
+
+class SharedDraws:
+    """
+    Owner of shared-memory copies of DrawTables (one block per game).
+
+    Use as a context manager in the parent process. Blocks are unlinked on
+    exit, at interpreter shutdown, and - if the parent dies - by the
+    multiprocessing resource tracker.
+
+        with SharedDraws() as shared:
+            desc = shared.publish(table)
+            pool.submit(work, desc, ...)   # worker: table = attach(desc)
+    """
+
+    def __init__(self):
+        self._blocks = {}
+        self.descriptors = {}
+        atexit.register(self.close)
+
+    def publish(self, table: DrawTable) -> ShmDescriptor:
+        spec, n = table.spec, len(table)
+        layout, size = _layout(spec, n)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        try:
+            for field, code, offset, length in layout:
+                data = getattr(table, field)
+                raw = data.tobytes() if hasattr(data, "tobytes") else array(code, data).tobytes()
+                shm.buf[offset:offset + len(raw)] = raw
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+
+        desc = ShmDescriptor(shm.name, spec, n, tuple(table.extra_values), table.date_format)
+        self._blocks[shm.name] = shm
+        self.descriptors[spec.key] = desc
+        return desc
+
+    def close(self) -> None:
+        while self._blocks:
+            _, shm = self._blocks.popitem()
+            try:
+                shm.close()
+            except BufferError:
+                pass  # a local view is still alive; unlink still frees the name
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+        self.descriptors = {}
+
+    def __enter__(self) -> "SharedDraws":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ================== WORKER SIDE ==================
+_attached = {}
+
+
+def _open(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        # Before 3.13 attaching registers the block again. Pool workers share
+        # the owner's resource tracker, so that is a no-op; unregistering here
+        # would drop the owner's entry instead.
+        return shared_memory.SharedMemory(name=name)
+
+
+def attach(desc: ShmDescriptor) -> DrawTable:
+    """
+    Read-only DrawTable over a shared block, without copying. Attachments
+    are cached per process, so repeated tasks on one worker are free.
+    """
+    cached = _attached.get(desc.name)
+    if cached is not None:
+        return cached[1]
+
+    shm = _open(desc.name)
+    cols = {}
+    for field, code, offset, length in _layout(desc.spec, desc.draws)[0]:
+        size = length * array(code).itemsize
+        cols[field] = shm.buf[offset:offset + size].toreadonly().cast(code)
+
+    table = DrawTable(desc.spec, cols["days"], cols["balls"], cols["special"],
+                      cols["extra_codes"], list(desc.extra_values), desc.date_format)
+    table.rows_read = desc.draws
+    _attached[desc.name] = (shm, table)
+    return table
+
+
+def detach_all() -> None:
+    """Drop this process's attachments (the owner still holds the blocks)."""
+    while _attached:
+        _, (shm, table) = _attached.popitem()
+        for field in ("days", "balls", "special", "extra_codes"):
+            getattr(table, field).release()
+        try:
+            shm.close()
+        except BufferError:
+            pass  # caller still holds a slice of the table; freed with the process
+
+
+atexit.register(detach_all)
@@ -0,0 +1,236 @@
+import argparse
+import os
+import sys
+from collections import Counter
+
+sys.path.append("src")
+from common import GAMES, DrawTable, GameSpec  # noqa: E402
+from generations import pinned_path  # noqa: E402
+
+
+def occurrence_bitsets(balls, width: int, hi: int, n: int) -> list[int]:
+    """
+    Per-number occurrence bitsets: bit i of cols[x] is set if x is in draw i.
+    Built in a bytearray per number, so cost is linear in the ball column.
+    There is one bitset for every number up to hi or the largest number
+    drawn, whichever is higher (older matrices used wider ranges).
+    """
+    hi = max(hi, max(balls, default=0))
+    rows = [bytearray((n + 7) // 8) for _ in range(hi + 1)]
+    for j, b in enumerate(balls):
+        i = j // width
+        rows[b][i >> 3] |= 1 << (i & 7)
+    return [int.from_bytes(r, "little") for r in rows]
+
+
+class TransitionEngine:
+    """
+    "Previous draw -> next draw" statistics for one game, main or special
+    balls, over the date-sorted history.
+
+    Each number has an occurrence bitset over draws, so a whole matrix row
+    is a handful of big-int ANDs and popcounts instead of loops over draws:
+
+        M[x][y] = popcount(cols[x] & (cols[y] >> 1))   # x in draw i-1, y in draw i
+
+    Windows shift the bitsets; update() appends new draws and adds only the
+    transitions they create to the full-history matrix. `hi` is the game's
+    range, widened to the largest number in the history if that is higher.
+    """
+
+    def __init__(self, spec: GameSpec, special: bool = False):
+        self.spec = spec
+        self.special = special
+        self.width = spec.n_special if special else spec.n_balls
+        self.hi = spec.special_max if special else spec.ball_max
+        self.n = 0
+        self.last_day = None
+        self.digest = None  # DrawTable.digest() of the draws added so far
+        self.cols = [0] * (self.hi + 1)
+        self.masks = []  # per-draw bitmask of numbers, for repeat counts per draw
+        self._matrix = None
+
+    # ------------------ building ------------------
+    def add(self, table: DrawTable) -> None:
+        """
+        Append draws that are all newer than the ones already added.
+        The caller sets `digest` afterwards (see update()).
+        """
+        m = len(table)
+        if not m:
+            return
+        balls = table.special if self.special else table.balls
+        w, start = self.width, self.n
+        new_cols = occurrence_bitsets(balls, w, self.hi, m)
+        if len(new_cols) > self.hi + 1:
+            self.cols.extend([0] * (len(new_cols) - self.hi - 1))
+            self.hi = len(new_cols) - 1
+            self._matrix = None  # rebuilt at the new size on demand
+        for x in range(1, self.hi + 1):
+            self.cols[x] |= new_cols[x] << start
+        for i in range(m):
+            mask = 0
+            for b in balls[i * w:(i + 1) * w]:
+                mask |= 1 << b
+            self.masks.append(mask)
+        self.n += m
+        self.last_day = table.days[-1]
+
+        if self._matrix is not None:
+            # Only transitions ending in a new draw: pairs (start-1, start), ...
+            self._add_pairs(self._matrix, max(start - 1, 0), self.n)
+
+    def update(self, table: DrawTable) -> tuple[int, bool]:
+        """
+        Catch up with table. If every draw already added is unchanged (same
+        count and digest) only newer draws are appended; otherwise the engine
+        is rebuilt. Returns (draws added, rebuilt).
+        """
+        known = table.until(self.last_day) if self.last_day is not None else None
+        rebuild = known is None or len(known) != self.n or known.digest() != self.digest
+        if rebuild:
+            self.__init__(self.spec, self.special)
+            new = table
+        else:
+            new = table[len(known):]
+        self.add(new)
+        if len(new) or rebuild:
+            self.digest = table.digest()
+        return len(new), rebuild
+
+    # ------------------ matrices ------------------
+    def _window(self, window) -> tuple[int, int]:
+        if window is None or window >= self.n:
+            return 0, self.n
+        return self.n - window, self.n
+
+    def _add_pairs(self, matrix: list, lo: int, hi: int) -> None:
+        """Add transitions between consecutive draws in [lo, hi) to matrix."""
+        if hi - lo < 2:
+            return
+        span = (1 << (hi - lo)) - 1
+        prev_mask = span >> 1  # draws lo .. hi-2 (each has a successor)
+        cur = [(c >> lo) & span for c in self.cols]
+        nxt = [c >> 1 for c in cur]
+        for x in range(1, self.hi + 1):
+            px = cur[x] & prev_mask
+            if not px:
+                continue
+            row = matrix[x]
+            for y in range(1, self.hi + 1):
+                row[y] += (px & nxt[y]).bit_count()
+
+    def matrix(self, window: int = None) -> list[list[int]]:
+        """
+        (hi+1) x (hi+1) counts, 1-indexed: M[x][y] = draws where y followed
+        a draw containing x, over the latest `window` draws (or all).
+        """
+        if window is None or window >= self.n:
+            if self._matrix is None:
+                self._matrix = [[0] * (self.hi + 1) for _ in range(self.hi + 1)]
+                self._add_pairs(self._matrix, 0, self.n)
+            return self._matrix
+        out = [[0] * (self.hi + 1) for _ in range(self.hi + 1)]
+        self._add_pairs(out, *self._window(window))
+        return out
+
+    def appearances(self, window: int = None) -> Counter:
+        """Draws (with a successor) that contained each number."""
+        lo, hi = self._window(window)
+        if hi - lo < 2:
+            return Counter()
+        prev_mask = (1 << (hi - lo - 1)) - 1
+        return Counter({x: ((c >> lo) & prev_mask).bit_count()
+                        for x, c in enumerate(self.cols) if x and (c >> lo) & prev_mask})
+
+    def conditional(self, x: int, window: int = None) -> dict:
+        """P(y in next draw | x in this draw) for every y."""
+        seen = self.appearances(window).get(x, 0)
+        row = self.matrix(window)[x]
+        return {y: (row[y] / seen if seen else 0.0) for y in range(1, self.hi + 1)}
+
+    # ------------------ repeats ------------------
+    def repeat_rates(self, window: int = None) -> dict:
+        """
+        {x: (repeats, appearances, rate)}: how often x is drawn again in the
+        very next draw. Chance level is width / hi.
+        """
+        lo, hi = self._window(window)
+        apps = self.appearances(window)
+        prev_mask = ((1 << (hi - lo)) - 1) >> 1
+        out = {}
+        for x, seen in apps.items():
+            c = self.cols[x] >> lo
+            repeats = (c & (c >> 1) & prev_mask).bit_count()
+            out[x] = (repeats, seen, repeats / seen)
+        return out
+
+    def repeat_histogram(self, window: int = None) -> Counter:
+        """How many numbers each draw shares with the previous draw -> draws."""
+        lo, hi = self._window(window)
+        masks = self.masks
+        return Counter((masks[i] & masks[i - 1]).bit_count() for i in range(max(lo, 1), hi))
+
+
+def load_engine(spec_key: str, path: str = None, special: bool = False) -> TransitionEngine:
+    spec = GAMES[spec_key]
+    engine = TransitionEngine(spec, special)
+    engine.update(DrawTable.from_csv(spec, str(pinned_path(path or spec.csv_path))))
+    return engine
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Draw-to-draw transitions and repeat rates")
+    ap.add_argument("--games", default=",".join(GAMES),
+                    help=f"comma-separated games (default {','.join(GAMES)})")
+    ap.add_argument("--window", type=int, default=None, help="latest N draws only (default all)")
+    ap.add_argument("--special", action="store_true", help="special balls instead of main balls")
+    ap.add_argument("--top", type=int, default=10, help="rows per table (default 10)")
+    args = ap.parse_args(argv)
+
+    print("\n===== TRANSITIONS =====")
+    for key in [g.strip() for g in args.games.split(",") if g.strip()]:
+        spec = GAMES[key]
+        if not os.path.exists(spec.csv_path):
+            print(f"⚠️ {spec.csv_path} not found. Skipping {key}.")
+            continue
+        if args.special and not spec.n_special:
+            continue
+        engine = load_engine(key, special=args.special)
+        if engine.n < 2:
+            print(f"⚠️ {key}: not enough draws.")
+            continue
+
+        scope = f"last {args.window} draws" if args.window else "full history"
+        ball = spec.special_label if args.special else "main"
+        top = spec.special_max if args.special else spec.ball_max
+        chance = engine.width / top
+        print(f"\n{spec.title}: {ball} repeats from the previous draw ({scope})")
+        print("-" * 60)
+        if engine.hi > top:
+            print(f"⚠️ History includes numbers up to {engine.hi} from an older range "
+                  f"(current 1..{top}); see drift.py.")
+        hist = engine.repeat_histogram(args.window)
+        total = sum(hist.values())
+        for k in sorted(hist):
+            print(f"{k} repeated -> {hist[k]} draws ({hist[k] / total:.1%})")
+
+        rates = engine.repeat_rates(args.window)
+        print(f"\nTOP {args.top} REPEAT RATES (chance {chance:.1%})")
+        print("-" * 60)
+        ranked = sorted(rates.items(), key=lambda kv: (-kv[1][2], kv[0]))[:args.top]
+        for x, (rep, seen, rate) in ranked:
+            print(f"{x:2d} -> repeated {rep} of {seen} times ({rate:.1%})")
+
+        m = engine.matrix(args.window)
+        pairs = [(m[x][y], x, y) for x in range(1, engine.hi + 1)
+                 for y in range(1, engine.hi + 1) if x != y and m[x][y]]
+        pairs.sort(key=lambda p: (-p[0], p[1], p[2]))
+        print(f"\nTOP {args.top} TRANSITIONS (x in draw -> y in next draw)")
+        print("-" * 60)
+        for count, x, y in pairs[:args.top]:
+            print(f"{x:2d} -> {y:2d} : {count} times")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from pathlib import Path
+
+sys.path.append("src")
+from common import GAMES, atomic_write_text  # noqa: E402
+
+WHEELS_DIR = Path("data/wheels")
+
+DEFAULT_POOL = 15
+DEFAULT_EFFORT = 5000  # local-search moves, in total
+STARTS = 4             # uncovered targets a greedy step grows tickets from
+
+
+# ================== BITSET MODEL ==================
+# Pool numbers are positions 0..v-1; a ticket or a drawn set is a bitmask
+# over positions. Targets are every m-subset of the pool, numbered in
+# itertools.combinations order. For pool position x, elem[x] is the bitset
+# of targets that contain x, so the targets sharing >= k numbers with a
+# ticket T are   OR over k-subsets s of T of (AND over x in s of elem[x]).
+class CoverModel:
+    def __init__(self, v: int, size: int, m: int, k: int):
+        self.v, self.size, self.m, self.k = v, size, m, k
+        self.targets = []
+        combos = list(combinations(range(v), m))
+        n = len(combos)
+        rows = [bytearray((n + 7) // 8) for _ in range(v)]
+        for i, combo in enumerate(combos):
+            mask = 0
+            byte, bit = i >> 3, 1 << (i & 7)
+            for x in combo:
+                rows[x][byte] |= bit
+                mask |= 1 << x
+            self.targets.append(mask)
+        self.elem = [int.from_bytes(r, "little") for r in rows]
+        self.full = (1 << n) - 1
+        self._cover = {}
+
+    def cover(self, ticket: int) -> int:
+        """Bitset of targets that share at least k numbers with ticket."""
+        c = self._cover.get(ticket)
+        if c is None:
+            members = [x for x in range(self.v) if ticket >> x & 1]
+            c = 0
+            for sub in combinations(members, self.k):
+                acc = self.elem[sub[0]]
+                for x in sub[1:]:
+                    acc &= self.elem[x]
+                c |= acc
+            if len(self._cover) > 200_000:
+                self._cover.clear()
+            self._cover[ticket] = c
+        return c
+
+    def covered(self, tickets: list[int]) -> int:
+        acc = 0
+        for t in tickets:
+            acc |= self.cover(t)
+        return acc
+
+    def uncovered(self, tickets: list[int]) -> int:
+        return self.full & ~self.covered(tickets)
+
+    def target_at(self, uncovered: int, rng: random.Random) -> int:
+        """An uncovered target (mask): the first one at or after a random index."""
+        r = rng.randrange(uncovered.bit_length())
+        high = uncovered >> r  # never 0: the top bit is at or above r
+        return self.targets[r + (high & -high).bit_length() - 1]
+
+
+def _bits(mask: int) -> list[int]:
+    return [x for x in range(mask.bit_length()) if mask >> x & 1]
+
+
+def _grow(model: CoverModel, core: list[int], uncovered: int) -> tuple[int, int]:
+    """
+    Extend core to a full ticket one number at a time, always adding the
+    number that covers the most uncovered targets. Returns (ticket, gain).
+    """
+    ticket = 0
+    for x in core:
+        ticket |= 1 << x
+    gain = (model.cover(ticket) & uncovered).bit_count()
+    for _ in range(model.size - len(core)):
+        best, gain = -1, -1
+        for x in range(model.v):
+            if ticket >> x & 1:
+                continue
+            g = (model.cover(ticket | 1 << x) & uncovered).bit_count()
+            if g > gain:
+                best, gain = x, g
+        ticket |= 1 << best
+    return ticket, gain
+
+
+# ================== CONSTRUCTION ==================
+def greedy(model: CoverModel, rng: random.Random) -> list[int]:
+    """
+    Repeatedly add the ticket covering the most uncovered targets. Each
+    step grows tickets from k numbers of a few uncovered targets, so every
+    step makes progress.
+    """
+    tickets = []
+    uncovered = model.full
+    while uncovered:
+        best, best_gain = 0, -1
+        for _ in range(STARTS):
+            core = rng.sample(_bits(model.target_at(uncovered, rng)), model.k)
+            t, gain = _grow(model, core, uncovered)
+            if gain > best_gain:
+                best, best_gain = t, gain
+        tickets.append(best)
+        uncovered &= ~model.cover(best)
+    return tickets
+
+
+def drop_redundant(model: CoverModel, tickets: list[int]) -> list[int]:
+    """Remove tickets whose targets are all covered by the others."""
+    out = list(tickets)
+    for t in sorted(tickets, key=lambda t: model.cover(t).bit_count()):
+        rest = [u for u in out if u != t]
+        if rest and not model.uncovered(rest):
+            out = rest
+    return out
+
+
+def local_search(model: CoverModel, tickets: list[int], rng: random.Random,
+                 effort: int = DEFAULT_EFFORT) -> list[int]:
+    """
+    Try to shrink a covering wheel: drop one ticket, then repair the hole
+    with single-number swaps that pull a ticket towards an uncovered target,
+    accepting moves that do not increase the uncovered count (plus the odd
+    uphill move to escape plateaus). Repeats while repairs succeed, within
+    `effort` moves overall.
+    """
+    best = list(tickets)
+    moves_left = effort
+    while len(best) > 1 and moves_left:
+        # Drop the ticket that covers the fewest targets on its own
+        covers = [model.cover(t) for t in best]
+        before = [0]
+        for c in covers[:-1]:
+            before.append(before[-1] | c)
+        after, acc = [0] * len(covers), 0
+        for i in range(len(covers) - 1, -1, -1):
+            after[i] = acc
+            acc |= covers[i]
+        drop = min(range(len(best)),
+                   key=lambda i: (covers[i] & ~(before[i] | after[i])).bit_count())
+        cur = best[:drop] + best[drop + 1:]
+        uncovered = model.uncovered(cur)
+        score = uncovered.bit_count()
+
+        while score and moves_left:
+            moves_left -= 1
+            target = model.target_at(uncovered, rng)
+            i = rng.randrange(len(cur))
+            t = cur[i]
+            inside = _bits(target & ~t)
+            outside = _bits(t & ~target)
+            if not inside or not outside:
+                continue
+            others = model.covered(cur[:i] + cur[i + 1:])
+            # Best single swap of ticket i towards the target
+            moves = []
+            for out in outside:
+                for into in inside:
+                    cand = t & ~(1 << out) | 1 << into
+                    moves.append(((model.full & ~(others | model.cover(cand))).bit_count(), cand))
+            new_score = min(moves)[0]
+            cand = rng.choice([c for sc, c in moves if sc == new_score])
+            if new_score <= score or rng.random() < 0.01:
+                cur[i] = cand
+                uncovered = model.full & ~(others | model.cover(cand))
+                score = new_score
+
+        if score:
+            break
+        best = cur
+    return best
+
+
+def build_wheel(v: int, size: int, m: int, k: int, seed: int = 0,
+                effort: int = DEFAULT_EFFORT) -> list[int]:
+    check_params(v, size, m, k)
+    rng = random.Random(seed)
+    model = CoverModel(v, size, m, k)
+    tickets = drop_redundant(model, greedy(model, rng))
+    if effort:
+        tickets = local_search(model, tickets, rng, effort)
+    return sorted(tickets)
+
+
+def check_params(v: int, size: int, m: int, k: int) -> None:
+    if not 1 <= k <= m <= size <= v:
+        raise ValueError(f"Need 1 <= match ({k}) <= drawn ({m}) <= ticket size ({size}) "
+                         f"<= pool ({v})")
+
+
+# ================== VERIFICATION ==================
+def _verify_chunk(tickets: list[int], v: int, m: int, k: int, first: int) -> tuple[int, list]:
+    """Uncovered m-subsets whose smallest position is `first`."""
+    misses, example = 0, None
+    head = 1 << first
+    for rest in combinations(range(first + 1, v), m - 1):
+        drawn = head
+        for x in rest:
+            drawn |= 1 << x
+        if not any((t & drawn).bit_count() >= k for t in tickets):
+            misses += 1
+            if example is None:
+                example = _bits(drawn)
+    return misses, example
+
+
+def verify_wheel(tickets: list[int], v: int, m: int, k: int, workers: int = None) -> tuple[int, list]:
+    """
+    Check the guarantee directly on every m-subset of the pool (no bitset
+    model), split by smallest position across a process pool.
+    Returns (uncovered draws, an example or None).
+    """
+    firsts = range(v - m + 1)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(firsts)))
+    if workers == 1:
+        parts = [_verify_chunk(tickets, v, m, k, f) for f in firsts]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_verify_chunk, tickets, v, m, k, f) for f in firsts]
+            parts = [fut.result() for fut in futures]
+    misses = sum(p[0] for p in parts)
+    example = next((p[1] for p in parts if p[1] is not None), None)
+    return misses, example
+
+
+# ================== CACHE ==================
+def wheel_path(v: int, size: int, m: int, k: int, wheels_dir: Path = WHEELS_DIR) -> Path:
+    return Path(wheels_dir) / f"v{v}_t{size}_m{m}_k{k}.json"
+
+
+def get_wheel(v: int, size: int, m: int, k: int, seed: int = 0, effort: int = DEFAULT_EFFORT,
+              wheels_dir: Path = WHEELS_DIR, force: bool = False) -> tuple[list[int], bool]:
+    """
+    Wheel for the parameters, from the cache when present. A forced rebuild
+    only replaces the cached wheel if it is smaller. Wheels are stored by
+    pool position, so one entry serves every choice of pool numbers.
+    Returns (tickets as position bitmasks, from_cache).
+    """
+    path = wheel_path(v, size, m, k, wheels_dir)
+    cached = None
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        cached = [sum(1 << x for x in t) for t in data["tickets"]]
+    except (OSError, ValueError, KeyError):
+        pass
+    if cached and not force:
+        return cached, True
+
+    tickets = build_wheel(v, size, m, k, seed, effort)
+    if cached and len(cached) <= len(tickets):
+        return cached, True
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(path, json.dumps({
+        "pool": v, "ticket_size": size, "drawn": m, "match": k,
+        "seed": seed, "effort": effort,
+        "tickets": [_bits(t) for t in tickets],
+    }) + "\n")
+    return tickets, False
+
+
+# ================== CLI ==================
+def default_pool(game: str, n: int) -> list[int]:
+    """The n most frequent main-ball numbers of a game (full history)."""
+    from games import load_game
+
+    return sorted(x for x, _ in load_game(game).top(n))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generate a wheel: tickets guaranteeing a k-match")
+    ap.add_argument("--game", choices=list(GAMES), default="jersey_cash5")
+    ap.add_argument("--numbers", default="",
+                    help="comma-separated pool numbers (default: the --pool most frequent)")
+    ap.add_argument("--pool", type=int, default=DEFAULT_POOL,
+                    help=f"pool size when --numbers is not given (default {DEFAULT_POOL})")
+    ap.add_argument("--match", type=int, default=3, help="guaranteed matches k (default 3)")
+    ap.add_argument("--if-drawn", type=int, default=None,
+                    help="... if this many pool numbers are drawn (default: ticket size)")
+    ap.add_argument("--effort", type=int, default=DEFAULT_EFFORT, help="local-search moves")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=None, help="verification processes")
+    ap.add_argument("--force", action="store_true", help="rebuild even if cached")
+    args = ap.parse_args(argv)
+
+    spec = GAMES[args.game]
+    size = spec.n_balls
+    m = args.if_drawn or size
+
+    print("\n===== WHEEL =====")
+    if args.numbers:
+        numbers = sorted({int(x) for x in args.numbers.split(",") if x.strip()})
+    else:
+        if not os.path.exists(spec.csv_path):
+            print(f"❌ ERROR: {spec.csv_path} not found. Pass --numbers explicitly.")
+            return
+        numbers = default_pool(args.game, args.pool)
+    bad = [x for x in numbers if not 1 <= x <= spec.ball_max]
+    if bad:
+        print(f"❌ ERROR: {bad} outside 1..{spec.ball_max} for {spec.title}.")
+        return
+    try:
+        check_params(len(numbers), size, m, args.match)
+    except ValueError as e:
+        print(f"❌ ERROR: {e}")
+        return
+
+    t0 = time.perf_counter()
+    tickets, cached = get_wheel(len(numbers), size, m, args.match, args.seed, args.effort,
+                                force=args.force)
+    built = time.perf_counter() - t0
+    misses, example = verify_wheel(tickets, len(numbers), m, args.match, args.workers)
+
+    print(f"{spec.title}: {len(numbers)} numbers -> {len(tickets)} tickets, "
+          f"{args.match} if {m} guaranteed")
+    print(f"Pool: {' '.join(map(str, numbers))}")
+    print(f"{'Loaded from cache' if cached else 'Built'} in {built:.2f}s")
+    print("-" * 60)
+    for i, t in enumerate(tickets, 1):
+        print(f"{i:3d}: {' '.join(f'{numbers[x]:2d}' for x in _bits(t))}")
+    if misses:
+        drawn = " ".join(str(numbers[x]) for x in example)
+        print(f"❌ Verification FAILED: {misses} draws uncovered, e.g. {drawn}")
+    else:
+        print("✅ Verified: every possible draw is covered.")
+
+
+if __name__ == "__main__":
+    main()
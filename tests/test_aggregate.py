@@ -0,0 +1,86 @@
+import json
+import random
+from datetime import date, timedelta
+
+import pytest
+
+import analyze_pick6
+import analyze_powerball
+import parallel
+from common import GAMES, DrawTable
+from drift import current_matrix_start
+
+
+MATRIX_CHANGE = date(2015, 10, 7)
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """
+    Powerball and Pick-6 CSVs in tmp_path/data/nj (newest first, like the
+    fetcher). Powerball switches from 1-59 / 1-35 to 1-69 / 1-26 on
+    2015-10-07, as the real game did.
+    """
+    rng = random.Random(11)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data/nj").mkdir(parents=True)
+    day, pb, p6 = date(2012, 1, 4), [], []
+    for _ in range(1200):
+        hi, red = (59, 35) if day < MATRIX_CHANGE else (69, 26)
+        white = " ".join(f"{n:02d}" for n in sorted(rng.sample(range(1, hi + 1), 5)))
+        pb.append(f"{day.strftime('%m/%d/%Y')},{white},{rng.randint(1, red)}\n")
+        main = " ".join(map(str, sorted(rng.sample(range(1, 47), 6))))
+        dp = " ".join(map(str, sorted(rng.sample(range(1, 47), 6))))
+        p6.append(f"{day.isoformat()},{main},{dp}\n")
+        day += timedelta(days=3)
+    pb.append("01/01/2026,01 02 03,4\n")  # rejected: too few balls
+    (tmp_path / "data/nj/powerball.csv").write_text(
+        "draw_date,white_numbers,powerball\n" + "".join(reversed(pb)))
+    (tmp_path / "data/nj/pick6.csv").write_text(
+        "draw_date,main_numbers,double_play_numbers\n" + "".join(reversed(p6)))
+    # Shard even these small files across a real process pool.
+    monkeypatch.setattr(parallel, "MIN_PARALLEL_BYTES", 0)
+    return tmp_path
+
+
+MODES = [[], ["--stream", "--chunk-size", "97"], ["--workers", "3"]]
+
+
+def run(main, game: str, mode: list, where: list, capsys) -> tuple[str, dict]:
+    main(argv=["--formats", "json", "--reports-dir", "out", *where, *mode])
+    out = capsys.readouterr().out
+    text = "\n".join(line for line in out.splitlines() if not line.startswith("Streamed"))
+    return text, json.loads(open(f"out/{game}.json").read())
+
+
+@pytest.mark.parametrize("where", [["--where", "pb <= 10 and since 2017"], ["--current-matrix"]])
+def test_powerball_modes_agree(data_dir, capsys, where):
+    runs = [run(analyze_powerball.main, "powerball", mode, where, capsys) for mode in MODES]
+    text, report = runs[0]
+    assert "Total rows read: 1201" in text
+    assert report["meta"]["rows_read"] == 1201
+    assert all(r == runs[0] for r in runs[1:])
+
+
+def test_current_matrix_streams_without_a_table(data_dir, capsys, monkeypatch):
+    table = DrawTable.from_csv(GAMES["powerball"])
+    start = current_matrix_start(table)
+    # The 1-59 era looks like 1-69 until a draw first goes above 59.
+    assert MATRIX_CHANGE.toordinal() <= start < MATRIX_CHANGE.toordinal() + 60
+
+    def no_table(*args, **kwargs):
+        raise AssertionError("--stream must not load the whole file")
+
+    monkeypatch.setattr(DrawTable, "from_csv", no_table)
+    text, report = run(analyze_powerball.main, "powerball", MODES[1], ["--current-matrix"], capsys)
+    assert f"Filter: since {date.fromordinal(start).isoformat()}" in text
+    assert report["meta"]["draws"] == len(table.since(start))
+
+
+def test_pick6_modes_agree(data_dir, capsys):
+    where = ["--where", "main contains 7"]
+    runs = [run(lambda argv: analyze_pick6.main(argv=argv), "pick6", mode, where, capsys)
+            for mode in MODES]
+    assert "Skipping" not in runs[0][0]
+    assert runs[0][1]["meta"]["rows_read"] == 1200
+    assert all(r == runs[0] for r in runs[1:])
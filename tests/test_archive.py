@@ -0,0 +1,101 @@
+import email.message
+import importlib
+from pathlib import Path
+
+import pytest
+
+from archive import Archive
+from feeds import FEEDS
+
+GOLDEN = Path(__file__).resolve().parent / "golden" / "feeds"
+
+PICK6_HTML = ("<html><body><ul>"
+              "<li>10/16/2025 . 3, 11, 19, 27, 35, 44 <span>Double Play®</span> 1 7 13 22 30 41</li>"
+              "<li>10/13/2025 . 2, 8, 15, 26, 33, 46 <span>Double Play®</span> 5 9 18 24 37 40</li>"
+              "</ul></body></html>")
+
+
+def test_identical_payloads_share_one_object(tmp_path):
+    archive = Archive(tmp_path)
+    first = archive.record("run-1", "mega", "https://x/mega.csv", b"draw_date\n1\n", 200)
+    second = archive.record("run-2", "mega", "https://x/mega.csv", b"draw_date\n1\n", 200)
+
+    assert first["new"] and not second["new"]
+    assert first["sha256"] == second["sha256"]
+    assert list(archive.objects_dir.glob("*/*.gz")) == [archive.object_path(first["sha256"])]
+    # the manifest logs every fetch, all pointing at the one object
+    assert [e["sha256"] for e in archive.entries()] == [first["sha256"]] * 2
+    assert archive.get(first["sha256"]) == b"draw_date\n1\n"
+
+
+@pytest.mark.parametrize("damage", ["flip", "truncate", "empty"])
+def test_get_detects_a_damaged_object(tmp_path, damage):
+    archive = Archive(tmp_path)
+    digest = archive.record("run-1", "mega", "u", b"draw_date,white_numbers\n" * 200, 200)["sha256"]
+    archive.record("run-1", "pick6", "u", None, 0)  # failed download: no object to check
+    path = archive.object_path(digest)
+    data = path.read_bytes()
+    if damage == "flip":
+        data = data[:20] + bytes([data[20] ^ 0xFF]) + data[21:]
+    elif damage == "truncate":
+        data = data[:len(data) // 2]
+    else:
+        data = b""
+    path.write_bytes(data)
+
+    with pytest.raises(ValueError, match=digest):
+        archive.get(digest)
+    assert archive.verify() == [digest]
+
+
+class FakeResponse:
+    def __init__(self, body: bytes):
+        self.body = body
+        self.status = 200
+        self.headers = email.message.Message()
+        self.headers["Content-Type"] = "text/csv"
+
+    def read(self) -> bytes:
+        return self.body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def generation_files(root: Path, gen_id: str) -> dict:
+    return {p.name: p.read_bytes() for p in (root / "generations" / gen_id).iterdir()}
+
+
+def test_replay_reproduces_the_live_run(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    fetch_nj_latest = importlib.import_module("fetch_nj_latest")
+    from generations import GenerationStore
+
+    payloads = {feed.url: (GOLDEN / f"{key}_source.csv").read_bytes() for key, feed in FEEDS.items()}
+    payloads[fetch_nj_latest.PICK6_URL] = PICK6_HTML.encode("utf-8")
+    monkeypatch.setattr(fetch_nj_latest.urllib.request, "urlopen",
+                        lambda req, timeout: FakeResponse(payloads[req.full_url]))
+    archive = Archive(tmp_path / "data/archive")
+    store = GenerationStore(tmp_path / "data/nj")
+
+    fetch_nj_latest.fetch(archive)
+    live = store.current()
+    live_files = generation_files(store.root, live)
+    assert live_files["pick6.csv"].count(b"\n") == 3
+    assert archive.runs() == [live]
+
+    def offline(req, timeout):
+        raise AssertionError("replay used the network")
+
+    monkeypatch.setattr(fetch_nj_latest.urllib.request, "urlopen", offline)
+    fetch_nj_latest.fetch(archive, "latest")
+    replay = store.current()
+
+    assert replay != live
+    assert generation_files(store.root, replay) == live_files
+    for name, data in live_files.items():
+        assert (store.root / name).read_bytes() == data
+    assert archive.runs() == [live]  # a replay archives nothing new
@@ -0,0 +1,37 @@
+from common import GAMES, DrawTable
+from calendar_cube import CalendarCube, update_cube
+
+HEADER = "draw_date,white_numbers,mega_ball,multiplier\n"
+# 2013-era Mega Millions: white balls up to 75, Mega Ball up to 15
+OLD = ["2013-01-01,05 17 44 71 75,15,N/A\n", "2013-01-04,03 12 30 56 74,2,N/A\n"]
+NEW = ["2026-01-02,01 02 03 04 70,24,2X\n"]
+
+
+def table(tmp_path, rows):
+    path = tmp_path / "mega.csv"
+    path.write_text(HEADER + "".join(rows))
+    return DrawTable.from_csv(GAMES["mega"], str(path))
+
+
+def test_numbers_beyond_range_survive_reload(tmp_path):
+    t = table(tmp_path, OLD + NEW)
+    cube = CalendarCube(GAMES["mega"])
+    cube.update(t)
+    cube.save(tmp_path / "cube.json")
+    loaded = CalendarCube.load(GAMES["mega"], tmp_path / "cube.json")
+    assert loaded.counts() == t.ball_counts()
+    assert sum(loaded.counts().values()) == len(t.balls)
+    assert loaded.counts(year=2013)[75] == 1
+
+
+def test_corrected_draw_rebuilds(tmp_path):
+    cubes, csv = tmp_path / "cubes", str(tmp_path / "mega.csv")
+    table(tmp_path, OLD)
+    update_cube("mega", csv, cubes)
+
+    # Same number of already-counted draws, one of them corrected
+    table(tmp_path, [OLD[0].replace("05 17", "06 17")] + OLD[1:] + NEW)
+    cube = CalendarCube.load(GAMES["mega"], cubes / "mega_calendar.json")
+    assert cube.update(DrawTable.from_csv(GAMES["mega"], csv)) == (3, True)
+    assert cube.counts(year=2013)[5] == 0
+    assert cube.counts(year=2013)[6] == 1
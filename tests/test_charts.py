@@ -0,0 +1,54 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import charts
+import generations
+from generations import GenerationStore
+from test_streaming import write_csv
+
+pytest.importorskip("matplotlib")
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+
+def test_second_run_with_unchanged_input_writes_nothing(tmp_path):
+    csv = write_csv(tmp_path / "mega_millions.csv", 200)
+    jobs = charts.game_jobs("mega", csv, out_dir=tmp_path / "charts")
+
+    rendered, skipped = charts.render_all(jobs, workers=1)
+    assert len(rendered) == len(jobs) and skipped == []
+    written = {p: p.stat().st_mtime_ns for p in (tmp_path / "charts").iterdir()}
+
+    rendered, skipped = charts.render_all(charts.game_jobs("mega", csv, out_dir=tmp_path / "charts"),
+                                          workers=1)
+    assert rendered == [] and len(skipped) == len(jobs)
+    assert {p: p.stat().st_mtime_ns for p in (tmp_path / "charts").iterdir()} == written
+
+    write_csv(tmp_path / "mega_millions.csv", 201)
+    rendered, _ = charts.render_all(charts.game_jobs("mega", csv, out_dir=tmp_path / "charts"),
+                                    workers=1)
+    assert rendered
+
+
+def test_building_jobs_does_not_import_matplotlib(tmp_path):
+    csv = write_csv(tmp_path / "mega_millions.csv", 50)
+    code = ("import sys, charts; charts.game_jobs('mega', sys.argv[1]); "
+            "assert 'matplotlib' not in sys.modules")
+    subprocess.run([sys.executable, "-c", code, csv], cwd=SRC, check=True)
+
+
+def test_jobs_read_the_pinned_generation(tmp_path, monkeypatch):
+    monkeypatch.setattr(generations, "_pinned", {})
+    store = GenerationStore(tmp_path)
+    with store.begin() as gen:
+        write_csv(gen.path("mega_millions.csv"), 40)
+    store.pin()
+    with store.begin() as gen:
+        write_csv(gen.path("mega_millions.csv"), 80)
+
+    jobs = charts.game_jobs("mega", str(tmp_path / "mega_millions.csv"), out_dir=tmp_path)
+    series = next(j for j in jobs if j["kind"] == "series")
+    assert len(series["data"]["days"]) == 40
@@ -0,0 +1,40 @@
+from common import GAMES, DrawTable
+
+import analyze_powerball
+
+
+def test_missing_column_rejects_rows(tmp_path):
+    path = tmp_path / "powerball.csv"
+    path.write_text("draw_date,white_numbers,red_ball\n"
+                    "06/08/2026,09 16 18 33 64,25\n"
+                    "06/05/2026,13 27 49 58 61,16\n")
+    table = DrawTable.from_csv(GAMES["powerball"], str(path))
+    assert len(table) == 0
+    assert table.rows_read == 2
+    assert table.rejected == {"missing_columns": 2}
+
+
+def test_analyzer_reports_bad_header(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data/nj").mkdir(parents=True)
+    (tmp_path / "data/nj/powerball.csv").write_text("draw_date,numbers\n06/08/2026,09 16 18 33 64\n")
+    analyze_powerball.main([])
+    out = capsys.readouterr().out
+    assert "Total rows read: 1" in out
+    assert "No valid draws parsed" in out
+    assert "Inspect CSV headers" in out
+
+
+def test_draws_keep_the_csv_date_format(tmp_path):
+    from aggregate import stream_stats
+
+    path = tmp_path / "powerball.csv"
+    path.write_text("draw_date,white_numbers,powerball\n"
+                    "06/08/2026,09 16 18 33 64,25\n"
+                    "06/05/2026,13 27 49 58 61,16\n")
+    spec = GAMES["powerball"]
+    table = DrawTable.from_csv(spec, str(path))
+    assert [dr.source_date for dr in table] == ["06/05/2026", "06/08/2026"]
+    assert table[0].date_str == "2026-06-05"
+    assert table.last(1)[0].source_date == "06/08/2026"
+    assert [dr.source_date for dr in stream_stats(spec, str(path), 5, 1).latest] == ["06/08/2026", "06/05/2026"]
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from common import GAMES, DrawTable
+from export_arrow import export_draws
+
+pa = pytest.importorskip("pyarrow")
+ds = pytest.importorskip("pyarrow.dataset")
+
+HEADER = "draw_date,white_numbers,powerball\n"
+ROWS = ["2026-01-03,01 02 03 04 05,1\n",
+        "2026-01-06,06 07 08 09 10,2\n",
+        "2026-01-10,11 12 13 14 15,3\n"]
+
+
+def table(tmp_path, rows):
+    path = tmp_path / "powerball.csv"
+    path.write_text(HEADER + "".join(rows))
+    return DrawTable.from_csv(GAMES["powerball"], str(path))
+
+
+def exported(out_dir):
+    d = ds.dataset(str(out_dir / "powerball_draws" / "parquet"))
+    return sorted(d.to_table().column("ball_1").to_pylist())
+
+
+def test_append_then_rewrite_on_corrected_draw(tmp_path):
+    out = tmp_path / "exports"
+    assert export_draws(table(tmp_path, ROWS[:2]), out) == (2, True)
+    assert export_draws(table(tmp_path, ROWS), out) == (1, False)
+    assert export_draws(table(tmp_path, ROWS), out) == (0, False)
+    assert exported(out) == [1, 6, 11]
+
+    # Same row count, one historical value corrected
+    fixed = [ROWS[0].replace("01 02", "21 02")] + ROWS[1:]
+    assert export_draws(table(tmp_path, fixed), out) == (3, True)
+    assert exported(out) == [6, 11, 21]
+
+
+def test_interrupted_publish_is_repaired(tmp_path):
+    out = tmp_path / "exports"
+    ds_dir = out / "powerball_draws"
+    export_draws(table(tmp_path, ROWS[:2]), out)
+    manifest = json.loads((ds_dir / "manifest.json").read_text())
+
+    # Crash before the manifest: a stray temp part must never be published.
+    stray = ds_dir / "parquet" / ".part-00001.parquet.tmp"
+    stray.write_bytes(b"junk")
+    assert export_draws(table(tmp_path, ROWS[:2]), out) == (0, False)
+    assert not stray.exists()
+
+    # Crash after the manifest, before the rename: the next run publishes it.
+    export_draws(table(tmp_path, ROWS), out)
+    part = ds_dir / "parquet" / "part-00001.parquet"
+    part.rename(ds_dir / "parquet" / ".part-00001.parquet.tmp")
+    assert exported(out) == [1, 6]
+    assert export_draws(table(tmp_path, ROWS), out) == (0, False)
+    assert exported(out) == [1, 6, 11]
+    assert json.loads((ds_dir / "manifest.json").read_text())["parts"] == manifest["parts"] + ["part-00001"]
@@ -0,0 +1,32 @@
+from pathlib import Path
+
+import pytest
+
+from common import GAMES
+from feeds import FEEDS, output_header, write_feed
+from metrics import Metrics
+
+GOLDEN = Path(__file__).resolve().parent / "golden" / "feeds"
+
+
+# <game>_source.csv are small payloads in the NY Open Data layout, with a few
+# broken rows; <game>.csv is what the fetcher wrote for them before feeds.py.
+@pytest.mark.parametrize("key", sorted(FEEDS))
+def test_write_feed_matches_golden(tmp_path, key):
+    source = (GOLDEN / f"{key}_source.csv").read_bytes().decode("utf-8")
+    expected = (GOLDEN / f"{key}.csv").read_bytes()
+    metrics = Metrics("fetch_test")
+
+    out = tmp_path / "out.csv"
+    written = write_feed(FEEDS[key], source, metrics, out)
+
+    assert out.read_bytes() == expected
+    assert written == expected.count(b"\n") - 1
+    assert f'lottery_fetch_rows_written{{source="{key}"}} {written}' in metrics.to_prometheus()
+
+
+@pytest.mark.parametrize("key", sorted(FEEDS))
+def test_blocked_payload_leaves_header_only(tmp_path, key):
+    out = tmp_path / "out.csv"
+    assert write_feed(FEEDS[key], "<!DOCTYPE html><html>Access denied</html>", None, out) == 0
+    assert out.read_text().splitlines() == [",".join(output_header(GAMES[FEEDS[key].game]))]
@@ -0,0 +1,62 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import games
+from common import DrawTable
+from test_streaming import write_csv
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Count CSV parses done through DrawTable.from_csv."""
+    calls = []
+    real = DrawTable.from_csv.__func__
+
+    def counting(cls, spec, path, *args, **kwargs):
+        calls.append(path)
+        return real(cls, spec, path, *args, **kwargs)
+
+    monkeypatch.setattr(DrawTable, "from_csv", classmethod(counting))
+    monkeypatch.setattr(games, "_loaded", {})
+    return calls
+
+
+def test_statistics_are_memoized(tmp_path, loads):
+    csv = write_csv(tmp_path / "mega_millions.csv", 120)
+    assert games.load_game("mega", csv) is games.load_game("mega", csv)
+    assert loads == []  # nothing is read until asked for
+
+    game = games.load_game("mega", csv)
+    counts = game.ball_counts
+    assert game.top(5) == games.load_game("mega", csv).top(5)
+    assert game.ball_counts is counts
+    assert game.window_counts(20) is game.window_counts(20)
+    assert game.bucket(counts.most_common(1)[0][0]) is not None
+    assert loads == [csv]
+
+
+def test_changed_csv_gives_a_fresh_game(tmp_path, loads):
+    csv = write_csv(tmp_path / "mega_millions.csv", 120)
+    old = games.load_game("mega", csv)
+    assert old.draws == 120 and not old.stale
+
+    write_csv(tmp_path / "mega_millions.csv", 150)
+    assert old.stale
+    new = games.load_game("mega", csv)
+    assert new is not old
+    assert new.draws == 150
+    assert sum(new.ball_counts.values()) == 150 * 5
+    assert len(loads) == 2
+
+
+def test_buckets_do_not_import_the_analyzers(tmp_path):
+    csv = write_csv(tmp_path / "mega_millions.csv", 60)
+    code = ("import sys, games; g = games.load_game('mega', sys.argv[1]); g.mix_labels(5); "
+            "g.bucket(1, special=True); "
+            "assert not [m for m in sys.modules if m.startswith('analyze_')], sys.modules")
+    subprocess.run([sys.executable, "-c", code, csv], cwd=SRC, check=True)
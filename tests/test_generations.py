@@ -0,0 +1,78 @@
+import generations
+from generations import GenerationStore, pinned_path
+
+
+def publish(store: GenerationStore, text: str) -> str:
+    with store.begin() as gen:
+        gen.path("pick6.csv").write_text(text)
+    return gen.id
+
+
+def test_generations_within_one_second_get_distinct_ids(tmp_path):
+    store = GenerationStore(tmp_path)
+    ids = [publish(store, f"draw_date\n2026-01-0{i + 1}\n") for i in range(3)]
+    assert len(set(ids)) == 3
+    assert store.generations() == sorted(ids)
+    assert store.current() == ids[-1]
+    assert (tmp_path / "pick6.csv").read_text() == "draw_date\n2026-01-03\n"
+
+
+def test_ids_sort_by_time_whatever_the_pid(tmp_path, monkeypatch):
+    store = GenerationStore(tmp_path, keep=2)
+    ids = []
+    for pid in (900, 80, 7):  # later writers with smaller pids
+        monkeypatch.setattr(generations.os, "getpid", lambda pid=pid: pid)
+        ids.append(publish(store, f"draw_date\n{pid}\n"))
+    assert sorted(ids) == ids
+    assert store.generations() == ids[-2:]  # prune kept the two newest
+    assert store.rollback() == ids[1]
+    assert (tmp_path / "pick6.csv").read_text() == "draw_date\n80\n"
+
+
+def test_pin_gives_up_on_a_missing_generation(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(generations, "_pinned", {})
+    store = GenerationStore(tmp_path)
+    (tmp_path / "CURRENT").write_text("20260101T000000.000000000Z-1\n")
+    (tmp_path / "pick6.csv").write_text("draw_date\n")
+
+    assert store.pin() is None
+    assert "names missing generation" in capsys.readouterr().out
+    assert list((tmp_path / "pins").glob("*.pin")) == []
+    assert pinned_path(tmp_path / "pick6.csv") == tmp_path / "pick6.csv"
+
+
+def test_pin_follows_current_while_it_moves(tmp_path, monkeypatch):
+    monkeypatch.setattr(generations, "_pinned", {})
+    store = GenerationStore(tmp_path)
+    gen_id = publish(store, "draw_date\n")
+    reads = iter(["pruned-meanwhile", gen_id])
+    monkeypatch.setattr(store, "current", lambda: next(reads))
+
+    assert store.pin() == gen_id
+    assert [p.read_text().strip() for p in (tmp_path / "pins").glob("*.pin")] == [gen_id]
+
+
+def test_unwritable_pins_fall_back_to_unpinned_read(tmp_path, monkeypatch):
+    monkeypatch.setattr(generations, "_pinned", {})
+    store = GenerationStore(tmp_path)
+    gen_id = publish(store, "draw_date\n")
+    (tmp_path / "pins").write_text("not a directory")  # mkdir fails even for root
+
+    assert store.pin() == gen_id
+    assert pinned_path(tmp_path / "pick6.csv") == tmp_path / "generations" / gen_id / "pick6.csv"
+
+
+def test_readers_use_the_pinned_generation(tmp_path, monkeypatch):
+    from calendar_cube import update_cube
+    from transitions import load_engine
+
+    header, row = "draw_date,main_numbers,double_play_numbers\n", ",1 2 3 4 5 6,7 8 9 10 11 12\n"
+    monkeypatch.setattr(generations, "_pinned", {})
+    store = GenerationStore(tmp_path)
+    publish(store, header + "2026-01-01" + row)
+    store.pin()
+    publish(store, header + "2026-01-05" + row + "2026-01-01" + row)
+
+    csv = str(tmp_path / "pick6.csv")
+    assert load_engine("pick6", csv).n == 1
+    assert update_cube("pick6", csv, cubes_dir=tmp_path / "cubes").rows == 1
@@ -0,0 +1,74 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import common
+from metrics import Metrics
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+
+def sample() -> Metrics:
+    m = Metrics("analyze_test")
+    m.inc("rows_rejected_total", 2, reason="bad_date", game="mega")
+    m.inc("rows_rejected_total", reason="bad_date", game="mega")
+    m.set("rows_read", 120, game='a "quoted"\\name\nx')
+    m.set("workers", 3)
+    return m
+
+
+def test_prometheus_text():
+    lines = sample().to_prometheus().splitlines()
+    assert lines == [
+        "# TYPE lottery_rows_read gauge",
+        'lottery_rows_read{game="a \\"quoted\\"\\\\name\\nx"} 120',
+        "# TYPE lottery_rows_rejected_total counter",
+        'lottery_rows_rejected_total{game="mega",reason="bad_date"} 3',
+        "# TYPE lottery_workers gauge",
+        "lottery_workers 3",
+    ]
+
+
+def test_jsonl_line_and_atomic_prom(tmp_path):
+    m = sample()
+    prom, jsonl = m.write(tmp_path)
+    m.write(tmp_path)
+    runs = [json.loads(line) for line in jsonl.read_text().splitlines()]
+    assert len(runs) == 2
+    assert runs[0]["job"] == "analyze_test"
+    names = {(r["name"], tuple(sorted(r["labels"].items()))): r["value"] for r in runs[0]["metrics"]}
+    assert names[("rows_rejected_total", (("game", "mega"), ("reason", "bad_date")))] == 3
+    assert ("run_duration_seconds", (("job", "analyze_test"),)) in names
+    assert "lottery_run_duration_seconds" in prom.read_text()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["analyze_test.jsonl", "analyze_test.prom"]
+
+
+def test_failed_write_keeps_previous_prom(tmp_path, monkeypatch, capsys):
+    prom, _ = sample().write(tmp_path)
+    before = prom.read_text()
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(common.os, "replace", fail)
+    m = Metrics("analyze_test")
+    m.set("rows_read", 1)
+    m.write(tmp_path)
+    assert "Could not write metrics" in capsys.readouterr().out
+    assert prom.read_text() == before
+    assert not [p for p in tmp_path.iterdir() if p.name.endswith(".tmp")]
+
+
+@pytest.mark.parametrize("script", ["analyze_powerball.py", "analyze_pick6.py"])
+def test_analyzer_writes_duration_on_early_exit(tmp_path, script):
+    # No data/nj CSV: the analyzer returns early, the finally block still writes.
+    env = dict(os.environ, METRICS_DIR=str(tmp_path / "metrics"))
+    subprocess.run([sys.executable, str(SRC / script)], cwd=tmp_path, env=env,
+                   check=True, capture_output=True)
+    job = script[:-3]
+    prom = (tmp_path / "metrics" / f"{job}.prom").read_text()
+    assert f'lottery_run_duration_seconds{{job="{job}"}}' in prom
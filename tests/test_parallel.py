@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+import parallel
+from aggregate import GameStats
+from common import GAMES, DrawTable
+from parallel import MIN_PARALLEL_BYTES, byte_shards, parallel_stats
+from test_streaming import summary, write_csv
+
+
+def check_shards(path: str, n: int) -> list[tuple[int, int]]:
+    header, shards = byte_shards(path, n)
+    data = open(path, "rb").read()
+    body = data.index(b"\n") + 1
+    assert header == data[:body].decode().strip().split(",")
+    assert len(shards) <= n
+    # Contiguous, covering the body exactly, and cut only after a newline
+    assert shards[0][0] == body and shards[-1][1] == len(data)
+    for (a, b), (c, _) in zip(shards, shards[1:]):
+        assert b == c
+        assert data[b - 1:b] == b"\n"
+    lines = [line for a, b in shards for line in data[a:b].splitlines()]
+    assert lines == data[body:].splitlines()
+    return shards
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 7, 64, 1000])
+def test_small_file_shards_on_line_boundaries(tmp_path, n):
+    path = write_csv(tmp_path / "mega.csv", 40)
+    assert os.path.getsize(path) < MIN_PARALLEL_BYTES
+    check_shards(path, n)
+
+
+def test_large_file_shards_on_line_boundaries(tmp_path):
+    path = write_csv(tmp_path / "mega.csv", 40_000)
+    assert os.path.getsize(path) > MIN_PARALLEL_BYTES
+    assert len(check_shards(path, 4)) == 4
+
+
+def test_no_trailing_newline(tmp_path):
+    path = write_csv(tmp_path / "mega.csv", 30)
+    with open(path, "rb+") as f:
+        f.truncate(os.path.getsize(path) - 1)
+    check_shards(path, 5)
+
+
+@pytest.mark.parametrize("min_bytes", [0, MIN_PARALLEL_BYTES])
+def test_parallel_equals_in_memory(tmp_path, monkeypatch, min_bytes):
+    # min_bytes=0 shards the small file across a real pool; the default runs it inline.
+    monkeypatch.setattr(parallel, "MIN_PARALLEL_BYTES", min_bytes)
+    path = write_csv(tmp_path / "mega.csv", 700)
+    spec = GAMES["mega"]
+    expected = GameStats.from_table(DrawTable.from_csv(spec, path), 50)
+    assert summary(parallel_stats(spec, path, 50, workers=3, chunk_size=64)) == summary(expected)
@@ -0,0 +1,42 @@
+import random
+from datetime import date, timedelta
+
+from common import GAMES, DrawTable
+from randomness import ball_set_tests, run_battery
+from transitions import occurrence_bitsets
+
+
+def mixed_history(tmp_path) -> DrawTable:
+    """Mega Millions with a 1-75 / MB 1-15 range until 2017-10-28, then 1-70 / 1-25."""
+    rng = random.Random(3)
+    day, rows = date(2013, 1, 1), []
+    for _ in range(900):
+        hi, mb = (75, 15) if day < date(2017, 10, 28) else (70, 25)
+        balls = " ".join(map(str, sorted(rng.sample(range(1, hi + 1), 5))))
+        rows.append(f"{day.isoformat()},{balls},{rng.randint(1, mb)},2X\n")
+        day += timedelta(days=3)
+    path = tmp_path / "mega.csv"
+    path.write_text("draw_date,white_numbers,mega_ball,multiplier\n" + "".join(rows))
+    return DrawTable.from_csv(GAMES["mega"], str(path))
+
+
+def test_battery_tests_current_range_only(tmp_path):
+    table = mixed_history(tmp_path)
+    old = len(table.until("2017-10-27"))
+    full = [r for r in run_battery(table, windows=[100]) if r.window is None]
+    assert [r.ball for r in full] == ["main", "MB"]
+    for res in full:
+        assert res.excluded == old
+        assert res.since == date(2017, 10, 28).toordinal()
+        assert res.draws == len(table) - old
+    assert set(full[0].z) == set(range(1, 71))
+    assert full[0].chi2_df == 69 and full[1].chi2_df == 24
+
+
+def test_perfectly_even_counts_have_zero_chi2():
+    # 1..4, two per draw: every number drawn exactly 4 times in 8 draws
+    balls = [1, 2, 3, 4] * 4
+    res = ball_set_tests(occurrence_bitsets(balls, 2, 4, 8), 8, 2, 4, game="t")
+    assert res.draws == 8 and res.chi2_df == 3
+    assert res.chi2 == 0.0 and res.chi2_p == 1.0
+    assert res.z == {1: 0.0, 2: 0.0, 3: 0.0, 4: 0.0}
@@ -0,0 +1,117 @@
+import csv
+import io
+import json
+import re
+import shutil
+from pathlib import Path
+
+import pytest
+
+import analyze_jersey_cash5
+import analyze_mega
+import analyze_pick6
+import analyze_powerball
+from report import Report, render_csv, render_json, render_text, write_report
+
+GOLDEN = Path(__file__).resolve().parent / "golden"
+
+# golden/<game>.txt is what the analyzers printed before the report model,
+# for the CSVs in golden/ (and golden/reports the CSVs pick6 wrote). The
+# CSVs have no ties across a top-10 cut, where the old order was arbitrary.
+ANALYZERS = {
+    "powerball": (analyze_powerball.main, "powerball.csv"),
+    "mega": (analyze_mega.main, "mega_millions.csv"),
+    "pick6": (lambda argv: analyze_pick6.main(argv=argv), "pick6.csv"),
+    "jersey_cash5": (analyze_jersey_cash5.main, "jersey_cash5.csv"),
+}
+
+COUNT_LINE = re.compile(r"^\s*(\d+) -> (\d+) times$")
+
+
+def normalized(text: str) -> list[str]:
+    """
+    Lines of analyzer output, with equal counts in "n -> c times" runs
+    ordered by number (top_n breaks ties by number since the columnar
+    rewrite) and the list of saved report files left out.
+    """
+    out, run = [], []
+
+    def flush():
+        run.sort(key=lambda m: (-int(m.group(2)), int(m.group(1))))
+        out.extend(m.group(0) for m in run)
+        run.clear()
+
+    for line in text.splitlines():
+        m = COUNT_LINE.match(line)
+        if m:
+            run.append(m)
+            continue
+        flush()
+        if line.startswith(" - reports/") or line == "✅ Saved reports:":
+            continue
+        out.append(line)
+    flush()
+    return out
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data/nj").mkdir(parents=True)
+    for _, name in ANALYZERS.values():
+        shutil.copy(GOLDEN / name, tmp_path / "data/nj" / name)
+    return tmp_path
+
+
+@pytest.mark.parametrize("game", sorted(ANALYZERS))
+def test_text_matches_previous_output(data_dir, capsys, game):
+    main, _ = ANALYZERS[game]
+    main(argv=[])
+    assert normalized(capsys.readouterr().out) == normalized((GOLDEN / f"{game}.txt").read_text())
+
+
+def test_pick6_keeps_its_csv_files(data_dir, capsys):
+    analyze_pick6.main(argv=[])
+    for old in (GOLDEN / "reports").iterdir():
+        assert (data_dir / "reports" / old.name).read_bytes() == old.read_bytes()
+
+
+@pytest.mark.parametrize("mode", [[], ["--stream"], ["--workers", "2"]])
+@pytest.mark.parametrize("game", sorted(ANALYZERS))
+def test_filter_matching_nothing_is_not_a_csv_problem(data_dir, capsys, game, mode):
+    main, name = ANALYZERS[game]
+    main(argv=["--where", "until 1990"] + mode)
+    out = capsys.readouterr().out
+    draws = len((GOLDEN / name).read_text().splitlines()) - 1
+    assert f"--where filter matched 0 of {draws} draws." in out
+    assert "No valid" not in out and "Inspect CSV" not in out
+
+
+def sample_report() -> Report:
+    report = Report("demo", "DEMO", {"draws": 2})
+    report.add("latest", "Latest draws", ["draw_date", "numbers", "label"],
+               [("2026-06-08", "1 2 3", 'say "hi", ok'), ("2026-06-05", "4 5 6", "N/A")],
+               "{0} | {1} | {2}")
+    report.add("mix", None, ["draw_date", "hot"], [("2026-06-08", 3)])
+    return report
+
+
+def test_json_and_csv_round_trip(tmp_path):
+    report = sample_report()
+    data = json.loads(render_json(report))
+    assert data["meta"] == {"draws": 2}
+    for sec in report.sections:
+        assert data["sections"][sec.key] == {"title": sec.title, "columns": sec.columns, "rows": sec.rows}
+        rows = list(csv.reader(io.StringIO(render_csv(sec))))
+        assert rows[0] == sec.columns
+        assert rows[1:] == [[str(v) for v in row] for row in sec.rows]
+
+    written = write_report(report, ["text", "json", "csv"], tmp_path)
+    assert sorted(p.name for p in written) == ["demo.json", "demo.txt", "demo_latest.csv", "demo_mix.csv"]
+    assert (tmp_path / "demo.txt").read_text() == render_text(report)
+
+
+def test_text_skips_data_only_sections():
+    text = render_text(sample_report())
+    assert text == ("\nLatest draws\n" + "-" * 60 + "\n"
+                    '2026-06-08 | 1 2 3 | say "hi", ok\n2026-06-05 | 4 5 6 | N/A\n')
@@ -0,0 +1,57 @@
+from collections import Counter
+from datetime import date
+from itertools import combinations
+
+import pytest
+
+from common import GAMES, DrawTable
+from shapes import FEATURES, DrawShapes, expected_distributions, shape_columns
+from test_randomness import mixed_history
+
+
+def test_expected_distributions_match_brute_force():
+    k, hi = 5, 15
+    draws = list(combinations(range(1, hi + 1), k))
+    features = shape_columns([b for draw in draws for b in draw], k, hi)
+    expected = expected_distributions(k, hi)
+    for feature in FEATURES:
+        brute = {v: n / len(draws) for v, n in Counter(features[feature]).items()}
+        assert set(expected[feature]) == set(brute), feature
+        for value, p in brute.items():
+            assert expected[feature][value] == pytest.approx(p), (feature, value)
+
+
+def test_histograms_of_a_fixed_table(tmp_path):
+    path = tmp_path / "pick6.csv"
+    path.write_text("draw_date,main_numbers,double_play_numbers\n"
+                    "2026-01-05,1 2 3 4 5 6,2 9 17 25 33 46\n"
+                    "2026-01-01,10 12 23 24 25 46,1 3 5 7 9 11\n"
+                    "2025-12-29,7 8 30 31 40 41,2 4 6 8 10 12\n")
+    shapes = DrawShapes(DrawTable.from_csv(GAMES["pick6"], str(path)))
+    assert shapes.excluded == 0 and shapes.since is None
+
+    # oldest first: (7 8 30 31 40 41), (10 12 23 24 25 46), (1 2 3 4 5 6)
+    assert shapes.features == {
+        "sum": [157, 140, 21],
+        "odd": [3, 2, 3],
+        "high": [4, 3, 0],  # above 23
+        "spread": [34, 36, 5],
+        "run": [2, 3, 6],
+    }
+    assert shapes.histogram("odd") == Counter({3: 2, 2: 1})
+    assert shapes.histogram("run", window=2) == Counter({3: 1, 6: 1})
+    assert shapes.histogram("sum", window=0) == Counter()
+
+    dp = DrawShapes(DrawTable.from_csv(GAMES["pick6"], str(path)), special=True)
+    assert dp.histogram("odd") == Counter({0: 1, 6: 1, 4: 1})
+
+
+def test_only_the_current_range_is_shaped(tmp_path):
+    table = mixed_history(tmp_path)
+    old = len(table.until("2017-10-27"))
+    shapes = DrawShapes(table)
+    assert shapes.excluded == old
+    assert shapes.since == date(2017, 10, 28).toordinal()
+    assert len(shapes) == len(table) - old
+    assert max(shapes.features["spread"]) <= 69
+    assert sum(shapes.histogram("sum").values()) == len(table) - old
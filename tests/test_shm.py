@@ -0,0 +1,66 @@
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import pytest
+
+from common import GAMES, DrawTable
+from randomness import MIN_DRAWS, BallSetResult, run_batteries
+from shm import SharedDraws, attach
+
+
+def mega_csv(n: int = 150, seed: int = 7) -> str:
+    """n valid Mega Millions draws of one number range, enough for every battery window."""
+    rng = random.Random(seed)
+    day, rows = date(2020, 1, 3), []
+    for _ in range(n):
+        white = " ".join(f"{x:02d}" for x in sorted(rng.sample(range(1, 71), 5)))
+        rows.append(f"{day.isoformat()},{white},{rng.randint(1, 25)},{rng.randint(2, 5)}X\n")
+        day += timedelta(days=rng.choice([3, 4]))
+    return "draw_date,white_numbers,mega_ball,multiplier\n" + "".join(rows)
+
+
+def columns(table: DrawTable) -> dict:
+    return {
+        "days": list(table.days),
+        "balls": list(table.balls),
+        "special": list(table.special),
+        "extra": [table.extra_values[c] for c in table.extra_codes],
+        "draws": len(table),
+    }
+
+
+def _child_columns(desc) -> dict:
+    return columns(attach(desc))
+
+
+@pytest.fixture
+def table(tmp_path):
+    path = tmp_path / "mega.csv"
+    path.write_text(mega_csv())
+    return DrawTable.from_csv(GAMES["mega"], str(path))
+
+
+@pytest.mark.parametrize("method", ["fork", "spawn"])
+def test_child_attach_round_trips(table, method):
+    if method not in multiprocessing.get_all_start_methods():
+        pytest.skip(f"{method} not available")
+    ctx = multiprocessing.get_context(method)
+    with SharedDraws() as shared, ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        desc = shared.publish(table)
+        assert pool.submit(_child_columns, desc).result() == columns(table)
+
+
+def test_parallel_battery_matches_serial(table):
+    assert len(table) >= 100 > MIN_DRAWS
+    serial = run_batteries([table, table], workers=1)
+    parallel = run_batteries([table, table], workers=2)
+
+    assert len(parallel) == len(serial) == 2
+    for got, want in zip(parallel, serial):
+        assert want, "battery skipped every ball set"
+        assert [(r.ball, r.window) for r in got] == [(r.ball, r.window) for r in want]
+        for a, b in zip(got, want):
+            for field in BallSetResult.__slots__:
+                assert getattr(a, field) == getattr(b, field), (b.ball, b.window, field)
@@ -0,0 +1,52 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from aggregate import GameStats, StreamingAggregator, iter_chunks, stream_stats
+from common import GAMES, DrawTable
+
+
+def write_csv(path, n: int, newest_first: bool = True, seed: int = 5) -> str:
+    rng = random.Random(seed)
+    day, rows = date(2019, 1, 2), []
+    for _ in range(n):
+        white = " ".join(f"{x:02d}" for x in sorted(rng.sample(range(1, 71), 5)))
+        rows.append(f"{day.strftime('%m/%d/%Y')},{white},{rng.randint(1, 25)},{rng.randint(2, 5)}X\n")
+        day += timedelta(days=rng.choice([0, 3, 4]))  # same-day ties included
+    if newest_first:
+        rows.reverse()
+    path.write_text("draw_date,white_numbers,mega_ball,multiplier\n" + "".join(rows))
+    return str(path)
+
+
+def summary(st: GameStats) -> tuple:
+    return (st.draws, st.rows_read, st.ball_counts, st.special_counts, st.extra_counts,
+            [repr(dr) for dr in st.latest], st.ball_last_seen, st.special_last_seen)
+
+
+@pytest.mark.parametrize("newest_first", [True, False])
+@pytest.mark.parametrize("chunk_size", [1, 7, 100, 10_000])
+def test_stream_equals_in_memory(tmp_path, newest_first, chunk_size):
+    path = write_csv(tmp_path / "mega.csv", 500, newest_first)
+    spec = GAMES["mega"]
+    expected = GameStats.from_table(DrawTable.from_csv(spec, path), 50)
+    assert summary(stream_stats(spec, path, 50, chunk_size)) == summary(expected)
+
+
+def test_latest_heap_keeps_exactly_keep_draws(tmp_path):
+    path = write_csv(tmp_path / "mega.csv", 300)
+    spec = GAMES["mega"]
+    agg = StreamingAggregator(spec, keep=20)
+    for chunk in iter_chunks(spec, path, chunk_size=13):
+        agg.add_chunk(chunk)
+        assert len(agg._heap) <= 20
+    latest = agg.result().latest
+    assert len(latest) == 20
+    assert [repr(d) for d in latest] == [repr(d) for d in DrawTable.from_csv(spec, path).newest(20)]
+
+
+def test_fewer_draws_than_keep(tmp_path):
+    path = write_csv(tmp_path / "mega.csv", 5)
+    st = stream_stats(GAMES["mega"], path, keep=50, chunk_size=2)
+    assert st.draws == 5 and len(st.latest) == 5
@@ -0,0 +1,56 @@
+from common import GAMES, DrawTable
+from transitions import TransitionEngine, occurrence_bitsets
+
+HEADER = "draw_date,white_numbers,mega_ball,multiplier\n"
+ROWS = ["2026-01-02,01 02 03 04 70,24,2X\n",
+        "2026-01-06,02 03 10 20 70,25,3X\n",
+        "2026-01-09,03 10 21 33 44,1,2X\n"]
+# 1-75 era draws, added after the engine has already built its matrix
+OLD_RANGE = ["2026-01-13,10 33 71 74 75,15,N/A\n",
+             "2026-01-16,01 33 44 74 75,2,N/A\n"]
+
+
+def table(tmp_path, rows):
+    path = tmp_path / "mega.csv"
+    path.write_text(HEADER + "".join(rows))
+    return DrawTable.from_csv(GAMES["mega"], str(path))
+
+
+def brute_matrix(t: DrawTable, hi: int) -> list[list[int]]:
+    draws = [set(dr.balls) for dr in t]
+    m = [[0] * (hi + 1) for _ in range(hi + 1)]
+    for prev, cur in zip(draws, draws[1:]):
+        for x in prev:
+            for y in cur:
+                m[x][y] += 1
+    return m
+
+
+def test_bitsets_cover_numbers_above_range():
+    cols = occurrence_bitsets([5, 75, 3, 4], 2, 70, 2)
+    assert len(cols) == 76
+    assert cols[75] == 0b01 and cols[3] == 0b10
+
+
+def test_incremental_growth_matches_full_build(tmp_path):
+    engine = TransitionEngine(GAMES["mega"])
+    engine.update(table(tmp_path, ROWS))
+    assert engine.hi == 70
+    engine.matrix()
+    assert engine.update(table(tmp_path, ROWS + OLD_RANGE)) == (2, False)
+    assert engine.hi == 75
+
+    full = table(tmp_path, ROWS + OLD_RANGE)
+    assert engine.matrix() == brute_matrix(full, 75)
+    assert engine.repeat_rates()[75] == (1, 1, 1.0)
+
+
+def test_edited_old_draw_rebuilds(tmp_path):
+    engine = TransitionEngine(GAMES["mega"])
+    engine.update(table(tmp_path, ROWS))
+    engine.matrix()
+
+    edited = [ROWS[0].replace("01 02 03 04 70", "01 02 03 04 69"), *ROWS[1:], OLD_RANGE[0]]
+    assert engine.update(table(tmp_path, edited)) == (4, True)
+    assert engine.matrix() == brute_matrix(table(tmp_path, edited), 75)
+    assert engine.update(table(tmp_path, edited)) == (0, False)
@@ -0,0 +1,41 @@
+from itertools import combinations
+
+import pytest
+
+import wheel
+from wheel import build_wheel, get_wheel, verify_wheel
+
+
+def mask(positions) -> int:
+    return sum(1 << x for x in positions)
+
+
+@pytest.mark.parametrize("v,size,m,k", [(8, 4, 4, 3), (10, 5, 5, 3), (9, 3, 3, 2)])
+def test_built_wheel_keeps_its_guarantee(v, size, m, k):
+    tickets = build_wheel(v, size, m, k, seed=1, effort=300)
+    assert all(t.bit_count() == size and t < 1 << v for t in tickets)
+    assert verify_wheel(tickets, v, m, k, workers=1) == (0, None)
+    # drop_redundant leaves no spare ticket: removing any one opens a hole
+    for i in range(len(tickets)):
+        assert verify_wheel(tickets[:i] + tickets[i + 1:], v, m, k, workers=1)[0] > 0
+
+
+def test_verify_finds_a_known_hole():
+    # every 3-subset of 0..5 as its own ticket, except {1, 3, 4}
+    tickets = [mask(c) for c in combinations(range(6), 3) if c != (1, 3, 4)]
+    assert verify_wheel(tickets, 6, 3, 3, workers=1) == (1, [1, 3, 4])
+    assert verify_wheel(tickets, 6, 3, 3, workers=2) == (1, [1, 3, 4])
+
+
+def test_cache_hit_skips_the_search(tmp_path, monkeypatch):
+    built, from_cache = get_wheel(8, 4, 4, 3, effort=100, wheels_dir=tmp_path)
+    assert not from_cache
+    assert wheel.wheel_path(8, 4, 4, 3, tmp_path).is_file()
+
+    def no_search(*args, **kwargs):
+        raise AssertionError("cache hit ran the search")
+
+    monkeypatch.setattr(wheel, "build_wheel", no_search)
+    cached, from_cache = get_wheel(8, 4, 4, 3, effort=100, wheels_dir=tmp_path)
+    assert from_cache
+    assert cached == built